@@ -4,6 +4,7 @@ from sqlalchemy import pool
 from alembic import context
 
 from app.core.config import get_settings
+from app.db.session import get_database_url
 from app.models.base import Base
 
 # this is the Alembic Config object, which provides
@@ -17,7 +18,8 @@ if config.config_file_name is not None:
 
 # Get database URL from settings
 settings = get_settings()
-config.set_main_option("sqlalchemy.url", settings.SQLALCHEMY_DATABASE_URI)
+# Migrations run with the synchronous driver for the configured backend
+config.set_main_option("sqlalchemy.url", get_database_url(settings, async_driver=False))
 
 # add your model's MetaData object here
 # for 'autogenerate' support
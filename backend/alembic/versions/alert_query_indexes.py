@@ -0,0 +1,23 @@
+"""Composite indexes for alert keyset pagination
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    # (timestamp, id) ordering, alone and behind the status filter
+    op.create_index('ix_alerts_timestamp_id', 'alerts', ['timestamp', 'id'], unique=False)
+    op.create_index('ix_alerts_status_timestamp_id', 'alerts', ['status', 'timestamp', 'id'], unique=False)
+
+def downgrade() -> None:
+    op.drop_index('ix_alerts_status_timestamp_id', table_name='alerts')
+    op.drop_index('ix_alerts_timestamp_id', table_name='alerts')
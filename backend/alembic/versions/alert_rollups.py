@@ -0,0 +1,51 @@
+"""Alert statistics rollup table
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from datetime import datetime
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_table(
+        'alert_rollups',
+        sa.Column('bucket', sa.String(), nullable=False),
+        sa.Column('bucket_start', sa.DateTime(), nullable=False),
+        sa.Column('dimension', sa.String(), nullable=False),
+        sa.Column('key', sa.String(), nullable=False),
+        sa.Column('value', sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint('bucket', 'bucket_start', 'dimension', 'key')
+    )
+
+    # Seed the all-time counters from existing alerts; the epoch is bound as a
+    # DateTime so it is stored in the same format the application writes
+    epoch = sa.bindparam('epoch', datetime(1970, 1, 1), type_=sa.DateTime())
+    op.execute(sa.text(
+        "INSERT INTO alert_rollups (bucket, bucket_start, dimension, key, value) "
+        "SELECT 'all', :epoch, 'metric', 'total', COUNT(*) FROM alerts"
+    ).bindparams(epoch))
+    op.execute(sa.text(
+        "INSERT INTO alert_rollups (bucket, bucket_start, dimension, key, value) "
+        "SELECT 'all', :epoch, 'status', status, COUNT(*) FROM alerts "
+        "WHERE status IS NOT NULL GROUP BY status"
+    ).bindparams(epoch))
+    op.execute(sa.text(
+        "INSERT INTO alert_rollups (bucket, bucket_start, dimension, key, value) "
+        "SELECT 'all', :epoch, 'severity', severity, COUNT(*) FROM ("
+        "SELECT CASE WHEN threats.severity >= 0.9 THEN 'high' "
+        "WHEN threats.severity >= 0.7 THEN 'medium' ELSE 'low' END AS severity "
+        "FROM alerts LEFT JOIN threats ON threats.id = alerts.threat_id"
+        ") AS severities GROUP BY severity"
+    ).bindparams(epoch))
+
+def downgrade() -> None:
+    op.drop_table('alert_rollups')
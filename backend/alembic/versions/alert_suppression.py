@@ -0,0 +1,26 @@
+"""Alert occurrence count and last seen for suppression
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    # Existing alerts each stand for one detection, last seen when raised
+    op.add_column('alerts', sa.Column('occurrence_count', sa.Integer(), nullable=False, server_default='1'))
+    op.add_column('alerts', sa.Column('last_seen', sa.DateTime(), nullable=True))
+    op.execute("UPDATE alerts SET last_seen = timestamp")
+
+def downgrade() -> None:
+    with op.batch_alter_table('alerts') as batch_op:
+        batch_op.drop_column('last_seen')
+        batch_op.drop_column('occurrence_count')
@@ -0,0 +1,27 @@
+"""Composite indexes for threat keyset pagination
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '002'
+down_revision = '001'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    # (timestamp, id) ordering, alone and behind each equality filter
+    op.create_index('ix_threats_timestamp_id', 'threats', ['timestamp', 'id'], unique=False)
+    op.create_index('ix_threats_status_timestamp_id', 'threats', ['status', 'timestamp', 'id'], unique=False)
+    op.create_index('ix_threats_threat_type_timestamp_id', 'threats', ['threat_type', 'timestamp', 'id'], unique=False)
+    op.create_index('ix_threats_source_ip_timestamp_id', 'threats', ['source_ip', 'timestamp', 'id'], unique=False)
+
+def downgrade() -> None:
+    op.drop_index('ix_threats_source_ip_timestamp_id', table_name='threats')
+    op.drop_index('ix_threats_threat_type_timestamp_id', table_name='threats')
+    op.drop_index('ix_threats_status_timestamp_id', table_name='threats')
+    op.drop_index('ix_threats_timestamp_id', table_name='threats')
@@ -1,80 +1,195 @@
-from fastapi import APIRouter, HTTPException, Depends, Query
-from typing import List, Dict, Any
-from datetime import datetime, timedelta
-import random
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, List, Dict, Any, Optional
+from datetime import datetime
+import asyncio
+import json
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 
-from ...services.mock_data import generate_mock_alerts
+from ...db.session import get_db
+from ...models.alert import Alert
+from ...core.config import get_settings
+from ...core.response_cache import response_cache
+from ...services.alert_broadcaster import alert_broadcaster
+from ...services.alert_stats import alert_statistics, severity_label
+from ..pagination import NEXT_CURSOR_HEADER, keyset_page, split_page
 
 router = APIRouter()
+settings = get_settings()
+
+def _describe(alert: Alert) -> Dict[str, Any]:
+    """The stored alert plus the severity label of its threat"""
+    data = alert.to_dict()
+    data["severity"] = severity_label(alert.threat.severity if alert.threat is not None else None)
+    return data
 
 @router.get("/alerts", response_model=List[Dict[str, Any]])
 async def get_alerts(
+    response: Response,
     status: str = Query(None, enum=["new", "acknowledged", "resolved"]),
-    limit: int = 100,
-    skip: int = 0
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description=f"Value of the previous page's {NEXT_CURSOR_HEADER} header"),
+    skip: int = Query(0, ge=0, description="Offset paging; ignored when a cursor is given"),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get alerts, newest first, one keyset page at a time"""
+    query = select(Alert).options(selectinload(Alert.threat))
+    if status:
+        query = query.where(Alert.status == status)
+    query = keyset_page(query, Alert.timestamp, Alert.id, cursor, limit)
+    if skip and not cursor:
+        query = query.offset(skip)
+    rows = (await db.execute(query)).scalars().all()
+    alerts, next_cursor = split_page(rows, limit)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return [_describe(alert) for alert in alerts]
+
+# Stream routes are declared before /alerts/{alert_id} so "stream" is not read as an id
+@router.get("/alerts/stream")
+async def stream_alerts(
+    request: Request,
+    severity: Optional[List[str]] = Query(None, description="Only these severities (high, medium, low)"),
+    status: Optional[List[str]] = Query(None, description="Only alerts currently in these statuses")
+):
+    """Server-sent events for new alerts, repeat counts and alert status changes"""
+    subscription = alert_broadcaster.subscribe(severity, status)
+
+    async def events() -> AsyncIterator[str]:
+        try:
+            while True:
+                try:
+                    event = await asyncio.wait_for(
+                        subscription.get(), timeout=settings.ALERT_STREAM_KEEPALIVE_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": keepalive\n\n"
+                    continue
+                if event is None:
+                    break
+                yield f"event: {event['event']}\ndata: {json.dumps(event['alert'], default=str)}\n\n"
+        finally:
+            alert_broadcaster.unsubscribe(subscription)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.websocket("/alerts/ws")
+async def alerts_websocket(
+    websocket: WebSocket,
+    severity: Optional[List[str]] = Query(None),
+    status: Optional[List[str]] = Query(None)
 ):
-    """Get list of alerts with optional filtering"""
-    alert_data = generate_mock_alerts()
-    alerts = []
-    for i in range(limit):
-        alerts.append({
-            "id": i + 1,
-            "title": f"Alert {i + 1}",
-            "description": f"Mock alert description {i + 1}",
-            "severity": "high" if i % 3 == 0 else "medium" if i % 3 == 1 else "low",
-            "status": status if status else random.choice(["new", "acknowledged", "resolved"]),
-            "created_at": (datetime.now() - timedelta(hours=i)).isoformat(),
-            "updated_at": datetime.now().isoformat()
-        })
-    return alerts[skip:skip+limit]
+    """WebSocket stream of new alerts and alert status changes"""
+    await websocket.accept()
+    subscription = alert_broadcaster.subscribe(severity, status)
+    # Read the socket so a client that goes away is noticed even while no alerts arrive
+    disconnected = asyncio.ensure_future(_wait_for_disconnect(websocket))
+    try:
+        while True:
+            next_event = asyncio.ensure_future(subscription.get())
+            await asyncio.wait({next_event, disconnected}, return_when=asyncio.FIRST_COMPLETED)
+            if not next_event.done():
+                next_event.cancel()
+                break
+            event = next_event.result()
+            if event is None:
+                await websocket.close(code=1013)  # try again later: the client fell too far behind
+                break
+            await websocket.send_text(json.dumps(event, default=str))
+    except WebSocketDisconnect:
+        pass
+    finally:
+        disconnected.cancel()
+        alert_broadcaster.unsubscribe(subscription)
+
+async def _wait_for_disconnect(websocket: WebSocket) -> None:
+    """Discard client messages until the client disconnects"""
+    while True:
+        message = await websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            return
+
+@router.get("/alerts/stream/stats")
+async def get_stream_stats():
+    """Get alert stream subscriber and drop statistics"""
+    return alert_broadcaster.get_stats()
 
 @router.get("/alerts/{alert_id}")
-async def get_alert(alert_id: int):
-    """Get specific alert details"""
-    if alert_id < 1 or alert_id > 100:
+async def get_alert(alert_id: int, db: AsyncSession = Depends(get_db)):
+    """Get specific alert details, including its threat"""
+    alert = await db.get(Alert, alert_id, options=[selectinload(Alert.threat)])
+    if alert is None:
         raise HTTPException(status_code=404, detail="Alert not found")
-    
-    return {
-        "id": alert_id,
-        "title": f"Alert {alert_id}",
-        "description": f"Detailed mock alert description {alert_id}",
-        "severity": "high" if alert_id % 3 == 0 else "medium" if alert_id % 3 == 1 else "low",
-        "status": random.choice(["new", "acknowledged", "resolved"]),
-        "created_at": (datetime.now() - timedelta(hours=alert_id)).isoformat(),
-        "updated_at": datetime.now().isoformat(),
-        "details": {
-            "source_ip": f"192.168.1.{alert_id % 255}",
-            "destination_ip": f"10.0.0.{alert_id % 255}",
-            "protocol": random.choice(["TCP", "UDP", "HTTP", "HTTPS"]),
-            "port": random.randint(1, 65535)
-        }
-    }
+    data = _describe(alert)
+    data["threat"] = alert.threat.to_dict() if alert.threat is not None else None
+    return data
 
 
 @router.put("/alerts/{alert_id}/status")
 async def update_alert_status(
     alert_id: int,
-    status: str = Query(..., enum=["acknowledged", "resolved"])
+    status: str = Query(..., enum=["acknowledged", "resolved"]),
+    db: AsyncSession = Depends(get_db)
 ):
     """Update alert status"""
-    if alert_id < 1 or alert_id > 100:
-        raise HTTPException(status_code=404, detail="Alert not found")
+    await alert_statistics.ensure_loaded(db)
+    now = datetime.utcnow()
+    while True:
+        alert = await db.get(Alert, alert_id, options=[selectinload(Alert.threat)], populate_existing=True)
+        if alert is None:
+            raise HTTPException(status_code=404, detail="Alert not found")
+        old_status = alert.status
+        rollup_deltas = alert_statistics.transition_deltas(old_status, status, alert.timestamp, now)
+        if not rollup_deltas:
+            break
+        # Only a request that still sees the old status moves the counters; a
+        # concurrent transition makes this one re-read and start again
+        moved = await db.execute(
+            update(Alert)
+            .where(Alert.id == alert_id, Alert.status.is_not_distinct_from(old_status))
+            .values(status=status)
+            .execution_options(synchronize_session=False)
+        )
+        if moved.rowcount == 1:
+            # Counters move in the same transaction as the status change
+            await alert_statistics.persist(db, rollup_deltas)
+            await db.commit()
+            break
+        await db.rollback()
+
+    if rollup_deltas:
+        alert_statistics.apply(rollup_deltas)
+        response_cache.invalidate("alerts", "statistics")
+        # Same severity as the alert_created event, which is derived from the threat
+        event = _describe(alert)
+        event["status"] = status
+        alert_broadcaster.publish("alert_status_changed", event)
     
     return {
         "id": alert_id,
         "status": status,
-        "updated_at": datetime.now().isoformat(),
+        "updated_at": now.isoformat(),
         "message": "Alert status updated successfully"
     }
 
 @router.post("/alerts/{alert_id}/comment")
 async def add_alert_comment(
     alert_id: int,
-    comment: Dict[str, str]
+    comment: Dict[str, str],
+    db: AsyncSession = Depends(get_db)
 ):
     """Add comment to an alert"""
-    if alert_id < 1 or alert_id > 100:
+    if await db.get(Alert, alert_id) is None:
         raise HTTPException(status_code=404, detail="Alert not found")
+    response_cache.invalidate("alerts")
     
     return {
         "id": alert_id,
@@ -87,6 +202,13 @@ async def add_alert_comment(
     }
 
 @router.get("/statistics")
-async def get_alert_statistics():
-    """Get alert statistics"""
-    return generate_mock_alerts()
+async def get_alert_statistics(db: AsyncSession = Depends(get_db)):
+    """Get alert statistics from the incrementally maintained rollups.
+
+    Same top-level keys as before (``total``, ``by_status``, ``by_severity``,
+    ``response_metrics``) plus ``timeline`` and ``generated_at``. Response
+    times are ``null`` until an alert has been detected or responded to, and
+    ``false_positive_rate`` is always ``null``.
+    """
+    await alert_statistics.ensure_loaded(db)
+    return alert_statistics.snapshot()
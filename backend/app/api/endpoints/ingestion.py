@@ -1,14 +1,29 @@
 from fastapi import APIRouter, HTTPException, Depends
 from typing import Dict, List, Any
 from datetime import datetime
+import asyncio
 
 from ...ml.pipeline import ThreatDetectionPipeline
-from ...db.session import get_db, get_async_mongo_db
+from ...db.event_store import EventStore
+from ...db.session import get_async_mongo_db
+from ...core.config import get_settings
 
 router = APIRouter()
 pipeline = ThreatDetectionPipeline()
 
-@router.post("/ingest/network")
+async def require_ready() -> None:
+    """Hold ingestion back until the models are loaded"""
+    if pipeline.ready:
+        return
+    if not get_settings().MODEL_LOAD_ON_STARTUP:
+        # Lazy loading: the first requests wait while the models load off the event loop
+        await asyncio.shield(pipeline.start_warm_up(run_inference=False))
+        if pipeline.ready:
+            return
+    detail = f"Models failed to load: {pipeline.warmup_error}" if pipeline.warmup_error and not pipeline.warming_up else "Models are loading"
+    raise HTTPException(status_code=503, detail=detail, headers={"Retry-After": "5"})
+
+@router.post("/ingest/network", dependencies=[Depends(require_ready)])
 async def ingest_network_data(data: Dict[str, Any]):
     """Ingest network traffic data for analysis"""
     try:
@@ -18,13 +33,15 @@ async def ingest_network_data(data: Dict[str, Any]):
             "message": "Network data processed successfully",
             "result": result
         }
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=f"Invalid network data: {str(e)}")
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Error processing network data: {str(e)}"
         )
 
-@router.post("/ingest/logs")
+@router.post("/ingest/logs", dependencies=[Depends(require_ready)])
 async def ingest_logs(logs: List[str]):
     """Ingest log data for analysis"""
     try:
@@ -40,15 +57,15 @@ async def ingest_logs(logs: List[str]):
             detail=f"Error processing log data: {str(e)}"
         )
 
-@router.post("/ingest/batch")
+@router.post("/ingest/batch", dependencies=[Depends(require_ready)])
 async def ingest_batch_data(data: Dict[str, Any]):
     """Ingest batch data for analysis"""
     try:
         results = []
         if "network_data" in data:
-            for item in data["network_data"]:
-                result = await pipeline.process_network_data(item)
-                results.append(result)
+            for result in await pipeline.process_network_batch(data["network_data"]):
+                # Malformed events are reported individually; the rest are still processed
+                results.append({"error": str(result)} if isinstance(result, Exception) else result)
                 
         if "logs" in data:
             result = await pipeline.process_log_data(data["logs"])
@@ -64,3 +81,12 @@ async def ingest_batch_data(data: Dict[str, Any]):
             status_code=500,
             detail=f"Error processing batch data: {str(e)}"
         )
+
+@router.get("/ingest/stats")
+async def get_ingestion_stats():
+    """Get pipeline batching, executor and cascade statistics"""
+    stats = pipeline.get_stats()
+    raw_event_store = get_async_mongo_db()
+    if isinstance(raw_event_store, EventStore):
+        stats["raw_events"] = raw_event_store.get_stats()
+    return stats
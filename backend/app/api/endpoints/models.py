@@ -1,30 +1,39 @@
 from fastapi import APIRouter, HTTPException
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from datetime import datetime
 
-from ...services.mock_data import generate_mock_models
+from .ingestion import pipeline
+from ...core.response_cache import response_cache
 
 router = APIRouter()
 
-@router.get("/models", response_model=List[Dict[str, Any]])
+registry = pipeline.registry
+# Any hot swap changes what the model views report
+registry.add_listener(lambda name, version: response_cache.invalidate("models"))
+
+def _describe(model_name: str) -> Dict[str, Any]:
+    """Registry state plus model information for loaded models"""
+    info = registry.get_info(model_name)
+    if info["loaded"]:
+        info.update(registry.get(model_name).get_model_info())
+    return info
+
+@router.get("/models", response_model=Dict[str, Dict[str, Any]])
 async def list_models():
     """List all available models and their information"""
-    return generate_mock_models()
+    return {name: _describe(name) for name in registry.names}
 
 @router.get("/models/{model_name}")
 async def get_model_info(model_name: str):
     """Get specific model information"""
-    models = generate_mock_models()
-    for model in models:
-        if model['name'] == model_name:
-            return model
-    raise HTTPException(status_code=404, detail="Model not found")
-    return models[model_name].get_model_info()
+    if model_name not in registry.names:
+        raise HTTPException(status_code=404, detail="Model not found")
+    return _describe(model_name)
 
 @router.post("/models/{model_name}/train")
 async def train_model(model_name: str, training_data: Dict[str, Any]):
     """Train a specific model"""
-    if model_name not in models:
+    if model_name not in registry.names:
         raise HTTPException(status_code=404, detail="Model not found")
     
     try:
@@ -34,15 +43,27 @@ async def train_model(model_name: str, training_data: Dict[str, Any]):
         
         if not X:
             raise HTTPException(status_code=400, detail="No features provided")
+        reason = registry.untrainable_reason(model_name)
+        if reason:
+            raise HTTPException(status_code=400, detail=reason)
             
-        # Train the model
-        models[model_name].train(X, y)
+        # Train a fresh instance off the event loop, then swap it in as a new version
+        def build():
+            model = registry.create(model_name)
+            model.train(X, y)
+            return model
+        version = await registry.load_version(
+            model_name, build, pipeline.executor.run, source="trained"
+        )
         
         return {
             "status": "success",
             "message": f"Model {model_name} trained successfully",
-            "model_info": models[model_name].get_model_info()
+            "version": version.version,
+            "model_info": version.model.get_model_info()
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -52,13 +73,14 @@ async def train_model(model_name: str, training_data: Dict[str, Any]):
 @router.post("/models/{model_name}/predict")
 async def predict(model_name: str, data: Dict[str, Any]):
     """Make predictions using a specific model"""
-    if model_name not in models:
+    if model_name not in registry.names:
         raise HTTPException(status_code=404, detail="Model not found")
     
     try:
-        # Get predictions
-        predictions = models[model_name].predict(data["features"])
-        probabilities = models[model_name].predict_proba(data["features"])
+        # Requests in flight keep the version they started with
+        async with registry.use(model_name) as model:
+            predictions = await pipeline.executor.run(model.predict, data["features"])
+            probabilities = await pipeline.executor.run(model.predict_proba, data["features"])
         
         return {
             "predictions": predictions.tolist(),
@@ -71,13 +93,14 @@ async def predict(model_name: str, data: Dict[str, Any]):
         )
 
 @router.post("/models/{model_name}/save")
-async def save_model(model_name: str, path: str):
-    """Save model to disk"""
-    if model_name not in models:
+async def save_model(model_name: str, path: str, version: Optional[str] = None):
+    """Save the live model version to disk"""
+    if model_name not in registry.names:
         raise HTTPException(status_code=404, detail="Model not found")
     
     try:
-        models[model_name].save_model(path)
+        async with registry.use(model_name) as model:
+            await pipeline.executor.run(model.save_model, path, version)
         return {"status": "success", "message": f"Model {model_name} saved successfully"}
     except Exception as e:
         raise HTTPException(
@@ -87,13 +110,23 @@ async def save_model(model_name: str, path: str):
 
 @router.post("/models/{model_name}/load")
 async def load_model(model_name: str, path: str):
-    """Load model from disk"""
-    if model_name not in models:
+    """Load a model version from disk and hot-swap it in"""
+    if model_name not in registry.names:
         raise HTTPException(status_code=404, detail="Model not found")
     
     try:
-        models[model_name].load_model(path)
-        return {"status": "success", "message": f"Model {model_name} loaded successfully"}
+        def build():
+            model = registry.create(model_name)
+            model.load_model(path)
+            return model
+        version = await registry.load_version(
+            model_name, build, pipeline.executor.run, source=path
+        )
+        return {
+            "status": "success",
+            "message": f"Model {model_name} loaded successfully",
+            "version": version.version
+        }
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -1,23 +1,59 @@
-from fastapi import APIRouter, HTTPException, Query
-from typing import List, Dict, Any
+from fastapi import APIRouter, HTTPException, Query, Depends, Response
+from typing import List, Dict, Any, Optional
+from datetime import datetime
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from ...services.mock_data import generate_mock_threats
+from ...db.session import get_db
+from ...models.threat import Threat
+from ..pagination import NEXT_CURSOR_HEADER, keyset_page, split_page
 
 router = APIRouter()
 
 @router.get("/threats", response_model=List[Dict[str, Any]])
-async def get_threats(limit: int = Query(10, ge=1, le=100)):
-    """Get list of detected threats"""
-    return generate_mock_threats(limit)
+async def get_threats(
+    response: Response,
+    limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description=f"Value of the previous page's {NEXT_CURSOR_HEADER} header"),
+    status: Optional[str] = None,
+    threat_type: Optional[str] = None,
+    source_ip: Optional[str] = None,
+    min_severity: Optional[float] = None,
+    max_severity: Optional[float] = None,
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """Get detected threats, newest first, one keyset page at a time"""
+    query = select(Threat)
+    if status:
+        query = query.where(Threat.status == status)
+    if threat_type:
+        query = query.where(Threat.threat_type == threat_type)
+    if source_ip:
+        query = query.where(Threat.source_ip == source_ip)
+    if min_severity is not None:
+        query = query.where(Threat.severity >= min_severity)
+    if max_severity is not None:
+        query = query.where(Threat.severity <= max_severity)
+    if start_time:
+        query = query.where(Threat.timestamp >= start_time)
+    if end_time:
+        query = query.where(Threat.timestamp < end_time)
+
+    rows = (await db.execute(keyset_page(query, Threat.timestamp, Threat.id, cursor, limit))).scalars().all()
+    threats, next_cursor = split_page(rows, limit)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return [threat.to_dict() for threat in threats]
 
 @router.get("/threats/{threat_id}")
-async def get_threat(threat_id: str):
+async def get_threat(threat_id: int, db: AsyncSession = Depends(get_db)):
     """Get specific threat details"""
-    threats = generate_mock_threats(100)
-    for threat in threats:
-        if threat['id'] == threat_id:
-            return threat
-    raise HTTPException(status_code=404, detail="Threat not found")
+    threat = await db.get(Threat, threat_id)
+    if threat is None:
+        raise HTTPException(status_code=404, detail="Threat not found")
+    return threat.to_dict()
 
 @router.post("/threats/analyze")
 async def analyze_threat(data: Dict):
@@ -0,0 +1,32 @@
+from fastapi import APIRouter, HTTPException, Query
+from typing import Dict, Any
+
+from .ingestion import pipeline
+from ...ml.sketches import TrafficSketches
+
+router = APIRouter()
+
+def _sketches() -> TrafficSketches:
+    sketches = pipeline.feature_extractor.traffic_sketches
+    if sketches is None:
+        raise HTTPException(status_code=404, detail="Traffic sketches are disabled")
+    return sketches
+
+@router.get("/traffic/top-sources")
+async def get_top_sources(
+    limit: int = Query(10, ge=1, le=100),
+    by: str = Query("flows", pattern="^(flows|bytes)$")
+) -> Dict[str, Any]:
+    """Heaviest sources in the sketch window, estimated from count-min sketches"""
+    sketches = _sketches()
+    return {
+        "by": by,
+        "window": sketches.summary(),
+        "sources": sketches.top_sources(limit, by=by)
+    }
+
+@router.get("/traffic/summary")
+async def get_traffic_summary() -> Dict[str, Any]:
+    """Flow and byte totals and distinct source/destination counts for the sketch window"""
+    sketches = _sketches()
+    return {**sketches.summary(), **sketches.get_stats()}
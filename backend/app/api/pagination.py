@@ -0,0 +1,41 @@
+from typing import Any, List, Optional, Tuple
+from datetime import datetime
+import base64
+import json
+from fastapi import HTTPException
+from sqlalchemy import Select, tuple_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def encode_cursor(timestamp: datetime, row_id: int) -> str:
+    """Opaque cursor for the (timestamp, id) of the last row on a page"""
+    payload = json.dumps({"t": timestamp.isoformat(), "id": row_id}).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(payload["t"]), int(payload["id"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def keyset_page(query: Select, timestamp_column: Any, id_column: Any, cursor: Optional[str], limit: int) -> Select:
+    """Newest-first page of ``query`` starting after ``cursor``.
+
+    Rows are ordered by (timestamp, id) descending and the next page starts
+    strictly below the last row seen, so the database seeks through the
+    composite index instead of skipping OFFSET rows. One extra row is
+    fetched to tell whether another page exists.
+    """
+    if cursor:
+        timestamp, row_id = decode_cursor(cursor)
+        query = query.where(tuple_(timestamp_column, id_column) < tuple_(timestamp, row_id))
+    return query.order_by(timestamp_column.desc(), id_column.desc()).limit(limit + 1)
+
+def split_page(rows: List[Any], limit: int) -> Tuple[List[Any], Optional[str]]:
+    """Trim the extra row fetched by ``keyset_page`` and build the next cursor"""
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(rows[-1].timestamp, rows[-1].id)
@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from functools import lru_cache
 
 class Settings(BaseSettings):
@@ -12,11 +12,31 @@ class Settings(BaseSettings):
     POSTGRES_USER: str = "admin"
     POSTGRES_PASSWORD: str = "development_password"
     POSTGRES_DB: str = "threat_detection"
-    SQLALCHEMY_DATABASE_URI: str = "sqlite:///dev.db"
+    SQLALCHEMY_DATABASE_URI: Optional[str] = None  # overrides DATABASE_BACKEND when set
+    
+    # Database engine and connection pool
+    DATABASE_BACKEND: str = "sqlite"  # sqlite (local dev/tests) or postgres
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800  # seconds; -1 disables
+    DB_POOL_PRE_PING: bool = True
+    DB_ECHO: bool = False
+    DB_CREATE_TABLES: bool = False  # create tables on startup instead of running migrations
     
     # MongoDB
     MONGODB_URI: str = "mongodb://localhost:27017/threat_detection"
     
+    # Embedded raw-event store (used instead of MongoDB)
+    RAW_EVENT_STORE: str = "embedded"  # embedded or memory
+    RAW_EVENT_STORE_DIR: str = "data/raw_events"
+    RAW_EVENT_SEGMENT_MAX_DOCS: int = 50000
+    RAW_EVENT_TTL_HOURS: float = 168.0  # whole segments older than this are deleted; 0 keeps forever
+    RAW_EVENT_COMPRESSION_LEVEL: int = 6
+    RAW_EVENT_INDEXED_FIELDS: List[str] = [
+        "raw_data.source_ip", "raw_data.destination_ip", "source_ip", "destination_ip"
+    ]
+    
     # Security
     SECRET_KEY: str = "development_secret_key_please_change_in_production"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
@@ -24,6 +44,86 @@ class Settings(BaseSettings):
     # ML Model Settings
     MODEL_THRESHOLD: float = 0.8
     ANOMALY_DETECTION_INTERVAL: int = 300
+    MODEL_DIR: str = "ml_models"
+    MODEL_LOAD_ON_STARTUP: bool = True  # load in the background; otherwise on the first ingestion request
+    MODEL_WARMUP_INFERENCE: bool = True
+    NETWORK_ALLOWLIST: List[str] = []  # source IPs that skip detection
+    TREE_ENGINE_MAX_BATCH: int = 512  # larger batches use sklearn's native path
+    MODEL_ARTIFACT_MMAP: bool = True  # share artifact arrays across worker processes
+    MODEL_ARTIFACT_VERIFY: bool = True  # check artifact checksums on load
+    
+    # Sliding-window features per source/destination IP (widens the network
+    # feature vector, so retrain the network models after enabling)
+    NETWORK_WINDOW_FEATURES: bool = False
+    NETWORK_WINDOW_MAX_KEYS: int = 100000  # per direction; least recently seen keys are evicted
+    
+    # Traffic sketches (HyperLogLog / count-min, fixed memory) behind /traffic
+    TRAFFIC_SKETCHES_ENABLED: bool = True
+    TRAFFIC_SKETCH_WINDOW_SECONDS: float = 60.0
+    TRAFFIC_SKETCH_BUCKETS: int = 6
+    TRAFFIC_SKETCH_TOP_K: int = 100  # heavy-hitter candidates kept per bucket
+    NETWORK_SKETCH_FEATURES: bool = False  # append sketch estimates to network features (retrain after enabling)
+    
+    # Log vectorization
+    LOG_VECTORIZER_MODE: str = "hashing"  # hashing or vocabulary
+    LOG_VECTORIZER_N_FEATURES: int = 1024
+    
+    # Log analyzer (LOG_ANALYZER_MODEL may be a local path for offline use)
+    LOG_ANALYZER_MODEL: str = "bert-base-uncased"
+    LOG_ANALYZER_MODE: str = "pipeline"  # pipeline or optimized
+    LOG_ANALYZER_BATCH_SIZE: int = 32
+    LOG_ANALYZER_MAX_LENGTH: int = 128
+    LOG_ANALYZER_QUANTIZE: bool = False
+    LOG_ANALYZER_LOCAL_FILES_ONLY: bool = False
+    LOG_ANALYZER_BACKEND: str = "bert"  # bert, linear or cascade
+    LOG_ANALYZER_ESCALATION_THRESHOLD: float = 0.8
+    
+    # Log template cache
+    LOG_TEMPLATE_CACHE_SIZE: int = 10000
+    LOG_TEMPLATE_SIMILARITY: float = 0.9
+    
+    # Inference micro-batching
+    INFERENCE_BATCH_MAX_SIZE: int = 256
+    INFERENCE_BATCH_MAX_WAIT_MS: float = 2.0
+    
+    # Inference executor
+    INFERENCE_THREAD_WORKERS: int = 4
+    INFERENCE_PROCESS_WORKERS: int = 2
+    LOG_INFERENCE_MODE: str = "thread"  # thread or process
+    
+    # Write-behind threat persistence
+    PERSISTENCE_QUEUE_SIZE: int = 10000
+    PERSISTENCE_BATCH_SIZE: int = 500
+    PERSISTENCE_FLUSH_INTERVAL_MS: float = 50.0
+    PERSISTENCE_MAX_RETRIES: int = 5  # per batch, before its detections are dropped
+    PERSISTENCE_RETRY_BACKOFF_MS: float = 100.0  # doubled after each failed attempt
+    
+    # Alert suppression: repeats of (threat_type, source_ip, destination_ip) within
+    # the window update the first alert's occurrence_count instead of adding alerts
+    ALERT_SUPPRESSION_ENABLED: bool = True
+    ALERT_SUPPRESSION_WINDOW_SECONDS: float = 300.0
+    ALERT_SUPPRESSION_MAX_KEYS: int = 100000
+    ALERT_SUPPRESSION_FLUSH_INTERVAL_MS: float = 1000.0
+    
+    # Alert statistics rollups (buckets kept per granularity)
+    ALERT_ROLLUP_MINUTE_BUCKETS: int = 120
+    ALERT_ROLLUP_HOUR_BUCKETS: int = 168
+    ALERT_ROLLUP_DAY_BUCKETS: int = 90
+    ALERT_STATS_RELOAD_SECONDS: float = 5.0  # re-read rollups written by other workers
+    
+    # Alert streaming (SSE/WebSocket)
+    ALERT_STREAM_QUEUE_SIZE: int = 256  # per subscriber
+    ALERT_STREAM_DROP_POLICY: str = "oldest"  # oldest, newest or disconnect
+    ALERT_STREAM_KEEPALIVE_SECONDS: float = 15.0
+    
+    # Response cache for read endpoints (ETag / If-None-Match)
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_MAX_ENTRIES: int = 1024
+    RESPONSE_CACHE_TTL_SECONDS: float = 5.0
+    RESPONSE_CACHE_MAX_BODY_BYTES: int = 1048576
+    
+    # Prometheus metrics
+    METRICS_ENABLED: bool = True
     
     # SIEM Integration
     WAZUH_CONFIG: Dict[str, Any] = {
@@ -0,0 +1,171 @@
+"""Prometheus instrumentation.
+
+Label values are always drawn from small fixed sets -- route templates,
+stage, model and queue names, threat types -- never from request data, so
+the number of series stays constant however much traffic is ingested.
+
+With ``METRICS_ENABLED`` off every metric below is a no-op stand-in, so
+nothing is recorded and ``/metrics`` is not served.
+
+Under several worker processes, set ``PROMETHEUS_MULTIPROC_DIR`` to an empty
+directory before the workers start (prometheus_client reads it at import):
+every worker then writes its values there and ``/metrics`` reports the sum
+over all of them.
+"""
+from typing import Callable, Dict, Optional
+import logging
+import os
+import threading
+import time
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess
+)
+
+from .config import get_settings
+
+logger = logging.getLogger(__name__)
+
+ENABLED = get_settings().METRICS_ENABLED
+MULTIPROCESS_DIR = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+# How often each worker samples its queue depths in multiprocess mode
+QUEUE_SAMPLE_SECONDS = 1.0
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 2048, 4096)
+
+class _DisabledMetric:
+    """Accepts every metric call and records nothing"""
+
+    def labels(self, *args, **kwargs) -> "_DisabledMetric":
+        return self
+
+    def inc(self, *args, **kwargs) -> None:
+        pass
+
+    observe = set = set_function = inc
+
+def _metric(kind, *args, **kwargs):
+    return kind(*args, **kwargs) if ENABLED else _DisabledMetric()
+
+HTTP_REQUEST_SECONDS = _metric(
+    Histogram, "http_request_duration_seconds", "HTTP request latency by route template",
+    ["method", "route", "status"], buckets=LATENCY_BUCKETS
+)
+PIPELINE_STAGE_SECONDS = _metric(
+    Histogram, "pipeline_stage_duration_seconds", "Time spent in each detection pipeline stage per batch",
+    ["pipeline", "stage"], buckets=LATENCY_BUCKETS
+)
+PIPELINE_STAGE_ROWS = _metric(
+    Counter, "pipeline_stage_rows_total", "Rows entering each detection pipeline stage",
+    ["pipeline", "stage"]
+)
+BATCH_SIZE = _metric(
+    Histogram, "pipeline_batch_size", "Items per flushed batch", ["batcher"], buckets=SIZE_BUCKETS
+)
+QUEUE_DEPTH = _metric(
+    Gauge, "pipeline_queue_depth", "Items waiting in a pipeline queue", ["queue"],
+    multiprocess_mode="livesum"
+)
+MODEL_INFERENCE_ROWS = _metric(
+    Counter, "model_inference_rows_total", "Rows scored by each model", ["model"]
+)
+MODEL_INFERENCE_SECONDS = _metric(
+    Counter, "model_inference_seconds_total", "Time spent scoring rows by each model", ["model"]
+)
+DETECTIONS = _metric(
+    Counter, "detections_total", "Detections queued for persistence by threat type", ["threat_type"]
+)
+ALERTS_SUPPRESSED = _metric(
+    Counter, "alerts_suppressed_total", "Detections folded into an existing alert by threat type", ["threat_type"]
+)
+PERSISTENCE_FLUSH_SECONDS = _metric(
+    Histogram, "persistence_flush_duration_seconds", "Write-behind flush latency", buckets=LATENCY_BUCKETS
+)
+
+def observe_inference(model: str, rows: int, seconds: float) -> None:
+    """Record a scoring call; rate(rows) / rate(seconds) gives rows per second"""
+    MODEL_INFERENCE_ROWS.labels(model=model).inc(rows)
+    MODEL_INFERENCE_SECONDS.labels(model=model).inc(seconds)
+
+_sampled_queues: Dict[str, Callable[[], float]] = {}
+_sampler: Optional[threading.Thread] = None
+
+def track_queue(name: str, depth: Callable[[], float]) -> None:
+    """Report ``depth()`` as the queue's depth at scrape time"""
+    if not ENABLED:
+        return
+    if not MULTIPROCESS_DIR:
+        QUEUE_DEPTH.labels(queue=name).set_function(depth)
+        return
+    # Callbacks only run in the scraping process, so every worker samples its own
+    global _sampler
+    _sampled_queues[name] = depth
+    if _sampler is None:
+        _sampler = threading.Thread(target=_sample_queues, name="queue-depth-sampler", daemon=True)
+        _sampler.start()
+
+def _sample_queues() -> None:
+    while True:
+        for name, depth in list(_sampled_queues.items()):
+            try:
+                QUEUE_DEPTH.labels(queue=name).set(depth())
+            except Exception as e:
+                logger.debug(f"Error sampling queue {name}: {str(e)}")
+        time.sleep(QUEUE_SAMPLE_SECONDS)
+
+def route_template(scope) -> str:
+    """Template of the matched route (e.g. ``/api/v1/threats/threats/{threat_id}``)"""
+    route = scope.get("route")
+    template = getattr(route, "path", None)
+    if template is None:
+        return "<unmatched>"
+    path = scope["path"]
+    regex = getattr(route, "path_regex", None)
+    if regex is None or regex.match(path):
+        return template
+    # Routes from included routers may only know their path below the prefix
+    for i in range(1, len(path)):
+        if path[i] == "/" and regex.match(path[i:]):
+            return path[:i] + template
+    return template
+
+def render_metrics():
+    if MULTIPROCESS_DIR:
+        # Aggregate the values every worker wrote to the shared directory
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
+
+def mark_process_dead() -> None:
+    """Drop this worker's live gauges from the multiprocess aggregate"""
+    if MULTIPROCESS_DIR:
+        multiprocess.mark_process_dead(os.getpid())
+
+class PrometheusMiddleware:
+    """ASGI middleware timing requests by the matched route template"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # The router records the matched route in the scope
+            HTTP_REQUEST_SECONDS.labels(
+                method=scope["method"],
+                route=route_template(scope),
+                status=str(status["code"])
+            ).observe(time.perf_counter() - start)
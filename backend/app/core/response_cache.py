@@ -0,0 +1,209 @@
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from collections import OrderedDict
+from urllib.parse import parse_qsl, urlencode
+import hashlib
+import logging
+import re
+import time
+
+from .config import get_settings
+
+logger = logging.getLogger(__name__)
+
+Headers = List[Tuple[bytes, bytes]]
+
+class CacheRule:
+    """GET paths matching ``pattern`` are cached under ``tags`` for ``ttl`` seconds"""
+
+    def __init__(self, pattern: str, tags: Iterable[str], ttl: Optional[float] = None):
+        self.pattern = re.compile(pattern)
+        self.tags = tuple(tags)
+        self.ttl = ttl
+
+class CacheEntry:
+    def __init__(self, status: int, headers: Headers, body: bytes, etag: str, expires_at: float, tags: Tuple[str, ...]):
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.etag = etag
+        self.expires_at = expires_at
+        self.tags = tags
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison as used for If-None-Match"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    return any((value[2:] if value.startswith("W/") else value) == etag for value in candidates)
+
+class ResponseCache:
+    """Size-bounded LRU of rendered responses with TTLs and tag invalidation.
+
+    Each tag has a generation counter. A response is only stored if none of
+    its tags were invalidated while it was being computed, so a write racing
+    with a read cannot leave a stale entry behind.
+    """
+
+    def __init__(self, max_entries: int = 1024, default_ttl: float = 5.0, max_body_bytes: int = 1 << 20,
+                 enabled: bool = True):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.max_body_bytes = max_body_bytes
+        self.enabled = enabled
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        entry = self._entries.get(key)
+        if entry is None or entry.expires_at <= time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def generations(self, tags: Iterable[str]) -> Tuple[int, ...]:
+        return tuple(self._generations.get(tag, 0) for tag in tags)
+
+    def put(self, key: str, entry: CacheEntry, generations: Tuple[int, ...]) -> None:
+        if self.generations(entry.tags) != generations or len(entry.body) > self.max_body_bytes:
+            return
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, *tags: str) -> None:
+        """Drop every entry carrying any of ``tags``"""
+        for tag in tags:
+            self._generations[tag] = self._generations.get(tag, 0) + 1
+        stale = [key for key, entry in self._entries.items() if set(entry.tags) & set(tags)]
+        for key in stale:
+            del self._entries[key]
+        self.invalidations += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "not_modified": self.not_modified,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations
+        }
+
+class ResponseCacheMiddleware:
+    """ASGI middleware serving cached GET responses with ETag/If-None-Match"""
+
+    def __init__(self, app, cache: "ResponseCache", rules: List[CacheRule]):
+        self.app = app
+        self.cache = cache
+        self.rules = rules
+
+    def _match(self, path: str) -> Optional[CacheRule]:
+        for rule in self.rules:
+            if rule.pattern.fullmatch(path):
+                return rule
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET" or not self.cache.enabled:
+            return await self.app(scope, receive, send)
+        rule = self._match(scope["path"])
+        if rule is None:
+            return await self.app(scope, receive, send)
+
+        query = urlencode(sorted(parse_qsl(scope.get("query_string", b"").decode(), keep_blank_values=True)))
+        key = f"{scope['path']}?{query}"
+        request_headers = dict(scope["headers"])
+        if_none_match = request_headers.get(b"if-none-match", b"").decode() or None
+
+        entry = self.cache.get(key)
+        if entry is not None:
+            await self._send(send, entry.status, entry.headers, entry.body, entry.etag, if_none_match, b"HIT")
+            return
+
+        generations = self.cache.generations(rule.tags)
+        start: Dict[str, Any] = {}
+        chunks: List[bytes] = []
+        passthrough = False
+
+        async def capture(message):
+            nonlocal passthrough
+            if message["type"] == "http.response.start":
+                content_type = dict(message.get("headers", [])).get(b"content-type", b"")
+                if message["status"] != 200 or content_type.startswith(b"text/event-stream"):
+                    # Errors and streams go straight through uncached
+                    passthrough = True
+                    await send(message)
+                else:
+                    start.update(message)
+            elif passthrough:
+                await send(message)
+            else:
+                chunks.append(message.get("body", b""))
+
+        await self.app(scope, receive, capture)
+        if passthrough or not start:
+            return
+
+        body = b"".join(chunks)
+        etag = make_etag(body)
+        headers = [
+            (name, value) for name, value in start.get("headers", [])
+            if name.lower() not in (b"content-length", b"etag", b"cache-control")
+        ]
+        self.cache.put(
+            key,
+            CacheEntry(200, headers, body, etag, time.monotonic() + (rule.ttl or self.cache.default_ttl), rule.tags),
+            generations
+        )
+        await self._send(send, 200, headers, body, etag, if_none_match, b"MISS")
+
+    async def _send(self, send, status: int, headers: Headers, body: bytes, etag: str,
+                    if_none_match: Optional[str], cache_status: bytes) -> None:
+        common = [
+            (b"etag", etag.encode()),
+            # Clients may keep the body but must revalidate with If-None-Match
+            (b"cache-control", b"no-cache"),
+            (b"x-cache", cache_status)
+        ]
+        if etag_matches(if_none_match, etag):
+            self.cache.not_modified += 1
+            await send({"type": "http.response.start", "status": 304, "headers": common})
+            await send({"type": "http.response.body", "body": b""})
+            return
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": headers + common + [(b"content-length", str(len(body)).encode())]
+        })
+        await send({"type": "http.response.body", "body": body})
+
+settings = get_settings()
+response_cache = ResponseCache(
+    max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES,
+    default_ttl=settings.RESPONSE_CACHE_TTL_SECONDS,
+    max_body_bytes=settings.RESPONSE_CACHE_MAX_BODY_BYTES,
+    enabled=settings.RESPONSE_CACHE_ENABLED
+)
@@ -0,0 +1,62 @@
+from typing import Any, Dict, Iterator, List
+from contextlib import contextmanager
+from datetime import datetime
+import importlib
+import logging
+import sys
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+class StartupProfiler:
+    """Record how long imports and model loads take during startup"""
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.entries: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def measure(self, kind: str, name: str) -> Iterator[None]:
+        """Time a block and record it under ``kind`` (import, model, warmup)"""
+        start = time.perf_counter()
+        error = None
+        try:
+            yield
+        except Exception as e:
+            error = str(e)
+            raise
+        finally:
+            self.record(kind, name, time.perf_counter() - start, error=error)
+
+    def record(self, kind: str, name: str, seconds: float, **details: Any) -> None:
+        entry = {"kind": kind, "name": name, "seconds": round(seconds, 4)}
+        entry.update({key: value for key, value in details.items() if value is not None})
+        with self._lock:
+            self.entries.append(entry)
+        logger.info(f"Startup {kind} {name}: {seconds:.3f}s")
+
+    def import_module(self, module_name: str) -> Any:
+        """Import a module and record its import time"""
+        if module_name in sys.modules:
+            self.record("import", module_name, 0.0, cached=True)
+            return sys.modules[module_name]
+        with self.measure("import", module_name):
+            return importlib.import_module(module_name)
+
+    def report(self) -> Dict[str, Any]:
+        """Summarize recorded timings by kind"""
+        with self._lock:
+            entries = list(self.entries)
+        totals: Dict[str, float] = {}
+        for entry in entries:
+            totals[entry["kind"]] = round(totals.get(entry["kind"], 0.0) + entry["seconds"], 4)
+        return {
+            "generated_at": datetime.now().isoformat(),
+            "uptime_seconds": round(time.perf_counter() - self.started_at, 4),
+            "totals": totals,
+            "entries": entries
+        }
+
+startup_profiler = StartupProfiler()
@@ -0,0 +1,488 @@
+"""Embedded raw-event store used when no MongoDB is available.
+
+Each collection is a directory of segments::
+
+    00000001.seg    append-only blocks: header + zlib-compressed JSON lines
+    00000001.idx    sidecar written when the segment is sealed: block
+                    offsets, hash indexes and write times
+
+    counters.json   next document and segment ids, kept once segments expire
+    .lock           advisory lock shared by the processes using the directory
+
+Every ``insert_many`` call appends one block to the active segment. Once the
+segment reaches ``segment_max_docs`` documents it is sealed and a new one is
+started. Document ids are sequential, so an id is located by bisecting the
+segment and block start ids; secondary fields are looked up through per-
+segment hash indexes. Expired data is removed a whole segment at a time.
+
+Several processes (e.g. API workers) may share a directory: writes hold an
+exclusive ``flock`` on ``.lock`` while allocating ids and appending, reads
+hold a shared one, and each first catches up with the blocks and segments
+other processes have written, sealed or deleted since.
+"""
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from bisect import bisect_right
+from collections import OrderedDict
+from contextlib import contextmanager
+import asyncio
+import json
+import logging
+import os
+import struct
+import threading
+import time
+import zlib
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows: one process per directory
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+BLOCK_HEADER = struct.Struct("<QII")  # first id, document count, compressed length
+SEGMENT_SUFFIX = ".seg"
+INDEX_SUFFIX = ".idx"
+COUNTERS_NAME = "counters.json"
+LOCK_NAME = ".lock"
+# Longest time between expiry checks of a collection that is read or written
+PURGE_INTERVAL_SECONDS = 60.0
+
+def get_field(document: Dict[str, Any], path: str) -> Any:
+    """Read a dotted field path such as ``raw_data.source_ip``"""
+    value: Any = document
+    for key in path.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+def matches(document: Dict[str, Any], query: Dict[str, Any]) -> bool:
+    return all(get_field(document, key) == value for key, value in query.items())
+
+def _index_key(value: Any) -> Optional[str]:
+    """Hash index key for a scalar field value"""
+    if value is None or isinstance(value, (dict, list)):
+        return None
+    return json.dumps(value)
+
+class Segment:
+    """Block offsets, hash indexes and write times of one segment file"""
+
+    def __init__(self, segment_id: int, path: str):
+        self.segment_id = segment_id
+        self.path = path
+        self.block_ids: List[int] = []
+        self.block_offsets: List[int] = []
+        self.count = 0
+        self.size = 0
+        self.created_at = time.time()
+        self.last_write_at = self.created_at
+        self.sealed = False
+        self.indexes: Dict[str, Dict[str, List[int]]] = {}
+
+    @property
+    def first_id(self) -> Optional[int]:
+        return self.block_ids[0] if self.block_ids else None
+
+    def contains(self, doc_id: int) -> bool:
+        return bool(self.block_ids) and self.block_ids[0] <= doc_id < self.block_ids[0] + self.count
+
+    def add_block(self, first_id: int, offset: int, documents: List[Dict[str, Any]], indexed_fields: List[str]) -> None:
+        self.block_ids.append(first_id)
+        self.block_offsets.append(offset)
+        for position, document in enumerate(documents):
+            for field in indexed_fields:
+                key = _index_key(get_field(document, field))
+                if key is not None:
+                    self.indexes.setdefault(field, {}).setdefault(key, []).append(first_id + position)
+        self.count += len(documents)
+        self.last_write_at = time.time()
+
+    def locate(self, doc_id: int) -> Tuple[int, int]:
+        """Get the block offset and position of a document id"""
+        block = bisect_right(self.block_ids, doc_id) - 1
+        return self.block_offsets[block], doc_id - self.block_ids[block]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "segment_id": self.segment_id,
+            "count": self.count,
+            "size": self.size,
+            "created_at": self.created_at,
+            "last_write_at": self.last_write_at,
+            "blocks": list(zip(self.block_ids, self.block_offsets)),
+            "indexes": self.indexes
+        }
+
+    @classmethod
+    def from_dict(cls, path: str, data: Dict[str, Any]) -> "Segment":
+        segment = cls(data["segment_id"], path)
+        segment.block_ids = [block[0] for block in data["blocks"]]
+        segment.block_offsets = [block[1] for block in data["blocks"]]
+        segment.count = data["count"]
+        segment.size = data["size"]
+        segment.created_at = data["created_at"]
+        segment.last_write_at = data["last_write_at"]
+        segment.indexes = data["indexes"]
+        segment.sealed = True
+        return segment
+
+class EventCollection:
+    """A collection of raw documents stored as compressed, indexed segments"""
+
+    def __init__(
+        self,
+        directory: str,
+        indexed_fields: List[str],
+        segment_max_docs: int = 50000,
+        ttl_seconds: float = 0.0,
+        compression_level: int = 6,
+        block_cache_size: int = 64
+    ):
+        self.directory = directory
+        self.indexed_fields = list(indexed_fields)
+        self.segment_max_docs = max(1, segment_max_docs)
+        self.ttl_seconds = ttl_seconds
+        self.compression_level = compression_level
+        self.block_cache_size = block_cache_size
+        self._block_cache: "OrderedDict[Tuple[int, int], List[Dict[str, Any]]]" = OrderedDict()
+        self._segments: List[Segment] = []
+        self._next_id = 0
+        self._last_segment_id = 0
+        self._lock = threading.RLock()
+        self._purged_at = 0.0
+        os.makedirs(directory, exist_ok=True)
+        self._lock_file = open(os.path.join(directory, LOCK_NAME), "a+")
+        with self._locked(exclusive=True):
+            self._refresh(repair=True)
+
+    def _segment_path(self, segment_id: int, suffix: str = SEGMENT_SUFFIX) -> str:
+        return os.path.join(self.directory, f"{segment_id:08d}{suffix}")
+
+    @contextmanager
+    def _locked(self, exclusive: bool) -> Iterator[None]:
+        """Hold the thread lock and the directory's file lock (not reentrant)"""
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+    def _refresh(self, repair: bool = False) -> None:
+        """Catch up with the segments on disk, which other processes may have changed.
+
+        Loads new segments, new blocks of unsealed ones and sidecar indexes of
+        newly sealed ones, and forgets deleted segments. ``repair`` truncates a
+        torn trailing block and needs the exclusive lock.
+        """
+        on_disk = sorted(
+            int(name[:-len(SEGMENT_SUFFIX)]) for name in os.listdir(self.directory)
+            if name.endswith(SEGMENT_SUFFIX)
+        )
+        counters_path = os.path.join(self.directory, COUNTERS_NAME)
+        if os.path.exists(counters_path):
+            with open(counters_path) as f:
+                counters = json.load(f)
+            self._next_id = max(self._next_id, counters["next_id"])
+            self._last_segment_id = max(self._last_segment_id, counters["last_segment_id"])
+        if on_disk:
+            self._last_segment_id = max(self._last_segment_id, on_disk[-1])
+        present = set(on_disk)
+        for segment in [segment for segment in self._segments if segment.segment_id not in present]:
+            self._forget(segment)
+        known = {segment.segment_id: segment for segment in self._segments}
+        for segment_id in on_disk:
+            segment = known.get(segment_id)
+            if segment is not None and segment.sealed:
+                continue
+            path = self._segment_path(segment_id)
+            index_path = self._segment_path(segment_id, INDEX_SUFFIX)
+            if os.path.exists(index_path):
+                with open(index_path) as f:
+                    loaded = Segment.from_dict(path, json.load(f))
+                if segment is not None:
+                    self._segments[self._segments.index(segment)] = loaded
+                else:
+                    self._segments.append(loaded)
+                segment = loaded
+            else:
+                if segment is None:
+                    segment = Segment(segment_id, path)
+                    segment.created_at = os.path.getmtime(path)
+                    self._segments.append(segment)
+                self._scan_segment(segment, repair=repair)
+            if segment.count:
+                self._next_id = max(self._next_id, segment.first_id + segment.count)
+        self._segments.sort(key=lambda segment: segment.segment_id)
+
+    def _forget(self, segment: Segment) -> None:
+        self._segments.remove(segment)
+        for key in [key for key in self._block_cache if key[0] == segment.segment_id]:
+            del self._block_cache[key]
+
+    def _scan_segment(self, segment: Segment, repair: bool = False) -> None:
+        """Read the blocks appended to an unsealed segment since it was last scanned"""
+        path = segment.path
+        offset = segment.size
+        with open(path, "rb+" if repair else "rb") as f:
+            f.seek(offset)
+            while True:
+                header = f.read(BLOCK_HEADER.size)
+                if len(header) < BLOCK_HEADER.size:
+                    break
+                first_id, count, length = BLOCK_HEADER.unpack(header)
+                payload = f.read(length)
+                try:
+                    documents = self._decode(payload)
+                except (zlib.error, ValueError):
+                    break
+                if len(documents) != count:
+                    break
+                segment.add_block(first_id, offset, documents, self.indexed_fields)
+                offset = f.tell()
+            if repair and offset < os.path.getsize(path):
+                logger.warning(f"Truncating torn block at offset {offset} in {path}")
+                f.truncate(offset)
+        if offset != segment.size:
+            segment.size = offset
+            segment.last_write_at = os.path.getmtime(path)
+
+    def _decode(self, payload: bytes) -> List[Dict[str, Any]]:
+        return [json.loads(line) for line in zlib.decompress(payload).split(b"\n")]
+
+    def _active_segment(self) -> Segment:
+        if not self._segments or self._segments[-1].sealed:
+            # Never reuse the number of an expired segment another process may still know
+            self._last_segment_id += 1
+            segment_id = self._last_segment_id
+            self._segments.append(Segment(segment_id, self._segment_path(segment_id)))
+        return self._segments[-1]
+
+    def _seal(self, segment: Segment) -> None:
+        """Write the sidecar index; the segment file is never appended to again"""
+        index_path = self._segment_path(segment.segment_id, INDEX_SUFFIX)
+        with open(f"{index_path}.tmp", "w") as f:
+            json.dump(segment.to_dict(), f)
+        os.replace(f"{index_path}.tmp", index_path)
+        segment.sealed = True
+
+    def write(self, documents: List[Dict[str, Any]]) -> List[str]:
+        """Append documents as one compressed block and return their ids"""
+        if not documents:
+            return []
+        with self._locked(exclusive=True):
+            self._refresh()
+            segment = self._active_segment()
+            first_id = self._next_id
+            stored = [dict(document, _id=str(first_id + i)) for i, document in enumerate(documents)]
+            payload = zlib.compress(
+                b"\n".join(json.dumps(document, default=str).encode() for document in stored),
+                self.compression_level
+            )
+            with open(segment.path, "ab") as f:
+                f.write(BLOCK_HEADER.pack(first_id, len(stored), len(payload)))
+                f.write(payload)
+            offset = segment.size
+            segment.size += BLOCK_HEADER.size + len(payload)
+            segment.add_block(first_id, offset, stored, self.indexed_fields)
+            self._next_id += len(stored)
+
+            if segment.count >= self.segment_max_docs:
+                self._seal(segment)
+                self._purge(time.time())
+            elif self._purge_due():
+                self._purge(time.time())
+            return [document["_id"] for document in stored]
+
+    def _read_block(self, segment: Segment, offset: int) -> List[Dict[str, Any]]:
+        key = (segment.segment_id, offset)
+        if key in self._block_cache:
+            self._block_cache.move_to_end(key)
+            return self._block_cache[key]
+        with open(segment.path, "rb") as f:
+            f.seek(offset)
+            _, _, length = BLOCK_HEADER.unpack(f.read(BLOCK_HEADER.size))
+            documents = self._decode(f.read(length))
+        self._block_cache[key] = documents
+        while len(self._block_cache) > self.block_cache_size:
+            self._block_cache.popitem(last=False)
+        return documents
+
+    def _read_document(self, segment: Segment, doc_id: int) -> Dict[str, Any]:
+        offset, position = segment.locate(doc_id)
+        return self._read_block(segment, offset)[position]
+
+    def _candidates(self, segment: Segment, query: Dict[str, Any]) -> Optional[List[int]]:
+        """Ids that may match using the id lookup or hash indexes; None means scan"""
+        if "_id" in query:
+            try:
+                doc_id = int(query["_id"])
+            except (TypeError, ValueError):
+                return []
+            return [doc_id] if segment.contains(doc_id) else []
+
+        candidates: Optional[set] = None
+        for field, value in query.items():
+            if field not in self.indexed_fields:
+                continue
+            key = _index_key(value)
+            ids = set(segment.indexes.get(field, {}).get(key, [])) if key is not None else set()
+            candidates = ids if candidates is None else candidates & ids
+        return sorted(candidates) if candidates is not None else None
+
+    def read(self, query: Dict[str, Any], limit: int = 0) -> List[Dict[str, Any]]:
+        """Find documents equal to ``query`` on every (dotted) field"""
+        if self._purge_due():
+            self.purge_expired()
+        results: List[Dict[str, Any]] = []
+        with self._locked(exclusive=False):
+            self._refresh()
+            for segment in list(self._segments):
+                if not segment.count:
+                    continue
+                candidates = self._candidates(segment, query)
+                if candidates is None:
+                    documents = (
+                        document
+                        for offset in segment.block_offsets
+                        for document in self._read_block(segment, offset)
+                    )
+                else:
+                    documents = (self._read_document(segment, doc_id) for doc_id in candidates)
+                for document in documents:
+                    if matches(document, query):
+                        results.append(document)
+                        if limit and len(results) >= limit:
+                            return results
+        return results
+
+    def _purge_due(self) -> bool:
+        interval = min(self.ttl_seconds, PURGE_INTERVAL_SECONDS)
+        return bool(self.ttl_seconds) and time.time() - self._purged_at >= interval
+
+    def purge_expired(self, now: Optional[float] = None) -> int:
+        """Delete segments whose newest document is older than the TTL.
+
+        Runs on its own after a seal and, at most every
+        ``PURGE_INTERVAL_SECONDS``, on a read or write, so collections that
+        rarely fill a segment still expire.
+        """
+        if not self.ttl_seconds:
+            return 0
+        with self._locked(exclusive=True):
+            self._refresh()
+            return self._purge(now or time.time())
+
+    def _purge(self, now: float) -> int:
+        """``purge_expired`` with the exclusive lock held and segments refreshed"""
+        self._purged_at = time.time()
+        if not self.ttl_seconds:
+            return 0
+        cutoff = now - self.ttl_seconds
+        active = self._segments[-1] if self._segments else None
+        if active is not None and not active.sealed and active.count and active.last_write_at < cutoff:
+            # Idle past the TTL: nothing more is appended to it
+            self._seal(active)
+        expired = [
+            segment for segment in self._segments
+            if segment.sealed and segment.last_write_at < cutoff
+        ]
+        if not expired:
+            return 0
+        # Ids must keep increasing once their segments are gone
+        counters_path = os.path.join(self.directory, COUNTERS_NAME)
+        with open(f"{counters_path}.tmp", "w") as f:
+            json.dump({"next_id": self._next_id, "last_segment_id": self._last_segment_id}, f)
+        os.replace(f"{counters_path}.tmp", counters_path)
+        for segment in expired:
+            for path in (segment.path, self._segment_path(segment.segment_id, INDEX_SUFFIX)):
+                if os.path.exists(path):
+                    os.remove(path)
+            self._forget(segment)
+        logger.info(f"Removed {len(expired)} expired segments from {self.directory}")
+        return len(expired)
+
+    def close(self) -> None:
+        """Seal the active segment so the next start does not need to rescan it"""
+        with self._locked(exclusive=True):
+            self._refresh()
+            if self._segments and not self._segments[-1].sealed and self._segments[-1].count:
+                self._seal(self._segments[-1])
+
+    async def insert_one(self, document: Dict[str, Any]):
+        inserted_ids = await asyncio.to_thread(self.write, [document])
+        return type('InsertOneResult', (), {'inserted_id': inserted_ids[0]})()
+
+    async def insert_many(self, documents: List[Dict[str, Any]]):
+        inserted_ids = await asyncio.to_thread(self.write, list(documents))
+        return type('InsertManyResult', (), {'inserted_ids': inserted_ids})()
+
+    async def find(self, query: Optional[Dict[str, Any]] = None, limit: int = 0) -> List[Dict[str, Any]]:
+        return await asyncio.to_thread(self.read, query or {}, limit)
+
+    async def find_one(self, query: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        results = await self.find(query, limit=1)
+        return results[0] if results else None
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "segments": len(self._segments),
+                "documents": sum(segment.count for segment in self._segments),
+                "bytes": sum(segment.size for segment in self._segments),
+                "cached_blocks": len(self._block_cache)
+            }
+
+class EventStore:
+    """Database of ``EventCollection`` objects, addressed like a Mongo database"""
+
+    def __init__(
+        self,
+        path: str,
+        indexed_fields: List[str],
+        segment_max_docs: int = 50000,
+        ttl_seconds: float = 0.0,
+        compression_level: int = 6
+    ):
+        self.path = path
+        self.indexed_fields = indexed_fields
+        self.segment_max_docs = segment_max_docs
+        self.ttl_seconds = ttl_seconds
+        self.compression_level = compression_level
+        self._collections: Dict[str, EventCollection] = {}
+        self._lock = threading.Lock()
+
+    def get_default_database(self):
+        return self
+
+    def collection(self, name: str) -> EventCollection:
+        with self._lock:
+            if name not in self._collections:
+                self._collections[name] = EventCollection(
+                    os.path.join(self.path, name),
+                    self.indexed_fields,
+                    segment_max_docs=self.segment_max_docs,
+                    ttl_seconds=self.ttl_seconds,
+                    compression_level=self.compression_level
+                )
+            return self._collections[name]
+
+    def __getattr__(self, name: str) -> EventCollection:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self.collection(name)
+
+    def purge_expired(self) -> int:
+        return sum(collection.purge_expired() for collection in list(self._collections.values()))
+
+    def close(self) -> None:
+        for collection in list(self._collections.values()):
+            collection.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {name: collection.get_stats() for name, collection in list(self._collections.items())}
@@ -1,17 +1,66 @@
 import os
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from typing import Dict, Any
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from typing import AsyncIterator, Dict, Any
 
-from ..core.config import get_settings
+from ..core.config import Settings, get_settings
+from ..models.base import Base
+from .event_store import EventStore
 
 settings = get_settings()
 
-# Use SQLite for development
+# SQLite file used when DATABASE_BACKEND is "sqlite" (development and tests)
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 DB_PATH = os.path.join(BASE_DIR, 'dev.db')
-engine = create_engine(f'sqlite:///{DB_PATH}', connect_args={'check_same_thread': False})
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+SYNC_DRIVERS = {"sqlite": "sqlite", "postgresql": "postgresql+psycopg2"}
+
+def get_database_url(settings: Settings, async_driver: bool = True) -> str:
+    """Build the database URL from settings with an async or sync driver"""
+    if settings.SQLALCHEMY_DATABASE_URI:
+        url = make_url(settings.SQLALCHEMY_DATABASE_URI)
+    elif settings.DATABASE_BACKEND == "postgres":
+        url = make_url(
+            f"postgresql://{settings.POSTGRES_USER}:{settings.POSTGRES_PASSWORD}"
+            f"@{settings.POSTGRES_SERVER}/{settings.POSTGRES_DB}"
+        )
+    else:
+        url = make_url(f"sqlite:///{DB_PATH}")
+
+    drivers = ASYNC_DRIVERS if async_driver else SYNC_DRIVERS
+    backend = url.get_backend_name()
+    if backend in drivers:
+        url = url.set(drivername=drivers[backend])
+    return url.render_as_string(hide_password=False)
+
+def create_engine_from_settings(settings: Settings):
+    """Create the async engine with the configured connection pool"""
+    url = make_url(get_database_url(settings))
+    kwargs: Dict[str, Any] = {"echo": settings.DB_ECHO, "pool_pre_ping": settings.DB_POOL_PRE_PING}
+    # In-memory SQLite uses a single static connection and takes no pool sizing
+    if url.get_backend_name() != "sqlite" or url.database not in (None, "", ":memory:"):
+        kwargs.update(
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+            pool_timeout=settings.DB_POOL_TIMEOUT
+        )
+    engine = create_async_engine(url, **kwargs)
+
+    if url.get_backend_name() == "sqlite":
+        @event.listens_for(engine.sync_engine, "connect")
+        def _set_sqlite_pragmas(dbapi_connection, connection_record):
+            # WAL lets readers proceed while the write-behind flusher commits
+            cursor = dbapi_connection.cursor()
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+            cursor.close()
+    return engine
+
+engine = create_engine_from_settings(settings)
+AsyncSessionLocal = async_sessionmaker(engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
 
 # Mock MongoDB client for development
 class MockMongoClient:
@@ -32,6 +81,15 @@ class MockMongoClient:
         self.data[self.__collection__] = collection
         return type('ObjectId', (), {'inserted_id': str(len(collection) - 1)})()
     
+    async def insert_many(self, documents):
+        collection = self.data.get(self.__collection__, {})
+        start = len(collection)
+        for offset, document in enumerate(documents):
+            collection[str(start + offset)] = document
+        self.data[self.__collection__] = collection
+        inserted_ids = [str(i) for i in range(start, len(collection))]
+        return type('InsertManyResult', (), {'inserted_ids': inserted_ids})()
+    
     async def find_one(self, query):
         collection = self.data.get(self.__collection__, {})
         for doc in collection.values():
@@ -39,19 +97,43 @@ class MockMongoClient:
                 return doc
         return None
 
-# Use mock clients
-mongo_client = MockMongoClient()
+def create_event_store(settings: Settings):
+    """Raw-event store: embedded segment files, or an in-process dict for tests"""
+    if settings.RAW_EVENT_STORE == "memory":
+        return MockMongoClient()
+    path = settings.RAW_EVENT_STORE_DIR
+    if not os.path.isabs(path):
+        path = os.path.join(BASE_DIR, path)
+    return EventStore(
+        path,
+        indexed_fields=settings.RAW_EVENT_INDEXED_FIELDS,
+        segment_max_docs=settings.RAW_EVENT_SEGMENT_MAX_DOCS,
+        ttl_seconds=settings.RAW_EVENT_TTL_HOURS * 3600,
+        compression_level=settings.RAW_EVENT_COMPRESSION_LEVEL
+    )
+
+# One store serves both the sync and async accessors
+mongo_client = create_event_store(settings)
 mongo_db = mongo_client.get_default_database()
-async_mongo_client = MockMongoClient()
-async_mongo_db = async_mongo_client.get_default_database()
+async_mongo_client = mongo_client
+async_mongo_db = mongo_db
 
-def get_db():
-    """Get PostgreSQL database session"""
-    db = SessionLocal()
-    try:
+async def get_db() -> AsyncIterator[AsyncSession]:
+    """Get a database session backed by the shared connection pool"""
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
+
+async def init_db() -> None:
+    """Create all tables (local SQLite databases and tests; use alembic elsewhere)"""
+    from ..models import alert, alert_rollup, threat  # register tables on Base.metadata
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+
+async def close_db() -> None:
+    """Close pooled connections and seal open raw-event segments"""
+    await engine.dispose()
+    if isinstance(mongo_client, EventStore):
+        mongo_client.close()
 
 def get_mongo_db():
     """Get MongoDB database connection"""
@@ -1,21 +1,48 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from datetime import datetime
+import asyncio
 import logging
 
-from .api.endpoints import threats, alerts, models
+from .core.config import get_settings
+from .core.startup import startup_profiler
+from .core.response_cache import CacheRule, ResponseCacheMiddleware, response_cache
+from .core.metrics import PrometheusMiddleware, mark_process_dead, render_metrics
+from .db.session import close_db, init_db
+from .api.pagination import NEXT_CURSOR_HEADER
+
+# Heavy libraries are imported one by one so the startup profile attributes their cost
+for module_name in ("numpy", "pandas", "scipy.sparse", "sklearn.ensemble", "sqlalchemy"):
+    startup_profiler.import_module(module_name)
+
+with startup_profiler.measure("import", "app.api.endpoints"):
+    from .api.endpoints import threats, alerts, models, ingestion, traffic
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+settings = get_settings()
+
 app = FastAPI(
     title="Threat Detection System",
     description="Real-time threat detection and response system using AI/ML",
     version="1.0.0"
 )
 
+# Cache read endpoints; added before CORS so cached bodies never carry CORS headers
+app.add_middleware(
+    ResponseCacheMiddleware,
+    cache=response_cache,
+    rules=[
+        CacheRule(r"/api/v1/alerts/alerts(/\d+)?", tags=["alerts"]),
+        CacheRule(r"/api/v1/alerts/statistics", tags=["statistics"]),
+        CacheRule(r"/api/v1/threats/threats(/\d+)?", tags=["threats"]),
+        CacheRule(r"/api/v1/models/models(/[^/]+)?", tags=["models"]),
+    ]
+)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -23,12 +50,20 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Browsers hide other response headers from cross-origin scripts
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag"],
 )
 
+# Outermost, so request latency includes caching and CORS
+if settings.METRICS_ENABLED:
+    app.add_middleware(PrometheusMiddleware)
+
 # Include routers
 app.include_router(threats.router, prefix="/api/v1/threats", tags=["threats"])
 app.include_router(alerts.router, prefix="/api/v1/alerts", tags=["alerts"])
 app.include_router(models.router, prefix="/api/v1/models", tags=["models"])
+app.include_router(ingestion.router, prefix="/api/v1", tags=["ingestion"])
+app.include_router(traffic.router, prefix="/api/v1", tags=["traffic"])
 
 @app.get("/")
 async def root():
@@ -48,12 +83,60 @@ async def health_check():
         }
     )
 
+@app.get("/ready")
+async def readiness_check():
+    """Report whether models are loaded and warm (distinct from /health)"""
+    pipeline = ingestion.pipeline
+    ready = pipeline.ready
+    error = pipeline.warmup_error
+    if ready:
+        status = "ready"
+    elif pipeline.warming_up:
+        status = "warming_up"
+    else:
+        # Without MODEL_LOAD_ON_STARTUP nothing loads until the first ingestion request
+        status = "failed" if error else "not_loaded"
+    content = {
+        "status": status,
+        "version": settings.VERSION,
+        "timestamp": datetime.now().isoformat()
+    }
+    if error and not ready:
+        content["error"] = error
+    return JSONResponse(status_code=200 if ready else 503, content=content)
+
+@app.get("/startup-profile")
+async def startup_profile():
+    """Get import and model load timings recorded during startup"""
+    return startup_profiler.report()
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint"""
+    if not settings.METRICS_ENABLED:
+        return Response(status_code=404)
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
+@app.get("/cache-stats")
+async def cache_stats():
+    """Get read-endpoint response cache statistics"""
+    return response_cache.get_stats()
+
 @app.on_event("startup")
 async def startup_event():
     logger.info("Starting up AI-Driven Threat Detection System...")
-    # Initialize any required services or connections here
+    if settings.DB_CREATE_TABLES:
+        await init_db()
+    if settings.MODEL_LOAD_ON_STARTUP:
+        # Load models in the background; /ready and ingestion report 503 until they are warm
+        app.state.warmup_task = ingestion.pipeline.start_warm_up(
+            run_inference=settings.MODEL_WARMUP_INFERENCE
+        )
 
 @app.on_event("shutdown")
 async def shutdown_event():
     logger.info("Shutting down AI-Driven Threat Detection System...")
-    # Clean up any resources here
+    await ingestion.pipeline.shutdown()
+    await close_db()
+    mark_process_dead()
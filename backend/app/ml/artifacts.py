@@ -0,0 +1,192 @@
+"""On-disk model artifact format.
+
+An artifact is a directory::
+
+    manifest.json          format/model version, feature schema, checksums
+    estimator.joblib       the fitted estimator, pickled uncompressed
+    arrays/<name>.npy      large flat arrays (e.g. compiled tree nodes)
+
+Everything is stored uncompressed so that ``np.load(mmap_mode="r")`` and
+``joblib.load(mmap_mode="r")`` can map the files instead of copying them;
+worker processes on one host then share a single page-cache copy.
+
+The artifact path is a symlink to a versioned sibling directory
+(``.<name>-<creation time in ns>-<random>``). Saving builds a new version and atomically replaces
+the symlink, so the path always names a complete artifact. Readers should
+resolve the link once (``resolve_artifact``) and read every file from that
+version. The previous version is kept for readers still loading it; older
+ones are removed once they have been replaced for
+``RETIRED_VERSION_GRACE_SECONDS``.
+"""
+from typing import Any, Dict, Optional, Tuple
+from datetime import datetime
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+import joblib
+import numpy as np
+
+ARTIFACT_FORMAT_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+ESTIMATOR_NAME = "estimator.joblib"
+ARRAYS_DIR = "arrays"
+# How long a replaced version stays on disk for readers that resolved it late
+RETIRED_VERSION_GRACE_SECONDS = 60
+TIME_DIGITS = 20
+
+class ArtifactError(Exception):
+    """Raised when an artifact is missing, malformed or fails its checksum"""
+
+def is_artifact(path: str) -> bool:
+    return os.path.isfile(os.path.join(path, MANIFEST_NAME))
+
+def resolve_artifact(path: str) -> str:
+    """The version directory ``path`` currently points to"""
+    return os.path.realpath(path)
+
+def file_checksum(path: str, chunk_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def write_manifest(path: str, model_type: str, model_version: Optional[str] = None,
+                   feature_schema: Optional[Dict[str, Any]] = None,
+                   metadata: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Checksum every file under ``path`` and write the manifest"""
+    files = {}
+    for root, _, names in os.walk(path):
+        for name in sorted(names):
+            file_path = os.path.join(root, name)
+            relative = os.path.relpath(file_path, path)
+            if relative == MANIFEST_NAME:
+                continue
+            files[relative] = {
+                "sha256": file_checksum(file_path),
+                "bytes": os.path.getsize(file_path)
+            }
+
+    manifest = {
+        "format_version": ARTIFACT_FORMAT_VERSION,
+        "model_type": model_type,
+        "model_version": model_version or datetime.now().strftime("%Y%m%d%H%M%S"),
+        "created_at": datetime.now().isoformat(),
+        "feature_schema": feature_schema or {},
+        "metadata": metadata or {},
+        "files": files
+    }
+    with open(os.path.join(path, MANIFEST_NAME), "w") as f:
+        json.dump(manifest, f, indent=2, default=str)
+    return manifest
+
+def save_artifact(path: str, estimator: Any, arrays: Dict[str, np.ndarray], model_type: str,
+                  model_version: Optional[str] = None,
+                  feature_schema: Optional[Dict[str, Any]] = None,
+                  metadata: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Write an artifact as a new version and point ``path`` at it"""
+    path = os.path.abspath(path)
+    parent = os.path.dirname(path)
+    os.makedirs(parent, exist_ok=True)
+    prefix = f".{os.path.basename(path)}-"
+    # Build next to the target and swap in, so readers never see a partial artifact
+    # Names sort by creation time, which pruning relies on
+    staging = tempfile.mkdtemp(prefix=f"{prefix}{time.time_ns():0{TIME_DIGITS}d}-", dir=parent)
+    previous = None
+    try:
+        joblib.dump(estimator, os.path.join(staging, ESTIMATOR_NAME), compress=0)
+        if arrays:
+            os.makedirs(os.path.join(staging, ARRAYS_DIR))
+            for name, array in arrays.items():
+                np.save(os.path.join(staging, ARRAYS_DIR, f"{name}.npy"), np.ascontiguousarray(array))
+        manifest = write_manifest(staging, model_type, model_version, feature_schema, metadata)
+
+        link = f"{staging}.link"
+        os.symlink(os.path.basename(staging), link)
+        if os.path.isdir(path) and not os.path.islink(path):
+            # An artifact saved before versioning: a one-time move, not atomic
+            retired = f"{staging}.old"
+            os.rename(path, retired)
+            os.replace(link, path)
+            shutil.rmtree(retired, ignore_errors=True)
+        else:
+            if os.path.islink(path):
+                previous = os.path.basename(os.readlink(path))
+            # rename(2) replaces the symlink atomically
+            os.replace(link, path)
+    except Exception:
+        shutil.rmtree(staging, ignore_errors=True)
+        if os.path.lexists(f"{staging}.link"):
+            os.unlink(f"{staging}.link")
+        raise
+    _prune_versions(parent, prefix, current=os.path.basename(staging), previous=previous)
+    return manifest
+
+def _version_time_ns(name: str, prefix: str) -> Optional[int]:
+    """Creation time encoded in a version directory name, if it is one"""
+    stamp = name[len(prefix):len(prefix) + TIME_DIGITS]
+    if not name.startswith(prefix) or len(stamp) != TIME_DIGITS or not stamp.isdigit():
+        return None
+    return int(stamp)
+
+def _prune_versions(parent: str, prefix: str, current: str, previous: Optional[str]) -> None:
+    """Remove complete versions created before the previous one.
+
+    The version the path pointed to until now is kept for readers still
+    loading it, as is any version replaced less than the grace period ago.
+    Versions other saves are still building are left alone.
+    """
+    oldest_kept = min(name for name in (current, previous) if name)
+    versions = sorted(
+        name for name in os.listdir(parent)
+        if _version_time_ns(name, prefix) is not None and name < oldest_kept
+        and os.path.isdir(os.path.join(parent, name))
+        and not os.path.islink(os.path.join(parent, name))
+        and is_artifact(os.path.join(parent, name))
+    )
+    # A version was replaced no earlier than its successor was created
+    successors = versions[1:] + [oldest_kept]
+    cutoff = time.time_ns() - RETIRED_VERSION_GRACE_SECONDS * 1_000_000_000
+    for name, successor in zip(versions, successors):
+        if _version_time_ns(successor, prefix) <= cutoff:
+            shutil.rmtree(os.path.join(parent, name), ignore_errors=True)
+
+def read_manifest(path: str, verify: bool = True) -> Dict[str, Any]:
+    """Read the manifest and optionally verify every file checksum"""
+    if not is_artifact(path):
+        raise ArtifactError(f"No model artifact manifest in {path}")
+    with open(os.path.join(path, MANIFEST_NAME)) as f:
+        manifest = json.load(f)
+    if manifest.get("format_version") != ARTIFACT_FORMAT_VERSION:
+        raise ArtifactError(f"Unsupported artifact format version: {manifest.get('format_version')}")
+
+    if verify:
+        for relative, info in manifest["files"].items():
+            file_path = os.path.join(path, relative)
+            if not os.path.isfile(file_path):
+                raise ArtifactError(f"Artifact file missing: {relative}")
+            if file_checksum(file_path) != info["sha256"]:
+                raise ArtifactError(f"Checksum mismatch for {relative}")
+    return manifest
+
+def load_arrays(path: str, manifest: Dict[str, Any], mmap: bool = True) -> Dict[str, np.ndarray]:
+    """Load the artifact's flat arrays, memory-mapped read-only by default"""
+    arrays = {}
+    for relative in manifest["files"]:
+        directory, name = os.path.split(relative)
+        if directory == ARRAYS_DIR and name.endswith(".npy"):
+            arrays[name[:-4]] = np.load(os.path.join(path, relative), mmap_mode="r" if mmap else None)
+    return arrays
+
+def load_estimator(path: str, mmap: bool = True) -> Any:
+    """Load the pickled estimator, mapping its numpy buffers where possible"""
+    return joblib.load(os.path.join(path, ESTIMATOR_NAME), mmap_mode="r" if mmap else None)
+
+def load_artifact(path: str, mmap: bool = True, verify: bool = True) -> Tuple[Any, Dict[str, np.ndarray], Dict[str, Any]]:
+    """Load estimator, arrays and manifest from an artifact directory"""
+    path = resolve_artifact(path)
+    manifest = read_manifest(path, verify=verify)
+    return load_estimator(path, mmap=mmap), load_arrays(path, manifest, mmap=mmap), manifest
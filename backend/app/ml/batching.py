@@ -0,0 +1,110 @@
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+import asyncio
+import logging
+
+from ..core.metrics import BATCH_SIZE
+
+logger = logging.getLogger(__name__)
+
+class MicroBatcher:
+    """Collect concurrent requests and process them as a single batch.
+
+    A batch is flushed as soon as it reaches ``max_batch_size`` items or when
+    the oldest pending item has waited ``max_wait_ms`` milliseconds. Each
+    caller of ``submit`` receives the result for its own item; a processor
+    should validate items up front and return an exception instance in place
+    of a result to fail just that item. If processing a whole batch raises,
+    every caller in it receives the exception: the batch is not replayed,
+    since a processor may already have recorded some of it.
+    """
+
+    def __init__(
+        self,
+        process_batch: Callable[[List[Any]], Awaitable[List[Any]]],
+        max_batch_size: int = 256,
+        max_wait_ms: float = 2.0,
+        name: str = "default"
+    ):
+        self.process_batch = process_batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self.name = name
+        self._batch_size = BATCH_SIZE.labels(batcher=name)
+        self._pending: List[Tuple[Any, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        # The loop only keeps weak references to tasks
+        self._tasks: Set[asyncio.Task] = set()
+        self.batches_flushed = 0
+        self.items_processed = 0
+
+    async def submit(self, item: Any) -> Any:
+        """Queue an item and wait for its result"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+
+        return await future
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of items waiting for the next flush"""
+        return len(self._pending)
+
+    def _flush(self) -> None:
+        """Hand the pending items to a background batch task"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+
+        batch, self._pending = self._pending, []
+        task = asyncio.ensure_future(self._run_batch(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _process(self, items: List[Any]) -> List[Any]:
+        results = await self.process_batch(items)
+        if len(results) != len(items):
+            raise RuntimeError(
+                f"Batch processor returned {len(results)} results for {len(items)} items"
+            )
+        return results
+
+    async def _run_batch(self, batch: List[Tuple[Any, asyncio.Future]]) -> None:
+        """Process a batch and resolve every caller's future"""
+        items = [item for item, _ in batch]
+        try:
+            results = await self._process(items)
+        except Exception as e:
+            logger.error(f"Error processing batch of {len(items)} items: {str(e)}")
+            results = [e] * len(items)
+
+        self.batches_flushed += 1
+        self.items_processed += len(items)
+        self._batch_size.observe(len(items))
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get batching statistics"""
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000.0,
+            "queue_depth": self.queue_depth,
+            "batches_flushed": self.batches_flushed,
+            "items_processed": self.items_processed,
+            "mean_batch_size": (
+                self.items_processed / self.batches_flushed if self.batches_flushed else 0.0
+            )
+        }
@@ -0,0 +1,71 @@
+from typing import Any, Awaitable, Callable, Dict, List
+import logging
+import time
+import numpy as np
+
+from ..core.metrics import PIPELINE_STAGE_ROWS, PIPELINE_STAGE_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# A stage receives the shared batch context and the indices of the rows still
+# in the cascade, and returns the indices that continue to the next stage.
+StageFunction = Callable[[Dict[str, Any], np.ndarray], Awaitable[np.ndarray]]
+
+class CascadeStage:
+    """One gate in a detection cascade.
+
+    ``cost`` is the relative per-row cost of running the stage; the cascade
+    runs cheaper stages first.
+    """
+
+    def __init__(self, name: str, run: StageFunction, cost: float = 1.0):
+        self.name = name
+        self.run = run
+        self.cost = cost
+        self.hits = 0
+        self.short_circuits = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "cost": self.cost,
+            "hits": self.hits,
+            "short_circuits": self.short_circuits,
+            "work": self.hits * self.cost,
+            "passed": self.hits - self.short_circuits
+        }
+
+class DetectionCascade:
+    """Run rows through ordered stages, dropping rows a stage short-circuits.
+
+    Stages run cheapest first (a stable sort on ``cost``, so equal-cost stages
+    keep their listed order) and most rows never reach the expensive ones. A
+    stage that reads context written by another must not be cheaper than it.
+    Each stage counts the rows it saw and the rows it stopped.
+    """
+
+    def __init__(self, stages: List[CascadeStage], name: str = "default"):
+        self.stages = sorted(stages, key=lambda stage: stage.cost)
+        self.name = name
+        # Metric children are bound once; per-batch updates skip the label lookup
+        self._stage_seconds = [PIPELINE_STAGE_SECONDS.labels(pipeline=name, stage=stage.name) for stage in self.stages]
+        self._stage_rows = [PIPELINE_STAGE_ROWS.labels(pipeline=name, stage=stage.name) for stage in self.stages]
+
+    async def run(self, context: Dict[str, Any], n_rows: int) -> np.ndarray:
+        """Run the cascade and return the indices that passed every stage"""
+        active = np.arange(n_rows)
+        for stage, seconds, rows in zip(self.stages, self._stage_seconds, self._stage_rows):
+            if not len(active):
+                break
+            stage.hits += len(active)
+            rows.inc(len(active))
+            start = time.perf_counter()
+            passed = np.asarray(await stage.run(context, active), dtype=np.intp)
+            seconds.observe(time.perf_counter() - start)
+            stage.short_circuits += len(active) - len(passed)
+            active = passed
+        return active
+
+    def get_stats(self) -> List[Dict[str, Any]]:
+        """Get per-stage hit and short-circuit counts"""
+        return [stage.get_stats() for stage in self.stages]
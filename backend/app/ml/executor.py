@@ -0,0 +1,120 @@
+from typing import Any, Callable, Dict, Optional, Tuple
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+import asyncio
+import functools
+import logging
+import multiprocessing
+
+logger = logging.getLogger(__name__)
+
+class InferenceExecutor:
+    """Run CPU-bound model calls off the asyncio event loop.
+
+    ``run`` dispatches to a thread pool, which suits numpy/sklearn work that
+    releases the GIL. ``run_heavy`` dispatches to a process pool when
+    ``heavy_mode`` is ``"process"`` (e.g. transformer inference) and falls
+    back to the thread pool otherwise.
+    """
+
+    MODES = ("thread", "process")
+
+    def __init__(
+        self,
+        thread_workers: int = 4,
+        process_workers: int = 2,
+        heavy_mode: str = "thread",
+        process_initializer: Optional[Callable[..., None]] = None,
+        process_initargs: Tuple[Any, ...] = ()
+    ):
+        if heavy_mode not in self.MODES:
+            raise ValueError(f"Unknown executor mode: {heavy_mode}")
+        self.thread_workers = thread_workers
+        self.process_workers = process_workers
+        self.heavy_mode = heavy_mode
+        self.process_initializer = process_initializer
+        self.process_initargs = process_initargs
+        self._thread_pool = ThreadPoolExecutor(
+            max_workers=thread_workers,
+            thread_name_prefix="inference"
+        )
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        self._in_flight = {"thread": 0, "process": 0}
+        self._completed = {"thread": 0, "process": 0}
+        self._peak_in_flight = {"thread": 0, "process": 0}
+        self._recycled = 0
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run a GIL-releasing call on the thread pool"""
+        return await self._submit("thread", self._thread_pool, fn, *args)
+
+    async def run_heavy(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run a heavy call on the pool selected by ``heavy_mode``"""
+        if self.heavy_mode == "process":
+            return await self._submit("process", self._get_process_pool(), fn, *args)
+        return await self._submit("thread", self._thread_pool, fn, *args)
+
+    def _get_process_pool(self) -> ProcessPoolExecutor:
+        """Start the process pool on first use"""
+        if self._process_pool is None:
+            # spawn avoids forking a process that already holds threads and model state
+            self._process_pool = ProcessPoolExecutor(
+                max_workers=self.process_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=self.process_initializer,
+                initargs=self.process_initargs
+            )
+        return self._process_pool
+
+    def recycle_process_pool(self, initargs: Optional[Tuple[Any, ...]] = None) -> None:
+        """Start new workers (with new initializer arguments) for later calls.
+
+        Calls already submitted finish on the old workers, which exit afterwards.
+        """
+        if initargs is not None:
+            self.process_initargs = initargs
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=False)
+            self._process_pool = None
+        self._recycled += 1
+
+    async def _submit(self, pool_name: str, pool: Executor, fn: Callable[..., Any], *args: Any) -> Any:
+        """Submit a call and keep queue depth accounting"""
+        loop = asyncio.get_running_loop()
+        self._in_flight[pool_name] += 1
+        self._peak_in_flight[pool_name] = max(
+            self._peak_in_flight[pool_name], self._in_flight[pool_name]
+        )
+        try:
+            return await loop.run_in_executor(pool, functools.partial(fn, *args))
+        finally:
+            self._in_flight[pool_name] -= 1
+            self._completed[pool_name] += 1
+
+    def queue_depth(self, pool_name: str = "thread") -> int:
+        """Number of submitted calls still waiting for a free worker"""
+        workers = self.thread_workers if pool_name == "thread" else self.process_workers
+        return max(0, self._in_flight[pool_name] - workers)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Shut down both pools"""
+        self._thread_pool.shutdown(wait=wait)
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=wait)
+            self._process_pool = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get executor statistics"""
+        return {
+            "heavy_mode": self.heavy_mode,
+            "process_pool_recycled": self._recycled,
+            "pools": {
+                pool_name: {
+                    "workers": self.thread_workers if pool_name == "thread" else self.process_workers,
+                    "in_flight": self._in_flight[pool_name],
+                    "queue_depth": self.queue_depth(pool_name),
+                    "peak_in_flight": self._peak_in_flight[pool_name],
+                    "completed": self._completed[pool_name]
+                }
+                for pool_name in self.MODES
+            }
+        }
@@ -1,11 +1,55 @@
 from typing import Dict, List, Any
+import os
 import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
-from datetime import datetime
+from scipy import sparse
+from datetime import datetime, timezone
+import time
+
+from .log_vectorizer import LogVectorizer
+from .window_features import NetworkWindowFeatures
+from .sketches import TrafficSketches
+from ..core.config import get_settings
+
+LOG_SEVERITY_MAP = {'INFO': 0, 'WARNING': 1, 'ERROR': 2, 'CRITICAL': 3}
+
+def event_time(event: Dict[str, Any]) -> float:
+    """Epoch seconds of an event's timestamp (naive means UTC), or now"""
+    timestamp = event.get('timestamp')
+    if not timestamp:
+        return time.time()
+    dt = datetime.fromisoformat(timestamp)
+    return (dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)).timestamp()
 
 class FeatureExtractor:
-    def __init__(self):
-        self.text_vectorizer = TfidfVectorizer(max_features=100)
+    def __init__(self, text_vectorizer: LogVectorizer = None, window_features: NetworkWindowFeatures = None,
+                 traffic_sketches: TrafficSketches = None):
+        settings = get_settings()
+        self.vectorizer_path = os.path.join(settings.MODEL_DIR, "log_vectorizer.joblib")
+        if text_vectorizer is None:
+            if settings.LOG_VECTORIZER_MODE == "vocabulary" and os.path.exists(self.vectorizer_path):
+                text_vectorizer = LogVectorizer.load(self.vectorizer_path)
+            else:
+                text_vectorizer = LogVectorizer(
+                    mode=settings.LOG_VECTORIZER_MODE,
+                    n_features=settings.LOG_VECTORIZER_N_FEATURES
+                )
+        self.text_vectorizer = text_vectorizer
+        
+        # Stateful per-IP aggregates appended to network features when enabled
+        if window_features is None and settings.NETWORK_WINDOW_FEATURES:
+            window_features = NetworkWindowFeatures(max_keys=settings.NETWORK_WINDOW_MAX_KEYS)
+        self.window_features = window_features
+        
+        # Fixed-memory traffic sketches see every scored event; their estimates
+        # are only appended to the features when NETWORK_SKETCH_FEATURES is set
+        if traffic_sketches is None and settings.TRAFFIC_SKETCHES_ENABLED:
+            traffic_sketches = TrafficSketches(
+                window_seconds=settings.TRAFFIC_SKETCH_WINDOW_SECONDS,
+                buckets=settings.TRAFFIC_SKETCH_BUCKETS,
+                top_k=settings.TRAFFIC_SKETCH_TOP_K
+            )
+        self.traffic_sketches = traffic_sketches
+        self.sketch_features = settings.NETWORK_SKETCH_FEATURES and traffic_sketches is not None
         
     def extract_network_features(self, network_data: Dict[str, Any]) -> np.ndarray:
         """Extract features from network traffic data"""
@@ -19,7 +63,7 @@ class FeatureExtractor:
             network_data.get('protocol_type', 0)
         ])
         
-        # Time-based features
+        # Time-based features (zero-filled so every vector has the same width)
         timestamp = network_data.get('timestamp')
         if timestamp:
             dt = datetime.fromisoformat(timestamp)
@@ -28,23 +72,64 @@ class FeatureExtractor:
                 dt.minute,
                 dt.weekday()
             ])
+        else:
+            features.extend([0, 0, 0])
+            
+        return np.concatenate([np.array(features), self._stateful_features([network_data])[0]])
+    
+    def extract_network_features_batch(self, events: List[Dict[str, Any]]) -> np.ndarray:
+        """Extract a feature matrix (one row per event) from network traffic data"""
+        features = np.zeros((len(events), 7))
+        
+        # Basic network features
+        for col, key in enumerate(['bytes_sent', 'bytes_received', 'duration', 'protocol_type']):
+            features[:, col] = [event.get(key, 0) for event in events]
             
-        return np.array(features)
+        # Time-based features
+        for row, event in enumerate(events):
+            timestamp = event.get('timestamp')
+            if timestamp:
+                dt = datetime.fromisoformat(timestamp)
+                features[row, 4:] = (dt.hour, dt.minute, dt.weekday())
+                
+        return np.hstack([features, self._stateful_features(events)])
+    
+    def _stateful_features(self, events: List[Dict[str, Any]]) -> np.ndarray:
+        """Windowed per-IP aggregates and sketch estimates, including these events"""
+        columns = [np.zeros((len(events), 0))]
+        if self.window_features is None and self.traffic_sketches is None:
+            return columns[0]
+        times = np.array([event_time(event) for event in events])
+        if self.window_features is not None:
+            columns.append(self.window_features.update(events, times))
+        if self.traffic_sketches is not None:
+            estimates = self.traffic_sketches.update(events, times, features=self.sketch_features)
+            if estimates is not None:
+                columns.append(estimates)
+        return np.hstack(columns)
     
     def extract_log_features(self, log_data: Dict[str, Any]) -> np.ndarray:
         """Extract features from log data"""
-        features = []
-        
+        return self.extract_log_features_batch([log_data]).toarray().flatten()
+    
+    def extract_log_features_batch(self, logs: List[Dict[str, Any]]) -> sparse.csr_matrix:
+        """Extract a sparse, fixed-width feature matrix from a batch of log entries"""
         # Log severity
-        severity_map = {'INFO': 0, 'WARNING': 1, 'ERROR': 2, 'CRITICAL': 3}
-        features.append(severity_map.get(log_data.get('severity', 'INFO'), 0))
+        severities = np.array(
+            [[LOG_SEVERITY_MAP.get(log.get('severity', 'INFO'), 0)] for log in logs],
+            dtype=np.float64
+        )
         
-        # Log message vectorization
-        if 'message' in log_data:
-            message_vector = self.text_vectorizer.fit_transform([log_data['message']]).toarray()
-            features.extend(message_vector.flatten())
-            
-        return np.array(features)
+        # Log message vectorization (missing messages vectorize to zeros)
+        messages = self.text_vectorizer.transform([log.get('message', '') for log in logs])
+        
+        return sparse.hstack([sparse.csr_matrix(severities), messages], format='csr')
+    
+    def fit_log_vectorizer(self, messages: List[str], save: bool = True) -> None:
+        """Fit the log vocabulary once and persist it with the model artifacts"""
+        self.text_vectorizer.fit(messages)
+        if save and self.text_vectorizer.mode == "vocabulary":
+            self.text_vectorizer.save(self.vectorizer_path)
     
     def combine_features(self, features_list: List[np.ndarray]) -> np.ndarray:
         """Combine multiple feature arrays"""
@@ -0,0 +1,117 @@
+from typing import Any, Dict, List, Optional, Tuple
+from collections import OrderedDict
+import re
+import threading
+
+WILDCARD = "<*>"
+
+# Variable fields masked before template matching, applied in order
+MASKS = [
+    (re.compile(r"\b[0-9a-fA-F]{8}-(?:[0-9a-fA-F]{4}-){3}[0-9a-fA-F]{12}\b"), "<UUID>"),
+    (re.compile(r"\b(?:\d{1,3}\.){3}\d{1,3}(?::\d+)?\b"), "<IP>"),
+    (re.compile(r"\b(?:[0-9a-fA-F]{2}:){5}[0-9a-fA-F]{2}\b"), "<MAC>"),
+    (re.compile(r"\b0x[0-9a-fA-F]+\b"), "<HEX>"),
+    (re.compile(r"\b(?=[0-9a-fA-F]*\d)[0-9a-fA-F]{8,}\b"), "<HEX>"),
+    (re.compile(r"(?<![\w.])[-+]?\d+(?:\.\d+)?(?![\w.])"), "<NUM>"),
+]
+
+class LogTemplateMiner:
+    """Drain-style log template miner.
+
+    Lines are masked, tokenized and routed by token count and first token to
+    a small group of templates. A line joins the most similar template in
+    its group when the fraction of matching tokens reaches
+    ``similarity_threshold``; differing positions become wildcards.
+    Otherwise it starts a new template.
+    """
+
+    def __init__(self, similarity_threshold: float = 0.9, max_templates_per_group: int = 100):
+        self.similarity_threshold = similarity_threshold
+        self.max_templates_per_group = max_templates_per_group
+        self._groups: Dict[Tuple[int, str], List[List[str]]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def mask(line: str) -> str:
+        """Replace variable fields such as IPs, numbers and hex IDs"""
+        for pattern, token in MASKS:
+            line = pattern.sub(token, line)
+        return line
+
+    def add(self, line: str) -> str:
+        """Match a line against known templates and return its template"""
+        tokens = self.mask(line).split()
+        if not tokens:
+            return ""
+
+        key = (len(tokens), tokens[0])
+        with self._lock:
+            group = self._groups.setdefault(key, [])
+            template = self._best_match(group, tokens)
+            if template is None:
+                if len(group) >= self.max_templates_per_group:
+                    group.pop(0)
+                group.append(tokens)
+                return " ".join(tokens)
+
+            for i, (known, token) in enumerate(zip(template, tokens)):
+                if known != token:
+                    template[i] = WILDCARD
+            return " ".join(template)
+
+    def _best_match(self, group: List[List[str]], tokens: List[str]) -> Optional[List[str]]:
+        """Find the most similar template above the threshold"""
+        best, best_score = None, -1.0
+        for template in group:
+            matches = sum(
+                1 for known, token in zip(template, tokens)
+                if known == token or known == WILDCARD
+            )
+            score = matches / len(tokens)
+            if score > best_score:
+                best, best_score = template, score
+        if best is not None and best_score >= self.similarity_threshold:
+            return best
+        return None
+
+    @property
+    def template_count(self) -> int:
+        return sum(len(group) for group in self._groups.values())
+
+class TemplateCache:
+    """Bounded LRU cache of inference results keyed by log template"""
+
+    def __init__(self, maxsize: int = 10000):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
@@ -0,0 +1,81 @@
+from typing import Iterable, Tuple
+import os
+import joblib
+from scipy import sparse
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfVectorizer
+from sklearn.exceptions import NotFittedError
+
+class LogVectorizer:
+    """Fixed-width vectorizer for log messages.
+
+    ``hashing`` mode is stateless: it needs no fitting and can vectorize a
+    stream of messages in any order. ``vocabulary`` mode fits a TF-IDF
+    vocabulary once, which is then saved alongside the model artifacts and
+    reused for every subsequent transform.
+    """
+
+    MODES = ("hashing", "vocabulary")
+
+    def __init__(self, mode: str = "hashing", n_features: int = 1024, ngram_range: Tuple[int, int] = (1, 1)):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown log vectorizer mode: {mode}")
+        self.mode = mode
+        self.n_features = n_features
+        self.ngram_range = ngram_range
+        if mode == "hashing":
+            self.vectorizer = HashingVectorizer(
+                n_features=n_features,
+                ngram_range=ngram_range,
+                alternate_sign=False,
+                norm="l2"
+            )
+        else:
+            self.vectorizer = TfidfVectorizer(
+                max_features=n_features,
+                ngram_range=ngram_range
+            )
+        self._fitted = mode == "hashing"
+
+    @property
+    def is_fitted(self) -> bool:
+        return self._fitted
+
+    @property
+    def output_dim(self) -> int:
+        """Width of the vectors produced by ``transform``"""
+        if self.mode == "vocabulary" and self._fitted:
+            return len(self.vectorizer.vocabulary_)
+        return self.n_features
+
+    def fit(self, messages: Iterable[str]) -> "LogVectorizer":
+        """Fit the vocabulary (no-op in hashing mode)"""
+        if self.mode == "vocabulary":
+            self.vectorizer.fit(messages)
+            self._fitted = True
+        return self
+
+    def transform(self, messages: Iterable[str]) -> sparse.csr_matrix:
+        """Vectorize a batch of messages into a sparse matrix"""
+        if not self._fitted:
+            raise NotFittedError("Log vectorizer vocabulary has not been fitted")
+        return sparse.csr_matrix(self.vectorizer.transform(messages))
+
+    def fit_transform(self, messages: Iterable[str]) -> sparse.csr_matrix:
+        """Fit (vocabulary mode only) and vectorize a batch of messages"""
+        messages = list(messages)
+        return self.fit(messages).transform(messages)
+
+    def save(self, path: str) -> None:
+        """Persist the vectorizer with the model artifacts"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        joblib.dump(self, path)
+
+    @classmethod
+    def load(cls, path: str) -> "LogVectorizer":
+        """Load a previously saved vectorizer"""
+        vectorizer = joblib.load(path)
+        if not isinstance(vectorizer, cls):
+            raise TypeError(f"{path} does not contain a {cls.__name__}")
+        return vectorizer
@@ -4,11 +4,13 @@ from datetime import datetime
 from typing import Dict, Any
 
 from .base_model import BaseModel
+from ..tree_engine import CompiledForest
 
 class AnomalyDetector(BaseModel):
     def __init__(self, model_path: str = None, contamination: float = 0.1):
         super().__init__(model_path)
         self.contamination = contamination
+        self.offset_ = None
         if not self.model:
             self.model = IsolationForest(
                 contamination=self.contamination,
@@ -20,17 +22,38 @@ class AnomalyDetector(BaseModel):
         """Train the anomaly detection model"""
         self.model.fit(X)
         self.last_training_time = datetime.now()
+        self.compile()
+        
+    def compile(self) -> None:
+        """Flatten the fitted isolation forest for single-pass NumPy inference"""
+        if hasattr(self.model, "estimators_"):
+            self.engine = CompiledForest.from_isolation_forest(self.model)
+            self.offset_ = float(self.model.offset_)
+        else:
+            self.engine = None
+        
+    def _artifact_metadata(self) -> Dict[str, Any]:
+        return {"offset": self.offset_}
+    
+    def _restore_artifact_metadata(self, metadata: Dict[str, Any]) -> None:
+        self.offset_ = metadata.get("offset")
         
     def predict(self, X: np.ndarray) -> np.ndarray:
         """Predict anomalies. Returns -1 for anomalies and 1 for normal samples"""
+        if self._use_engine(X):
+            return np.where(self.predict_proba(X) > self.get_threshold(), -1, 1)
         return self.model.predict(X)
     
     def predict_proba(self, X: np.ndarray) -> np.ndarray:
         """Get anomaly scores"""
+        if self._use_engine(X):
+            return 2.0 ** -self.engine.leaf_mean(X)[:, 0]
         return -self.model.score_samples(X)
     
     def get_threshold(self) -> float:
         """Get the anomaly threshold"""
+        if self.offset_ is not None:
+            return -self.offset_
         return -self.model.offset_
     
     def get_model_info(self) -> Dict[str, Any]:
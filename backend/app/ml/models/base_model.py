@@ -1,14 +1,38 @@
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, List, Optional
 import numpy as np
 import joblib
 from datetime import datetime
 
+from ..artifacts import is_artifact, load_arrays, load_estimator, read_manifest, resolve_artifact, save_artifact
+from ..tree_engine import CompiledForest
+from ...core.config import get_settings
+
 class BaseModel(ABC):
     def __init__(self, model_path: str = None):
-        self.model = None
+        settings = get_settings()
+        self._model = None
+        self._model_loader: Optional[Callable[[], Any]] = None
         self.model_path = model_path
         self.last_training_time = None
+        self.engine = None
+        self.engine_max_batch = settings.TREE_ENGINE_MAX_BATCH
+        self.artifact_mmap = settings.MODEL_ARTIFACT_MMAP
+        self.artifact_verify = settings.MODEL_ARTIFACT_VERIFY
+        self.manifest: Optional[Dict[str, Any]] = None
+        
+    @property
+    def model(self) -> Any:
+        # Estimators of mapped artifacts are only unpickled when first needed
+        if self._model is None and self._model_loader is not None:
+            loader, self._model_loader = self._model_loader, None
+            self._model = loader()
+        return self._model
+    
+    @model.setter
+    def model(self, value: Any) -> None:
+        self._model = value
+        self._model_loader = None
         
     @abstractmethod
     def train(self, X: np.ndarray, y: np.ndarray = None) -> None:
@@ -25,22 +49,87 @@ class BaseModel(ABC):
         """Get prediction probabilities"""
         pass
     
-    def save_model(self, path: str = None) -> None:
-        """Save model to disk"""
+    def compile(self) -> None:
+        """Build a NumPy inference engine for the fitted model, if supported"""
+        self.engine = None
+    
+    def _use_engine(self, X: np.ndarray) -> bool:
+        """Use the NumPy engine for batches where per-call overhead dominates"""
+        return self.engine is not None and len(X) <= self.engine_max_batch
+    
+    def get_feature_schema(self) -> Dict[str, Any]:
+        """Describe the input features the fitted model expects"""
+        schema = {"n_features": getattr(self._model, "n_features_in_", None)}
+        if hasattr(self._model, "feature_names_in_"):
+            schema["feature_names"] = [str(name) for name in self._model.feature_names_in_]
+        return schema
+    
+    def _artifact_metadata(self) -> Dict[str, Any]:
+        """Extra values needed to serve predictions without the estimator"""
+        return {}
+    
+    def _restore_artifact_metadata(self, metadata: Dict[str, Any]) -> None:
+        pass
+    
+    def save_model(self, path: str = None, version: str = None) -> None:
+        """Save model to disk as a memory-mappable artifact directory"""
         save_path = path or self.model_path
-        if save_path and self.model:
-            joblib.dump(self.model, save_path)
+        if save_path and self.model is not None:
+            arrays: Dict[str, np.ndarray] = {}
+            metadata = self._artifact_metadata()
+            metadata["last_training_time"] = self.last_training_time
+            if isinstance(self.engine, CompiledForest):
+                arrays = {f"engine.{name}": array for name, array in self.engine.get_arrays().items()}
+                metadata["engine"] = {"max_depth": self.engine.max_depth}
+            self.manifest = save_artifact(
+                save_path,
+                self.model,
+                arrays,
+                model_type=self.__class__.__name__,
+                model_version=version,
+                feature_schema=self.get_feature_schema(),
+                metadata=metadata
+            )
             
     def load_model(self, path: str = None) -> None:
         """Load model from disk"""
         load_path = path or self.model_path
-        if load_path:
+        if not load_path:
+            return
+        if not is_artifact(load_path):
+            # Legacy single-file joblib dump
             self.model = joblib.load(load_path)
+            self.compile()
+            return
+            
+        # Read every file, including the lazily loaded estimator, from one version
+        load_path = resolve_artifact(load_path)
+        manifest = read_manifest(load_path, verify=self.artifact_verify)
+        arrays = load_arrays(load_path, manifest, mmap=self.artifact_mmap)
+        engine_arrays = {
+            name[len("engine."):]: array for name, array in arrays.items()
+            if name.startswith("engine.")
+        }
+        metadata = manifest.get("metadata", {})
+        self.manifest = manifest
+        trained_at = metadata.get("last_training_time")
+        self.last_training_time = datetime.fromisoformat(trained_at) if isinstance(trained_at, str) else trained_at
+        self._restore_artifact_metadata(metadata)
+        if engine_arrays:
+            # The mapped engine serves predictions; the estimator loads lazily
+            self.engine = CompiledForest(max_depth=metadata["engine"]["max_depth"], **engine_arrays)
+            self._model = None
+            self._model_loader = lambda: load_estimator(load_path, mmap=self.artifact_mmap)
+        else:
+            self.model = load_estimator(load_path, mmap=self.artifact_mmap)
+            self.compile()
             
     def get_model_info(self) -> Dict[str, Any]:
         """Get model information"""
         return {
             "model_type": self.__class__.__name__,
             "last_training_time": self.last_training_time,
-            "model_path": self.model_path
+            "model_path": self.model_path,
+            "model_version": self.manifest.get("model_version") if self.manifest else None,
+            "feature_schema": self.manifest.get("feature_schema") if self.manifest else None
         }
@@ -0,0 +1,69 @@
+import os
+import numpy as np
+from sklearn.linear_model import SGDClassifier
+from datetime import datetime
+from typing import Dict, Any, List
+
+from .base_model import BaseModel
+from ..log_templates import LogTemplateMiner
+from ..log_vectorizer import LogVectorizer
+
+class FastLogClassifier(BaseModel):
+    """Linear log severity classifier over hashed word n-grams.
+
+    Variable fields are masked before hashing so that lines differing only
+    in IPs, numbers or IDs share features.
+    """
+
+    def __init__(self, model_path: str = None, n_features: int = 2 ** 18):
+        super().__init__(model_path)
+        self.vectorizer = LogVectorizer(mode="hashing", n_features=n_features, ngram_range=(1, 2))
+        if model_path and os.path.exists(model_path):
+            self.load_model()
+        if not self.model:
+            self.model = SGDClassifier(
+                loss="log_loss",
+                alpha=1e-5,
+                random_state=42
+            )
+
+    @property
+    def is_trained(self) -> bool:
+        return hasattr(self.model, "classes_")
+
+    def _vectorize(self, X: List[str]):
+        return self.vectorizer.transform([LogTemplateMiner.mask(line) for line in X])
+
+    def train(self, X: List[str], y: List[str] = None) -> None:
+        """Train the classifier on log lines and NORMAL/WARNING/CRITICAL labels"""
+        if y is None:
+            raise ValueError("Labels are required to train the fast log classifier")
+        self.model.fit(self._vectorize(X), y)
+        self.last_training_time = datetime.now()
+
+    def predict(self, X: List[str]) -> np.ndarray:
+        """Predict log severity"""
+        return self.model.predict(self._vectorize(X))
+
+    def predict_proba(self, X: List[str]) -> np.ndarray:
+        """Get prediction probabilities for each severity level"""
+        return self.model.predict_proba(self._vectorize(X))
+
+    def classify(self, X: List[str]) -> List[List[Dict[str, Any]]]:
+        """Get per-line label scores in the text-classification pipeline format"""
+        probabilities = self.predict_proba(X)
+        labels = [str(label) for label in self.model.classes_]
+        return [
+            [{"label": label, "score": float(score)} for label, score in zip(labels, row)]
+            for row in probabilities
+        ]
+
+    def get_model_info(self) -> Dict[str, Any]:
+        """Get model information"""
+        info = super().get_model_info()
+        info.update({
+            "model_type": "Hashed n-gram Linear Log Classifier",
+            "n_features": self.vectorizer.n_features,
+            "classes": [str(label) for label in self.model.classes_] if self.is_trained else []
+        })
+        return info
@@ -1,32 +1,248 @@
+import copy
+import os
 import numpy as np
-from transformers import pipeline
 from datetime import datetime
 from typing import Dict, Any, List
 
 from .base_model import BaseModel
+from .fast_log_classifier import FastLogClassifier
+from ..artifacts import read_manifest, write_manifest
+from ..log_templates import LogTemplateMiner, TemplateCache
+from ...core.config import get_settings
+from ...core.startup import startup_profiler
+
+class BucketedTextClassifier:
+    """CPU-oriented text classification with the same output format as
+    ``transformers.pipeline(..., top_k=None)``.
+
+    Inputs are sorted by length so each batch pads to a similar size, lines
+    are truncated at ``max_length`` tokens and the linear layers can be
+    dynamically quantized to int8.
+    """
+    
+    def __init__(
+        self,
+        model_name_or_path: str,
+        batch_size: int = 32,
+        max_length: int = 128,
+        quantize: bool = False,
+        local_files_only: bool = False,
+        label_names: List[str] = None
+    ):
+        torch = startup_profiler.import_module("torch")
+        transformers = startup_profiler.import_module("transformers")
+        AutoTokenizer = transformers.AutoTokenizer
+        AutoModelForSequenceClassification = transformers.AutoModelForSequenceClassification
+        
+        self.torch = torch
+        self.batch_size = batch_size
+        self.max_length = max_length
+        self.quantized = quantize
+        self.tokenizer = AutoTokenizer.from_pretrained(
+            model_name_or_path, local_files_only=local_files_only
+        )
+        model = AutoModelForSequenceClassification.from_pretrained(
+            model_name_or_path, local_files_only=local_files_only
+        )
+        model.eval()
+        if quantize:
+            model = torch.quantization.quantize_dynamic(
+                model, {torch.nn.Linear}, dtype=torch.qint8
+            )
+        self.model = model
+        
+        # Untrained heads only carry generic LABEL_i names
+        self.id2label = dict(model.config.id2label)
+        generic = all(str(label).startswith("LABEL_") for label in self.id2label.values())
+        if label_names and generic and len(label_names) == len(self.id2label):
+            self.id2label = dict(enumerate(label_names))
+            
+    def __call__(self, texts: List[str]) -> List[List[Dict[str, Any]]]:
+        results: List[Any] = [None] * len(texts)
+        # Length buckets: neighbouring lines have similar lengths after sorting
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        with self.torch.inference_mode():
+            for start in range(0, len(order), self.batch_size):
+                indices = order[start:start + self.batch_size]
+                encoded = self.tokenizer(
+                    [texts[i] for i in indices],
+                    truncation=True,
+                    max_length=self.max_length,
+                    padding="longest",
+                    return_tensors="pt"
+                )
+                probabilities = self.torch.softmax(self.model(**encoded).logits, dim=-1).numpy()
+                for i, row in zip(indices, probabilities):
+                    results[i] = [
+                        {"label": self.id2label[j], "score": float(score)}
+                        for j, score in enumerate(row)
+                    ]
+        return results
 
 class LogAnalyzer(BaseModel):
-    def __init__(self, model_path: str = None):
+    untrainable_reason = "The log analyzer is pre-trained; train fast_log_classifier instead"
+    
+    def __init__(self, model_path: str = None, fast_classifier: FastLogClassifier = None):
         super().__init__(model_path)
-        # Initialize BERT-based classifier for log analysis
-        self.model = pipeline(
-            "text-classification",
-            model="bert-base-uncased",
-            top_k=None
-        )
+        settings = get_settings()
+        # Artifact the transformer was loaded from, if any (worker processes reload it)
+        self.loaded_from = None
         self.label_map = {
             "NORMAL": 0,
             "WARNING": 1,
             "CRITICAL": 2
         }
+        self.inference_mode = settings.LOG_ANALYZER_MODE
+        self.backend = settings.LOG_ANALYZER_BACKEND
+        self.escalation_threshold = settings.LOG_ANALYZER_ESCALATION_THRESHOLD
+        
+        # Linear fast path, used alone or as a first-pass filter in front of BERT
+        self.fast_classifier = fast_classifier or FastLogClassifier(
+            model_path=os.path.join(settings.MODEL_DIR, "fast_log_classifier")
+        )
+        self._fast_classifier_version = self.fast_classifier.last_training_time
+        
+        # Initialize BERT-based classifier for log analysis
+        if self.backend == "linear":
+            self.model = None
+        else:
+            self.model = self._build_classifier(
+                settings.LOG_ANALYZER_MODEL,
+                local_files_only=settings.LOG_ANALYZER_LOCAL_FILES_ONLY
+            )
+        
+        # Repetitive lines share a template and are only classified once
+        self.template_miner = LogTemplateMiner(
+            similarity_threshold=settings.LOG_TEMPLATE_SIMILARITY
+        )
+        self.template_cache = TemplateCache(maxsize=settings.LOG_TEMPLATE_CACHE_SIZE)
+        self.lines_seen = 0
+        self.lines_inferred = 0
             
+    def _build_classifier(self, model_name_or_path: str, local_files_only: bool = False) -> Any:
+        """Build the transformer classifier for the configured inference mode"""
+        settings = get_settings()
+        if self.inference_mode == "optimized":
+            return BucketedTextClassifier(
+                model_name_or_path,
+                batch_size=settings.LOG_ANALYZER_BATCH_SIZE,
+                max_length=settings.LOG_ANALYZER_MAX_LENGTH,
+                quantize=settings.LOG_ANALYZER_QUANTIZE,
+                local_files_only=local_files_only,
+                label_names=list(self.label_map.keys())
+            )
+        # transformers is imported here so the API can start without it
+        transformers = startup_profiler.import_module("transformers")
+        return transformers.pipeline(
+            "text-classification",
+            model=model_name_or_path,
+            top_k=None,
+            model_kwargs={"local_files_only": local_files_only}
+        )
+        
     def train(self, X: np.ndarray, y: np.ndarray = None) -> None:
         """Training not implemented for pre-trained model"""
-        pass
+        raise NotImplementedError(self.untrainable_reason)
+        
+    def with_fast_classifier(self, fast_classifier: FastLogClassifier) -> "LogAnalyzer":
+        """A new analyzer sharing this one's transformer and templates, with another fast path"""
+        analyzer = copy.copy(self)
+        analyzer.fast_classifier = fast_classifier
+        analyzer._fast_classifier_version = fast_classifier.last_training_time
+        # Cached results came from the old fast path
+        analyzer.template_cache = TemplateCache(maxsize=self.template_cache.maxsize)
+        analyzer.lines_seen = 0
+        analyzer.lines_inferred = 0
+        return analyzer
+        
+    def save_model(self, path: str = None, version: str = None) -> None:
+        """Save weights as safetensors (memory-mapped on load) with a manifest"""
+        save_path = path or self.model_path
+        if not save_path or self.model is None:
+            return
+        if getattr(self.model, "quantized", False):
+            raise ValueError("Quantized log analyzers cannot be saved; save the float model instead")
+        self.model.model.save_pretrained(save_path, safe_serialization=True)
+        self.model.tokenizer.save_pretrained(save_path)
+        self.manifest = write_manifest(
+            save_path,
+            model_type=self.__class__.__name__,
+            model_version=version,
+            metadata={"labels": list(self.label_map.keys())}
+        )
+        
+    def load_model(self, path: str = None) -> None:
+        """Load weights saved by ``save_model`` without contacting the model hub"""
+        load_path = path or self.model_path
+        if not load_path:
+            return
+        self.manifest = read_manifest(load_path, verify=self.artifact_verify)
+        self.model = self._build_classifier(load_path, local_files_only=True)
+        self.loaded_from = load_path
+        self.template_cache.clear()
+        
+    def _infer(self, X: List[str]) -> List[List[Dict[str, Any]]]:
+        """Run the configured backend on a batch of lines"""
+        if self.backend == "linear":
+            if not self.fast_classifier.is_trained:
+                raise RuntimeError("Fast log classifier has not been trained")
+            return self.fast_classifier.classify(X)
+            
+        if self.backend != "cascade" or not self.fast_classifier.is_trained:
+            return self.model(X)
+            
+        # Only lines the linear model is unsure about are escalated to BERT
+        results = self.fast_classifier.classify(X)
+        uncertain = [
+            i for i, result in enumerate(results)
+            if max(pred['score'] for pred in result) < self.escalation_threshold
+        ]
+        if uncertain:
+            for i, output in zip(uncertain, self.model([X[i] for i in uncertain])):
+                results[i] = output
+        return results
+        
+    def _classify(self, X: List[str]) -> List[List[Dict[str, Any]]]:
+        """Get raw classifier output per line, running inference once per unseen template"""
+        if self.backend == "linear":
+            # The linear model is cheaper than template mining
+            self.lines_seen += len(X)
+            self.lines_inferred += len(X)
+            return self._infer(X)
+            
+        # Cached results are stale once the fast path is retrained
+        if self._fast_classifier_version != self.fast_classifier.last_training_time:
+            self.template_cache.clear()
+            self._fast_classifier_version = self.fast_classifier.last_training_time
+            
+        results: List[Any] = [None] * len(X)
+        pending: Dict[str, List[int]] = {}
+        for i, line in enumerate(X):
+            template = self.template_miner.add(line)
+            if template in pending:
+                pending[template].append(i)
+                continue
+            cached = self.template_cache.get(template)
+            if cached is not None:
+                results[i] = cached
+            else:
+                pending[template] = [i]
+                
+        if pending:
+            # One representative line per template goes through the model
+            outputs = self._infer([X[indices[0]] for indices in pending.values()])
+            for (template, indices), output in zip(pending.items(), outputs):
+                self.template_cache.put(template, output)
+                for i in indices:
+                    results[i] = output
+                    
+        self.lines_seen += len(X)
+        self.lines_inferred += len(pending)
+        return results
         
     def predict(self, X: List[str]) -> List[str]:
         """Predict log severity"""
-        results = self.model(X)
+        results = self._classify(X)
         predictions = []
         for result in results:
             # Get the label with highest score
@@ -36,13 +252,23 @@ class LogAnalyzer(BaseModel):
     
     def predict_proba(self, X: List[str]) -> List[Dict[str, float]]:
         """Get prediction probabilities for each severity level"""
-        results = self.model(X)
+        results = self._classify(X)
         probabilities = []
         for result in results:
             prob_dict = {pred['label']: pred['score'] for pred in result}
             probabilities.append(prob_dict)
         return probabilities
     
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Get template cache statistics"""
+        return {
+            "templates": self.template_miner.template_count,
+            "cached_templates": len(self.template_cache),
+            "lines_seen": self.lines_seen,
+            "lines_inferred": self.lines_inferred,
+            "hit_rate": 1 - self.lines_inferred / self.lines_seen if self.lines_seen else 0.0
+        }
+    
     def analyze_log_pattern(self, logs: List[str]) -> Dict[str, Any]:
         """Analyze patterns in a sequence of logs"""
         predictions = self.predict(logs)
@@ -62,6 +288,9 @@ class LogAnalyzer(BaseModel):
         info = super().get_model_info()
         info.update({
             "model_type": "BERT-based Log Analyzer",
-            "supported_severities": list(self.label_map.keys())
+            "backend": self.backend,
+            "inference_mode": self.inference_mode,
+            "supported_severities": list(self.label_map.keys()),
+            "template_cache": self.get_cache_stats()
         })
         return info
@@ -1,9 +1,11 @@
 import numpy as np
 from sklearn.ensemble import RandomForestClassifier
+from sklearn.exceptions import NotFittedError
 from datetime import datetime
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Tuple
 
 from .base_model import BaseModel
+from ..tree_engine import CompiledForest
 
 class NetworkClassifier(BaseModel):
     def __init__(self, model_path: str = None):
@@ -22,15 +24,41 @@ class NetworkClassifier(BaseModel):
         self.model.fit(X, y)
         self.classes_ = self.model.classes_
         self.last_training_time = datetime.now()
+        self.compile()
+        
+    def compile(self) -> None:
+        """Flatten the fitted forest for single-pass NumPy inference"""
+        if hasattr(self.model, "estimators_") and self.model.n_outputs_ == 1:
+            self.engine = CompiledForest.from_random_forest(self.model)
+            self.classes_ = self.model.classes_
+        else:
+            self.engine = None
+        
+    def _artifact_metadata(self) -> Dict[str, Any]:
+        return {"classes": self.classes_.tolist() if self.classes_ is not None else None}
+    
+    def _restore_artifact_metadata(self, metadata: Dict[str, Any]) -> None:
+        if metadata.get("classes") is not None:
+            self.classes_ = np.asarray(metadata["classes"])
         
     def predict(self, X: np.ndarray) -> np.ndarray:
         """Predict traffic class"""
-        return self.model.predict(X)
+        return self.predict_with_proba(X)[0]
     
     def predict_proba(self, X: np.ndarray) -> np.ndarray:
         """Get prediction probabilities for each class"""
+        if self._use_engine(X):
+            return self.engine.leaf_mean(X)
         return self.model.predict_proba(X)
     
+    def predict_with_proba(self, X: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Get predicted classes and probabilities from a single forest traversal"""
+        if self.classes_ is None:
+            raise NotFittedError("Network classifier has not been trained")
+        probabilities = self.predict_proba(X)
+        labels = self.classes_[np.argmax(probabilities, axis=1)]
+        return labels, probabilities
+    
     def get_feature_importance(self) -> Dict[str, float]:
         """Get feature importance scores"""
         return {
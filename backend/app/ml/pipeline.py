@@ -1,117 +1,388 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
 import asyncio
 from datetime import datetime
 import logging
+import os
+import time
+import numpy as np
 
+from .batching import MicroBatcher
+from .cascade import CascadeStage, DetectionCascade
+from .executor import InferenceExecutor
+from .registry import ModelRegistry, ModelVersion
 from .preprocessing import DataPreprocessor
 from .feature_extraction import FeatureExtractor
 from .models.anomaly_detector import AnomalyDetector
 from .models.network_classifier import NetworkClassifier
 from .models.log_analyzer import LogAnalyzer
-from ..models.threat import Threat
-from ..models.alert import Alert
-from ..db.session import get_db, get_async_mongo_db
+from .models.fast_log_classifier import FastLogClassifier
+from .models.base_model import BaseModel
+from ..services.persistence import ThreatWriter
+from ..services.alert_suppression import AlertSuppressor
+from ..core.config import get_settings
+from ..core.metrics import PIPELINE_STAGE_SECONDS, observe_inference, track_queue
+from ..core.startup import startup_profiler
 
 logger = logging.getLogger(__name__)
 
+# Log analyzer owned by a process-pool worker (see LOG_INFERENCE_MODE)
+_worker_log_analyzer = None
+
+def _init_log_worker(log_analyzer_path: str = None, fast_classifier: FastLogClassifier = None) -> None:
+    """Load the log analyzer once per worker process"""
+    global _worker_log_analyzer
+    _worker_log_analyzer = LogAnalyzer(fast_classifier=fast_classifier)
+    if log_analyzer_path:
+        _worker_log_analyzer.load_model(log_analyzer_path)
+
+def _analyze_logs_in_worker(logs: List[str]) -> Dict[str, Any]:
+    """Run log analysis inside a process-pool worker"""
+    return _worker_log_analyzer.analyze_log_pattern(logs)
+
 class ThreatDetectionPipeline:
     def __init__(self):
         self.preprocessor = DataPreprocessor()
         self.feature_extractor = FeatureExtractor()
-        self.anomaly_detector = AnomalyDetector()
-        self.network_classifier = NetworkClassifier()
-        self.log_analyzer = LogAnalyzer()
         
-    async def process_network_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
-        """Process network traffic data"""
-        try:
-            # Preprocess data
-            processed_data = self.preprocessor.preprocess_network_data(data)
+        # Models are built on first use (or by warm_up) to keep startup fast
+        settings = get_settings()
+        self.executor = InferenceExecutor(
+            thread_workers=settings.INFERENCE_THREAD_WORKERS,
+            process_workers=settings.INFERENCE_PROCESS_WORKERS,
+            heavy_mode=settings.LOG_INFERENCE_MODE,
+            process_initializer=_init_log_worker
+        )
+        self.registry = ModelRegistry(run_in_executor=self.executor.run)
+        self.registry.register_factory("anomaly_detector", AnomalyDetector)
+        self.registry.register_factory("network_classifier", NetworkClassifier)
+        self.registry.register_factory("fast_log_classifier", lambda: FastLogClassifier(
+            model_path=os.path.join(settings.MODEL_DIR, "fast_log_classifier")
+        ))
+        self.registry.register_factory("log_analyzer", lambda: LogAnalyzer(
+            fast_classifier=self.get_model("fast_log_classifier")
+        ), untrainable=LogAnalyzer.untrainable_reason)
+        self.registry.add_listener(self._on_model_swap)
+        self.ready = False
+        self.warmup_error = None
+        self._warmup_task: Optional[asyncio.Task] = None
+        # What process-pool workers build their log analyzer from (see _init_log_worker)
+        self._log_worker_args = {"log_analyzer_path": None, "fast_classifier": None}
+        
+        self.network_batcher = MicroBatcher(
+            self.process_network_batch,
+            max_batch_size=settings.INFERENCE_BATCH_MAX_SIZE,
+            max_wait_ms=settings.INFERENCE_BATCH_MAX_WAIT_MS,
+            name="network"
+        )
+        self.threat_writer = ThreatWriter(
+            max_queue_size=settings.PERSISTENCE_QUEUE_SIZE,
+            batch_size=settings.PERSISTENCE_BATCH_SIZE,
+            flush_interval_ms=settings.PERSISTENCE_FLUSH_INTERVAL_MS,
+            max_retries=settings.PERSISTENCE_MAX_RETRIES,
+            retry_backoff_ms=settings.PERSISTENCE_RETRY_BACKOFF_MS,
+            suppressor=AlertSuppressor(
+                window_seconds=settings.ALERT_SUPPRESSION_WINDOW_SECONDS,
+                max_keys=settings.ALERT_SUPPRESSION_MAX_KEYS,
+                flush_interval_ms=settings.ALERT_SUPPRESSION_FLUSH_INTERVAL_MS
+            ) if settings.ALERT_SUPPRESSION_ENABLED else None
+        )
+        self.anomaly_threshold = settings.MODEL_THRESHOLD
+        self.allowlist = set(settings.NETWORK_ALLOWLIST)
+        
+        # The cascade runs stages by cost: most benign traffic never reaches the classifier
+        self.network_cascade = DetectionCascade([
+            CascadeStage("allowlist", self._allowlist_stage, cost=0.01),
+            CascadeStage("anomaly_scoring", self._anomaly_stage, cost=1.0),
+            CascadeStage("classification", self._classification_stage, cost=5.0),
+            CascadeStage("persistence", self._network_persistence_stage, cost=20.0)
+        ], name="network")
+        self.log_cascade = DetectionCascade([
+            CascadeStage("log_analysis", self._log_analysis_stage, cost=10.0),
+            CascadeStage("persistence", self._log_persistence_stage, cost=20.0)
+        ], name="log")
+        self._preprocess_seconds = PIPELINE_STAGE_SECONDS.labels(pipeline="network", stage="preprocess")
+        self._feature_seconds = PIPELINE_STAGE_SECONDS.labels(pipeline="network", stage="feature_extraction")
+        
+        track_queue("network_batcher", lambda: self.network_batcher.queue_depth)
+        track_queue("executor_thread", lambda: self.executor.queue_depth("thread"))
+        track_queue("executor_process", lambda: self.executor.queue_depth("process"))
+        track_queue("persistence", lambda: self.threat_writer.queue_depth)
+        
+    def get_model(self, name: str) -> BaseModel:
+        """Get the live version of a pipeline model, constructing it on first use"""
+        return self.registry.get(name)
+        
+    def _on_model_swap(self, name: str, version: ModelVersion) -> None:
+        """Publish dependent versions and restart log workers after a swap"""
+        if name == "fast_log_classifier":
+            # The fast classifier is small enough to send to each worker as is
+            self._log_worker_args["fast_classifier"] = version.model
+            if self.registry.is_loaded("log_analyzer"):
+                # A new analyzer version, so requests holding the old one are unaffected;
+                # its own swap restarts the workers
+                live = self.registry.get_version("log_analyzer")
+                self.registry.swap(
+                    "log_analyzer", live.model.with_fast_classifier(version.model),
+                    version=f"{live.version}+{version.version}", source=f"fast_log_classifier {version.version}"
+                )
+                return
+        if name == "log_analyzer":
+            # Workers reload the transformer from its artifact
+            self._log_worker_args["log_analyzer_path"] = version.model.loaded_from
+        if name in ("log_analyzer", "fast_log_classifier") and self.executor.heavy_mode == "process":
+            self._recycle_log_workers()
             
-            # Extract features
-            features = self.feature_extractor.extract_network_features(data)
+    def _recycle_log_workers(self) -> None:
+        """Restart the log workers so they serve the swapped-in versions"""
+        self.executor.recycle_process_pool(initargs=(
+            self._log_worker_args["log_analyzer_path"],
+            self._log_worker_args["fast_classifier"]
+        ))
             
-            # Run anomaly detection
-            anomaly_score = self.anomaly_detector.predict_proba(features.reshape(1, -1))[0]
+    @property
+    def model_names(self) -> List[str]:
+        return self.registry.names
+        
+    @property
+    def anomaly_detector(self) -> AnomalyDetector:
+        return self.get_model("anomaly_detector")
+        
+    @property
+    def network_classifier(self) -> NetworkClassifier:
+        return self.get_model("network_classifier")
+        
+    @property
+    def log_analyzer(self) -> LogAnalyzer:
+        return self.get_model("log_analyzer")
+        
+    def load_models(self) -> None:
+        """Construct every model this process serves"""
+        for name in self.model_names:
+            # Process mode loads the log analyzer inside the worker processes
+            if name == "log_analyzer" and self.executor.heavy_mode == "process":
+                continue
+            self.get_model(name)
             
-            # Classify traffic
-            traffic_type = self.network_classifier.predict(features.reshape(1, -1))[0]
-            confidence = max(self.network_classifier.predict_proba(features.reshape(1, -1))[0])
+    @property
+    def warming_up(self) -> bool:
+        return self._warmup_task is not None and not self._warmup_task.done()
+        
+    def start_warm_up(self, run_inference: bool = True) -> asyncio.Task:
+        """Start ``warm_up`` in the background unless it is running or has succeeded"""
+        if self._warmup_task is None or (self._warmup_task.done() and not self.ready):
+            self._warmup_task = asyncio.ensure_future(self.warm_up(run_inference=run_inference))
+        return self._warmup_task
             
-            result = {
-                "timestamp": datetime.now().isoformat(),
-                "anomaly_score": float(anomaly_score),
-                "traffic_type": traffic_type,
-                "confidence": float(confidence),
-                "raw_data": data
-            }
+    async def warm_up(self, run_inference: bool = True) -> None:
+        """Load models off the event loop and optionally run a warm-up inference"""
+        self.warmup_error = None
+        try:
+            await self.executor.run(self.load_models)
+            if run_inference:
+                with startup_profiler.measure("warmup", "network"):
+                    await self._warm_up_network()
+                with startup_profiler.measure("warmup", "logs"):
+                    await self._warm_up_logs()
+        except Exception as e:
+            # Stay not ready; /ready reports the failure
+            self.warmup_error = f"{type(e).__name__}: {str(e)}"
+            logger.error(f"Error warming up models: {str(e)}")
+            return
+        self.ready = True
+            
+    async def _warm_up_network(self) -> None:
+        """Score one synthetic event if the network models are fitted"""
+        if self.anomaly_detector.engine is None and not hasattr(self.anomaly_detector.model, "estimators_"):
+            logger.info("Skipping network warm-up: anomaly detector is not trained")
+            return
+        event = {"bytes_sent": 0, "bytes_received": 0, "duration": 0, "protocol_type": 0}
+        await self.executor.run(self._score_anomalies, [event])
+        
+    async def _warm_up_logs(self) -> None:
+        """Classify one synthetic log line"""
+        lines = ["warm-up: service started"]
+        if self.executor.heavy_mode == "process":
+            await self.executor.run_heavy(_analyze_logs_in_worker, lines)
+        elif self.log_analyzer.backend != "linear" or self.log_analyzer.fast_classifier.is_trained:
+            await self.executor.run_heavy(self.log_analyzer.analyze_log_pattern, lines)
             
-            # Generate threat if anomaly detected
-            if anomaly_score > 0.8:  # Threshold for anomaly
-                await self._create_threat(result)
-                
-            return result
+    async def process_network_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Process network traffic data"""
+        try:
+            # Concurrent calls are scored together by the micro-batcher
+            return await self.network_batcher.submit(data)
             
         except Exception as e:
             logger.error(f"Error processing network data: {str(e)}")
             raise
             
-    async def process_log_data(self, logs: List[str]) -> Dict[str, Any]:
-        """Process log data"""
+    async def process_network_batch(self, events: List[Dict[str, Any]]) -> List[Any]:
+        """Process a batch of network events, returning results in input order.
+
+        A malformed event gets its ``ValueError`` in place of a result and is
+        left out before anything (window features, sketches, persistence)
+        records the batch.
+        """
+        if not events:
+            return []
+            
         try:
-            # Analyze logs
-            severity_analysis = self.log_analyzer.analyze_log_pattern(logs)
+            start = time.perf_counter()
+            results: List[Any] = self._preprocess_network_events(events)
+            self._preprocess_seconds.observe(time.perf_counter() - start)
+            valid = [i for i, error in enumerate(results) if error is None]
+            if not valid:
+                return results
             
-            result = {
-                "timestamp": datetime.now().isoformat(),
-                "severity_analysis": severity_analysis,
-                "raw_logs": logs
+            timestamp = datetime.now().isoformat()
+            context = {
+                "events": [events[i] for i in valid],
+                "results": [
+                    {
+                        "timestamp": timestamp,
+                        "anomaly_score": 0.0,
+                        "traffic_type": None,
+                        "confidence": None,
+                        "raw_data": events[i]
+                    }
+                    for i in valid
+                ]
             }
-            
-            # Generate threat if critical logs detected
-            if severity_analysis["critical_count"] > 0:
-                await self._create_threat(result, threat_type="log_based")
-                
-            return result
+            await self.network_cascade.run(context, len(valid))
+            for i, result in zip(valid, context["results"]):
+                results[i] = result
+            return results
             
         except Exception as e:
-            logger.error(f"Error processing log data: {str(e)}")
+            logger.error(f"Error processing network batch: {str(e)}")
             raise
             
-    async def _create_threat(self, data: Dict[str, Any], threat_type: str = "network_based") -> None:
-        """Create a threat entry and associated alert"""
-        mongo_db = get_async_mongo_db()
-        
-        # Store raw data in MongoDB
-        raw_data_id = await mongo_db.raw_data.insert_one(data)
-        
-        # Create threat in PostgreSQL
-        threat = Threat(
-            threat_type=threat_type,
-            severity=float(data.get("anomaly_score", 0.9)),
-            source_ip=data.get("raw_data", {}).get("source_ip"),
-            destination_ip=data.get("raw_data", {}).get("destination_ip"),
-            raw_data={"mongo_id": str(raw_data_id.inserted_id)},
-            status="detected",
-            confidence_score=float(data.get("confidence", 0.8))
-        )
+    def _preprocess_network_events(self, events: List[Any]) -> List[Any]:
+        """Validate every event, returning None or the error for each"""
+        errors = []
+        for data in events:
+            try:
+                self.preprocessor.preprocess_network_data(data)
+                errors.append(None)
+            except ValueError as e:
+                errors.append(e)
+        return errors
         
-        # Create alert
-        alert = Alert(
-            threat=threat,
-            alert_type=f"{threat_type}_threat",
-            message=f"Potential {threat_type} threat detected",
-            status="new",
-            metadata=data
+    async def _allowlist_stage(self, context: Dict[str, Any], active: np.ndarray) -> np.ndarray:
+        """Stop traffic from allowlisted sources"""
+        if not self.allowlist:
+            return active
+        events = context["events"]
+        return np.array(
+            [i for i in active if events[i].get("source_ip") not in self.allowlist],
+            dtype=np.intp
         )
         
-        db = next(get_db())
+    async def _anomaly_stage(self, context: Dict[str, Any], active: np.ndarray) -> np.ndarray:
+        """Score rows for anomalies and pass those above the threshold"""
+        events = context["events"]
+        # Feature extraction and model scoring run on the executor
+        async with self.registry.use("anomaly_detector") as detector:
+            features, anomaly_scores = await self.executor.run(
+                self._score_anomalies, [events[i] for i in active], detector
+            )
+        for i, anomaly_score in zip(active, anomaly_scores):
+            context["results"][i]["anomaly_score"] = float(anomaly_score)
+        context["features"] = dict(zip(active.tolist(), features))
+        return active[anomaly_scores > self.anomaly_threshold]
+        
+    async def _classification_stage(self, context: Dict[str, Any], active: np.ndarray) -> np.ndarray:
+        """Classify anomalous traffic"""
+        features = np.vstack([context["features"][i] for i in active])
+        start = time.perf_counter()
+        async with self.registry.use("network_classifier") as classifier:
+            traffic_types, probabilities = await self.executor.run(
+                classifier.predict_with_proba, features
+            )
+        observe_inference("network_classifier", len(active), time.perf_counter() - start)
+        for i, traffic_type, confidence in zip(active, traffic_types, probabilities.max(axis=1)):
+            result = context["results"][i]
+            result["traffic_type"] = traffic_type.item() if hasattr(traffic_type, "item") else traffic_type
+            result["confidence"] = float(confidence)
+        return active
+        
+    async def _network_persistence_stage(self, context: Dict[str, Any], active: np.ndarray) -> np.ndarray:
+        """Generate threats for anomalies in one bulk write"""
+        await self._create_threats([context["results"][i] for i in active])
+        return active
+        
+    def _score_anomalies(self, events: List[Dict[str, Any]], detector: AnomalyDetector = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Extract features and get anomaly scores (runs off the event loop)"""
+        start = time.perf_counter()
+        features = self.feature_extractor.extract_network_features_batch(events)
+        extracted = time.perf_counter()
+        scores = (detector or self.anomaly_detector).predict_proba(features)
+        self._feature_seconds.observe(extracted - start)
+        observe_inference("anomaly_detector", len(events), time.perf_counter() - extracted)
+        return features, scores
+            
+    async def process_log_data(self, logs: List[str]) -> Dict[str, Any]:
+        """Process log data"""
         try:
-            db.add(threat)
-            db.add(alert)
-            await db.commit()
+            context = {"logs": logs}
+            await self.log_cascade.run(context, 1)
+            return context["result"]
+            
         except Exception as e:
-            await db.rollback()
+            logger.error(f"Error processing log data: {str(e)}")
             raise
-        finally:
-            db.close()
+            
+    async def _log_analysis_stage(self, context: Dict[str, Any], active: np.ndarray) -> np.ndarray:
+        """Analyze logs and pass the batch on if critical lines were found"""
+        logs = context["logs"]
+        start = time.perf_counter()
+        if self.executor.heavy_mode == "process":
+            severity_analysis = await self.executor.run_heavy(_analyze_logs_in_worker, logs)
+        else:
+            async with self.registry.use("log_analyzer") as log_analyzer:
+                severity_analysis = await self.executor.run_heavy(
+                    log_analyzer.analyze_log_pattern, logs
+                )
+            
+        observe_inference("log_analyzer", len(logs), time.perf_counter() - start)
+            
+        context["result"] = {
+            "timestamp": datetime.now().isoformat(),
+            "severity_analysis": severity_analysis,
+            "raw_logs": logs
+        }
+        return active if severity_analysis["critical_count"] > 0 else active[:0]
+        
+    async def _log_persistence_stage(self, context: Dict[str, Any], active: np.ndarray) -> np.ndarray:
+        """Generate a threat for critical logs"""
+        await self._create_threat(context["result"], threat_type="log_based")
+        return active
+        
+    def get_stats(self) -> Dict[str, Any]:
+        """Get batching, executor and cascade statistics"""
+        stats = {
+            "network_batcher": self.network_batcher.get_stats(),
+            "executor": self.executor.get_stats(),
+            "network_cascade": self.network_cascade.get_stats(),
+            "log_cascade": self.log_cascade.get_stats(),
+            "persistence": self.threat_writer.get_stats(),
+            "models": {name: self.registry.get_info(name) for name in self.model_names}
+        }
+        if self.feature_extractor.window_features is not None:
+            stats["window_features"] = self.feature_extractor.window_features.get_stats()
+        if self.feature_extractor.traffic_sketches is not None:
+            stats["traffic_sketches"] = self.feature_extractor.traffic_sketches.get_stats()
+        return stats
+            
+    async def shutdown(self) -> None:
+        """Flush pending detections and release inference worker pools"""
+        await self.threat_writer.stop()
+        self.executor.shutdown(wait=False)
+            
+    async def _create_threat(self, data: Dict[str, Any], threat_type: str = "network_based") -> None:
+        """Create a threat entry and associated alert"""
+        await self._create_threats([data], threat_type=threat_type)
+        
+    async def _create_threats(self, detections: List[Dict[str, Any]], threat_type: str = "network_based") -> None:
+        """Queue threat entries and their alerts for a bulk write"""
+        await self.threat_writer.submit(detections, threat_type=threat_type)
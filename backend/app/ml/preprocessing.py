@@ -1,4 +1,5 @@
 from typing import Dict, List, Union, Any
+from datetime import datetime
 import numpy as np
 from sklearn.preprocessing import StandardScaler
 import pandas as pd
@@ -16,13 +17,24 @@ class DataPreprocessor:
         ]
         
     def preprocess_network_data(self, data: Dict[str, Any]) -> np.ndarray:
-        """Preprocess network traffic data"""
+        """Preprocess network traffic data, raising ValueError if it is malformed"""
+        if not isinstance(data, dict):
+            raise ValueError(f"Network event must be an object, not {type(data).__name__}")
         features = []
         for col in self.feature_columns:
-            if col in data:
-                features.append(float(data[col]))
-            else:
+            if data.get(col) is None:
                 features.append(0.0)
+                continue
+            try:
+                features.append(float(data[col]))
+            except (TypeError, ValueError):
+                raise ValueError(f"Invalid {col}: {data[col]!r}")
+        timestamp = data.get('timestamp')
+        if timestamp:
+            try:
+                datetime.fromisoformat(timestamp)
+            except (TypeError, ValueError):
+                raise ValueError(f"Invalid timestamp: {timestamp!r}")
         return np.array(features).reshape(1, -1)
     
     def preprocess_log_data(self, log_entry: str) -> Dict[str, Any]:
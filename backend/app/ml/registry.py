@@ -0,0 +1,192 @@
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+from contextlib import asynccontextmanager
+from datetime import datetime
+import asyncio
+import logging
+import threading
+
+from .models.base_model import BaseModel
+from ..core.startup import startup_profiler
+
+logger = logging.getLogger(__name__)
+
+SwapListener = Callable[[str, "ModelVersion"], None]
+
+class ModelVersion:
+    """A loaded model version with a count of in-flight users"""
+
+    def __init__(self, name: str, version: str, model: BaseModel, source: Optional[str] = None):
+        self.name = name
+        self.version = version
+        self.model = model
+        self.source = source
+        self.loaded_at = datetime.now()
+        self.refcount = 0
+        self.retired = False
+
+    def unload(self) -> None:
+        """Drop the model so its memory (and any mapped files) can be released"""
+        logger.info(f"Unloading model {self.name} version {self.version}")
+        self.model = None
+
+    def get_info(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "source": self.source,
+            "loaded_at": self.loaded_at.isoformat(),
+            "in_flight": self.refcount,
+            "retired": self.retired
+        }
+
+class ModelRegistry:
+    """Named, versioned models with atomic hot swap.
+
+    Readers look up the live version with a plain dict read and take a
+    reference for the duration of a request (``use``); a swap replaces the
+    dict entry, so new requests see the new version while in-flight ones
+    finish on the old one. A retired version is unloaded once its last
+    reference is released. References are counted on the event loop thread.
+
+    Initial versions are built on ``run_in_executor`` when first used from
+    the event loop; concurrent requests for a model still being built await
+    the same build instead of blocking the loop.
+    """
+
+    def __init__(self, run_in_executor: Optional[Callable] = None):
+        self._run_in_executor = run_in_executor
+        self._building: Dict[str, "asyncio.Future[ModelVersion]"] = {}
+        self._live: Dict[str, ModelVersion] = {}
+        self._factories: Dict[str, Callable[[], BaseModel]] = {}
+        self._untrainable: Dict[str, str] = {}
+        self._retired: List[ModelVersion] = []
+        self._listeners: List[SwapListener] = []
+        self._sequence: Dict[str, int] = {}
+        self._build_lock = threading.RLock()
+
+    def register_factory(self, name: str, factory: Callable[[], BaseModel], untrainable: Optional[str] = None) -> None:
+        """Register how to build the initial version of a model on first use.
+
+        ``untrainable`` is the reason new versions cannot be trained from data,
+        if they cannot.
+        """
+        self._factories[name] = factory
+        if untrainable:
+            self._untrainable[name] = untrainable
+
+    def untrainable_reason(self, name: str) -> Optional[str]:
+        """Why ``name`` cannot be trained, or None if it can"""
+        return self._untrainable.get(name)
+
+    def add_listener(self, listener: SwapListener) -> None:
+        """Call ``listener(name, version)`` after every swap"""
+        self._listeners.append(listener)
+
+    @property
+    def names(self) -> List[str]:
+        return list(self._factories.keys())
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._live
+
+    def get_version(self, name: str) -> ModelVersion:
+        """Get the live version, building the initial one if needed (blocks; not for the event loop)"""
+        live = self._live.get(name)
+        if live is not None:
+            return live
+        if name not in self._factories:
+            raise KeyError(f"Unknown model: {name}")
+        with self._build_lock:
+            if name not in self._live:
+                with startup_profiler.measure("model", name):
+                    model = self._factories[name]()
+                self._live[name] = ModelVersion(name, self._version_for(name, model), model, source="initial")
+            return self._live[name]
+
+    def get(self, name: str) -> BaseModel:
+        """Get the live model without taking a reference"""
+        return self.get_version(name).model
+
+    async def get_version_async(self, name: str) -> ModelVersion:
+        """Get the live version, building the initial one off the event loop if needed"""
+        live = self._live.get(name)
+        if live is not None:
+            return live
+        if name not in self._factories:
+            raise KeyError(f"Unknown model: {name}")
+        if self._run_in_executor is None:
+            return self.get_version(name)
+        build = self._building.get(name)
+        if build is None:
+            build = asyncio.ensure_future(self._run_in_executor(self.get_version, name))
+            self._building[name] = build
+            # A failed build is retried by the next caller
+            build.add_done_callback(lambda _: self._building.pop(name, None))
+        # Shielded so one cancelled request does not cancel the build for the others
+        return await asyncio.shield(build)
+
+    @asynccontextmanager
+    async def use(self, name: str) -> AsyncIterator[BaseModel]:
+        """Hold a reference to the live version for the duration of a request"""
+        version = await self.get_version_async(name)
+        version.refcount += 1
+        try:
+            yield version.model
+        finally:
+            version.refcount -= 1
+            if version.retired and version.refcount == 0:
+                self._unload(version)
+
+    def create(self, name: str) -> BaseModel:
+        """Build a fresh, unregistered instance (e.g. to train a new version)"""
+        if name not in self._factories:
+            raise KeyError(f"Unknown model: {name}")
+        return self._factories[name]()
+
+    def swap(self, name: str, model: BaseModel, version: Optional[str] = None,
+             source: Optional[str] = None) -> ModelVersion:
+        """Make ``model`` the live version of ``name``"""
+        if name not in self._factories:
+            raise KeyError(f"Unknown model: {name}")
+        new_version = ModelVersion(name, version or self._version_for(name, model), model, source=source)
+        old_version = self._live.get(name)
+        self._live[name] = new_version
+        logger.info(f"Model {name} now serving version {new_version.version}")
+
+        if old_version is not None:
+            old_version.retired = True
+            if old_version.refcount == 0:
+                self._unload(old_version)
+            else:
+                self._retired.append(old_version)
+
+        for listener in self._listeners:
+            listener(name, new_version)
+        return new_version
+
+    async def load_version(self, name: str, loader: Callable[[], BaseModel], run_in_executor: Callable,
+                           version: Optional[str] = None, source: Optional[str] = None) -> ModelVersion:
+        """Build a new version off the event loop, then swap it in"""
+        model = await run_in_executor(loader)
+        return self.swap(name, model, version=version, source=source)
+
+    def _unload(self, version: ModelVersion) -> None:
+        if version in self._retired:
+            self._retired.remove(version)
+        version.unload()
+
+    def _version_for(self, name: str, model: BaseModel) -> str:
+        """Use the artifact's version when there is one, otherwise a sequence number"""
+        if model.manifest and model.manifest.get("model_version"):
+            return str(model.manifest["model_version"])
+        self._sequence[name] = self._sequence.get(name, 0) + 1
+        return f"v{self._sequence[name]}"
+
+    def get_info(self, name: str) -> Dict[str, Any]:
+        """Describe the live and draining versions of a model"""
+        live = self._live.get(name)
+        return {
+            "name": name,
+            "loaded": live is not None,
+            "live": live.get_info() if live else None,
+            "draining": [version.get_info() for version in self._retired if version.name == name]
+        }
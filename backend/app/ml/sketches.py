@@ -0,0 +1,358 @@
+"""Fixed-size probabilistic sketches over network traffic.
+
+Exact per-IP sets of ports or peers grow with the traffic, which is worst
+during a flood or a scan. The sketches here have a memory footprint fixed
+at construction, are updated a whole batch at a time with NumPy, and merge
+by element-wise max (HyperLogLog) or sum (count-min):
+
+    HyperLogLog           distinct count of a whole stream
+    CountMinSketch        per-key counts (flows, bytes); never underestimates
+    KeyedDistinctSketch   distinct values per key: a count-min grid whose
+                          cells are small HyperLogLogs
+    HeavyHitters          count-min plus a bounded candidate set of top keys
+
+``TrafficSketches`` keeps one set per time bucket in a ring, so queries
+cover a sliding window and expired buckets are simply reset.
+"""
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import heapq
+import socket
+import struct
+import threading
+import zlib
+import numpy as np
+
+GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+
+def splitmix64(x: np.ndarray) -> np.ndarray:
+    """Well-mixed 64-bit hashes of uint64 values (wrapping arithmetic)"""
+    z = x.astype(np.uint64) + GOLDEN
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+def _key_value(key: Any) -> int:
+    """IPv4 strings as their address, integers as-is, anything else by CRC (disjoint range)"""
+    if isinstance(key, (int, np.integer)):
+        return int(key) & 0xFFFFFFFFFFFFFFFF
+    try:
+        return struct.unpack("!I", socket.inet_aton(key))[0]
+    except (OSError, TypeError):
+        return (1 << 32) | zlib.crc32(str(key).encode())
+
+def hash_keys(keys: Sequence[Any]) -> np.ndarray:
+    return splitmix64(np.fromiter((_key_value(key) for key in keys), dtype=np.uint64, count=len(keys)))
+
+def row_hashes(hashes: np.ndarray, depth: int) -> np.ndarray:
+    """Independent hash per sketch row, shape ``(depth, n)``"""
+    seeds = np.arange(1, depth + 1, dtype=np.uint64)[:, None] * GOLDEN
+    return splitmix64(hashes[None, :] ^ seeds)
+
+def hll_rank(hashes: np.ndarray, precision: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Register index and rank (position of the first set bit) for each hash"""
+    index = (hashes >> np.uint64(64 - precision)).astype(np.intp)
+    # The 32 bits after the index; frexp's exponent is their bit length
+    rest = ((hashes >> np.uint64(32 - precision)) & np.uint64(0xFFFFFFFF)).astype(np.float64)
+    rank = 33 - np.frexp(rest)[1]
+    return index, rank.astype(np.uint8)
+
+def hll_estimate(registers: np.ndarray) -> np.ndarray:
+    """Cardinality estimate for register arrays (registers on the last axis)"""
+    m = registers.shape[-1]
+    alpha = {16: 0.673, 32: 0.697, 64: 0.709}.get(m, 0.7213 / (1 + 1.079 / m))
+    raw = alpha * m * m / np.sum(np.exp2(-registers.astype(np.float64)), axis=-1)
+    zeros = np.count_nonzero(registers == 0, axis=-1)
+    # Linear counting is more accurate while many registers are still empty
+    small = (raw <= 2.5 * m) & (zeros > 0)
+    return np.where(small, m * np.log(m / np.maximum(zeros, 1)), raw)
+
+class HyperLogLog:
+    """Distinct count with ~1.04 / sqrt(2 ** precision) relative error"""
+
+    def __init__(self, precision: int = 12):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def add(self, hashes: np.ndarray) -> None:
+        index, rank = hll_rank(hashes, self.precision)
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, other: "HyperLogLog") -> None:
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def estimate(self) -> float:
+        return float(hll_estimate(self.registers))
+
+    def clear(self) -> None:
+        self.registers.fill(0)
+
+class CountMinSketch:
+    """Per-key counts; an estimate exceeds the true count by at most e/width of the total w.h.p."""
+
+    def __init__(self, width: int = 2048, depth: int = 4):
+        self.width = width
+        self.depth = depth
+        self.table = np.zeros((depth, width), dtype=np.int64)
+        self.total = 0
+
+    def cells(self, hashes: np.ndarray) -> np.ndarray:
+        return (row_hashes(hashes, self.depth) % np.uint64(self.width)).astype(np.intp)
+
+    def add(self, hashes: np.ndarray, counts: Optional[np.ndarray] = None) -> None:
+        counts = np.ones(len(hashes), dtype=np.int64) if counts is None else counts.astype(np.int64)
+        for row, cells in enumerate(self.cells(hashes)):
+            np.add.at(self.table[row], cells, counts)
+        self.total += int(counts.sum())
+
+    def gather(self, hashes: np.ndarray) -> np.ndarray:
+        """Counters for each key, shape ``(depth, n)``; the estimate is their minimum"""
+        return np.take_along_axis(self.table, self.cells(hashes), axis=1)
+
+    def query(self, hashes: np.ndarray) -> np.ndarray:
+        return self.gather(hashes).min(axis=0)
+
+    def merge(self, other: "CountMinSketch") -> None:
+        self.table += other.table
+        self.total += other.total
+
+    def clear(self) -> None:
+        self.table.fill(0)
+        self.total = 0
+
+class KeyedDistinctSketch:
+    """Distinct values per key (e.g. ports per source) in fixed memory.
+
+    Each key maps to one HyperLogLog per row; keys sharing a cell only ever
+    inflate each other's counts, so the smallest estimate across rows wins.
+    """
+
+    def __init__(self, width: int = 1024, depth: int = 4, precision: int = 6):
+        self.width = width
+        self.depth = depth
+        self.precision = precision
+        self.registers = np.zeros((depth, width, 1 << precision), dtype=np.uint8)
+
+    def cells(self, key_hashes: np.ndarray) -> np.ndarray:
+        return (row_hashes(key_hashes, self.depth) % np.uint64(self.width)).astype(np.intp)
+
+    def add(self, key_hashes: np.ndarray, value_hashes: np.ndarray) -> None:
+        index, rank = hll_rank(value_hashes, self.precision)
+        for row, cells in enumerate(self.cells(key_hashes)):
+            np.maximum.at(self.registers[row], (cells, index), rank)
+
+    def gather(self, key_hashes: np.ndarray) -> np.ndarray:
+        """Registers for each key, shape ``(depth, n, 2 ** precision)``"""
+        cells = self.cells(key_hashes)
+        return self.registers[np.arange(self.depth)[:, None], cells]
+
+    def query(self, key_hashes: np.ndarray) -> np.ndarray:
+        return hll_estimate(self.gather(key_hashes)).min(axis=0)
+
+    def merge(self, other: "KeyedDistinctSketch") -> None:
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def clear(self) -> None:
+        self.registers.fill(0)
+
+class HeavyHitters:
+    """Top keys by count: a count-min sketch plus at most ``k`` candidates"""
+
+    def __init__(self, k: int = 100, width: int = 2048, depth: int = 4):
+        self.k = k
+        self.sketch = CountMinSketch(width, depth)
+        self.candidates: Dict[Any, int] = {}
+
+    def add(self, keys: Sequence[Any], hashes: np.ndarray, counts: Optional[np.ndarray] = None) -> None:
+        self.sketch.add(hashes, counts)
+        unique = {}
+        for key, key_hash in zip(keys, hashes.tolist()):
+            unique[key] = key_hash
+        estimates = self.sketch.query(np.fromiter(unique.values(), dtype=np.uint64, count=len(unique)))
+        self.candidates.update(zip(unique, estimates.tolist()))
+        if len(self.candidates) > self.k:
+            self.candidates = dict(heapq.nlargest(self.k, self.candidates.items(), key=lambda item: item[1]))
+
+    def top(self, n: Optional[int] = None) -> List[Tuple[Any, int]]:
+        return heapq.nlargest(n or self.k, self.candidates.items(), key=lambda item: item[1])
+
+    def clear(self) -> None:
+        self.sketch.clear()
+        self.candidates = {}
+
+class SketchBucket:
+    """Every traffic sketch for one time bucket"""
+
+    def __init__(self, top_k: int, width: int, depth: int, distinct_width: int, distinct_precision: int):
+        self.epoch = -1
+        self.sources = HyperLogLog()
+        self.destinations = HyperLogLog()
+        self.flows_by_source = HeavyHitters(top_k, width, depth)
+        self.bytes_by_source = HeavyHitters(top_k, width, depth)
+        self.flows_by_destination = CountMinSketch(width, depth)
+        self.ports_by_source = KeyedDistinctSketch(distinct_width, depth, distinct_precision)
+        self.destinations_by_source = KeyedDistinctSketch(distinct_width, depth, distinct_precision)
+        self.sources_by_destination = KeyedDistinctSketch(distinct_width, depth, distinct_precision)
+
+    @property
+    def sketches(self) -> List[Any]:
+        return [
+            self.sources, self.destinations, self.flows_by_source, self.bytes_by_source,
+            self.flows_by_destination, self.ports_by_source, self.destinations_by_source,
+            self.sources_by_destination
+        ]
+
+    def clear(self, epoch: int) -> None:
+        for sketch in self.sketches:
+            sketch.clear()
+        self.epoch = epoch
+
+    @property
+    def nbytes(self) -> int:
+        return (
+            self.sources.registers.nbytes + self.destinations.registers.nbytes
+            + self.flows_by_source.sketch.table.nbytes + self.bytes_by_source.sketch.table.nbytes
+            + self.flows_by_destination.table.nbytes + self.ports_by_source.registers.nbytes
+            + self.destinations_by_source.registers.nbytes + self.sources_by_destination.registers.nbytes
+        )
+
+class TrafficSketches:
+    """Sliding-window traffic sketches with fixed memory.
+
+    The window is a ring of ``buckets`` buckets of ``window_seconds / buckets``
+    seconds each, indexed by event time. Events older than the ring are
+    ignored. ``update`` returns per-event estimates for the window so far.
+    """
+
+    FEATURES = [
+        "src_flows", "src_distinct_ports", "src_distinct_destinations",
+        "dst_flows", "dst_distinct_sources"
+    ]
+
+    def __init__(self, window_seconds: float = 60.0, buckets: int = 6, top_k: int = 100,
+                 width: int = 2048, depth: int = 4, distinct_width: int = 1024, distinct_precision: int = 6):
+        self.window_seconds = window_seconds
+        self.bucket_seconds = window_seconds / buckets
+        self.buckets = [
+            SketchBucket(top_k, width, depth, distinct_width, distinct_precision) for _ in range(buckets)
+        ]
+        self.top_k = top_k
+        self.latest_epoch = -1
+        self.events = 0
+        self._lock = threading.Lock()
+
+    def _live(self) -> List[SketchBucket]:
+        oldest = self.latest_epoch - len(self.buckets)
+        return [bucket for bucket in self.buckets if bucket.epoch > oldest]
+
+    def update(self, events: List[Dict[str, Any]], times: np.ndarray, features: bool = True) -> Optional[np.ndarray]:
+        """Add events (at ``times``, epoch seconds) and optionally return their feature rows"""
+        if not events:
+            return np.zeros((0, len(self.FEATURES))) if features else None
+        sources = [event.get("source_ip") or "" for event in events]
+        destinations = [event.get("destination_ip") or "" for event in events]
+        source_hashes = hash_keys(sources)
+        destination_hashes = hash_keys(destinations)
+        # Ports hash into their own range so they never collide with addresses
+        port_hashes = splitmix64(
+            np.array([event.get("port_number", 0) or 0 for event in events], dtype=np.uint64) | np.uint64(1 << 40)
+        )
+        sent = np.array([event.get("bytes_sent", 0) or 0 for event in events], dtype=np.float64)
+        received = np.array([event.get("bytes_received", 0) or 0 for event in events], dtype=np.float64)
+        transferred = (sent + received).astype(np.int64)
+        epochs = np.floor(times / self.bucket_seconds).astype(np.int64)
+
+        with self._lock:
+            self.latest_epoch = max(self.latest_epoch, int(epochs.max()))
+            oldest = self.latest_epoch - len(self.buckets)
+            for epoch in np.unique(epochs[epochs > oldest]).tolist():
+                bucket = self.buckets[epoch % len(self.buckets)]
+                if bucket.epoch < epoch:
+                    bucket.clear(epoch)
+                elif bucket.epoch > epoch:
+                    continue  # the ring has moved past this bucket
+                rows = np.flatnonzero(epochs == epoch)
+                bucket_sources = [sources[i] for i in rows]
+                bucket.sources.add(source_hashes[rows])
+                bucket.destinations.add(destination_hashes[rows])
+                bucket.flows_by_source.add(bucket_sources, source_hashes[rows])
+                bucket.bytes_by_source.add(bucket_sources, source_hashes[rows], transferred[rows])
+                bucket.flows_by_destination.add(destination_hashes[rows])
+                bucket.ports_by_source.add(source_hashes[rows], port_hashes[rows])
+                bucket.destinations_by_source.add(source_hashes[rows], destination_hashes[rows])
+                bucket.sources_by_destination.add(destination_hashes[rows], source_hashes[rows])
+            self.events += len(events)
+            return self._features(source_hashes, destination_hashes) if features else None
+
+    def _features(self, source_hashes: np.ndarray, destination_hashes: np.ndarray) -> np.ndarray:
+        """Window estimates, combining buckets cell by cell for just these keys"""
+        live = self._live()
+
+        def counts(sketches: List[CountMinSketch], hashes: np.ndarray) -> np.ndarray:
+            return np.sum([sketch.gather(hashes) for sketch in sketches], axis=0).min(axis=0)
+
+        def distinct(sketches: List[KeyedDistinctSketch], hashes: np.ndarray) -> np.ndarray:
+            return hll_estimate(np.max([sketch.gather(hashes) for sketch in sketches], axis=0)).min(axis=0)
+
+        return np.stack([
+            counts([bucket.flows_by_source.sketch for bucket in live], source_hashes),
+            distinct([bucket.ports_by_source for bucket in live], source_hashes),
+            distinct([bucket.destinations_by_source for bucket in live], source_hashes),
+            counts([bucket.flows_by_destination for bucket in live], destination_hashes),
+            distinct([bucket.sources_by_destination for bucket in live], destination_hashes)
+        ], axis=1).astype(np.float64)
+
+    def top_sources(self, n: int = 10, by: str = "flows") -> List[Dict[str, Any]]:
+        """Heaviest sources in the window by flow count or bytes"""
+        with self._lock:
+            live = self._live()
+            if not live:
+                return []
+            ranking = "bytes_by_source" if by == "bytes" else "flows_by_source"
+            keys = list({key for bucket in live for key in getattr(bucket, ranking).candidates})
+            if not keys:
+                return []
+            hashes = hash_keys(keys)
+            flows = np.sum([bucket.flows_by_source.sketch.gather(hashes) for bucket in live], axis=0).min(axis=0)
+            transferred = np.sum([bucket.bytes_by_source.sketch.gather(hashes) for bucket in live], axis=0).min(axis=0)
+            ports = hll_estimate(np.max([bucket.ports_by_source.gather(hashes) for bucket in live], axis=0)).min(axis=0)
+            peers = hll_estimate(
+                np.max([bucket.destinations_by_source.gather(hashes) for bucket in live], axis=0)
+            ).min(axis=0)
+            order = np.argsort(-(transferred if by == "bytes" else flows), kind="stable")[:n]
+            return [
+                {
+                    "source_ip": keys[i],
+                    "flows": int(flows[i]),
+                    "bytes": int(transferred[i]),
+                    "distinct_ports": round(float(ports[i])),
+                    "distinct_destinations": round(float(peers[i]))
+                }
+                for i in order.tolist()
+            ]
+
+    def summary(self) -> Dict[str, Any]:
+        """Window totals and distinct counts"""
+        with self._lock:
+            live = self._live()
+            if not live:
+                return {"window_seconds": self.window_seconds, "flows": 0, "bytes": 0,
+                        "distinct_sources": 0, "distinct_destinations": 0}
+            sources, destinations = HyperLogLog(), HyperLogLog()
+            for bucket in live:
+                sources.merge(bucket.sources)
+                destinations.merge(bucket.destinations)
+            return {
+                "window_seconds": self.window_seconds,
+                "flows": sum(bucket.flows_by_source.sketch.total for bucket in live),
+                "bytes": sum(bucket.bytes_by_source.sketch.total for bucket in live),
+                "distinct_sources": round(sources.estimate()),
+                "distinct_destinations": round(destinations.estimate())
+            }
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "window_seconds": self.window_seconds,
+            "buckets": len(self.buckets),
+            "events": self.events,
+            "memory_bytes": sum(bucket.nbytes for bucket in self.buckets)
+        }
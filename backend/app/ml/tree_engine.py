@@ -0,0 +1,151 @@
+from typing import Dict, List, Optional
+import numpy as np
+
+def average_path_length(n_samples: np.ndarray) -> np.ndarray:
+    """Average path length of an unsuccessful BST search (isolation forest c(n))"""
+    n_samples = np.asarray(n_samples, dtype=np.float64)
+    lengths = np.zeros_like(n_samples)
+    lengths[n_samples == 2] = 1.0
+    mask = n_samples > 2
+    n = n_samples[mask]
+    lengths[mask] = 2.0 * (np.log(n - 1.0) + np.euler_gamma) - 2.0 * (n - 1.0) / n
+    return lengths
+
+class CompiledForest:
+    """Tree ensemble flattened into NumPy node arrays.
+
+    All trees share one set of arrays (feature, threshold, left, right, value)
+    indexed by a global node id. A batch is evaluated level by level for every
+    tree at once; leaves point to themselves so finished rows drop out.
+    ``leaf_mean`` averages the per-leaf values over all trees, which is all
+    that random forest probabilities and isolation forest scores need.
+    """
+
+    ARRAYS = ("feature", "threshold", "left", "right", "value", "roots")
+
+    def __init__(
+        self,
+        feature: np.ndarray,
+        threshold: np.ndarray,
+        left: np.ndarray,
+        right: np.ndarray,
+        value: np.ndarray,
+        roots: np.ndarray,
+        max_depth: int,
+        chunk_size: int = 4096
+    ):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.max_depth = int(max_depth)
+        self.chunk_size = chunk_size
+
+    @classmethod
+    def from_trees(
+        cls,
+        trees: List,
+        values: List[np.ndarray],
+        feature_maps: Optional[List[np.ndarray]] = None
+    ) -> "CompiledForest":
+        """Flatten fitted sklearn ``tree_`` objects and their per-node values"""
+        features, thresholds, lefts, rights, roots = [], [], [], [], []
+        offset, max_depth = 0, 0
+        for t, tree in enumerate(trees):
+            n_nodes = tree.node_count
+            node_ids = np.arange(n_nodes)
+            is_leaf = tree.children_left == -1
+            feature = np.where(is_leaf, 0, tree.feature).astype(np.intp)
+            if feature_maps is not None:
+                # Trees fitted on a feature subset index into that subset
+                feature = np.asarray(feature_maps[t], dtype=np.intp)[feature]
+            features.append(feature)
+            thresholds.append(np.where(is_leaf, np.inf, tree.threshold))
+            lefts.append(np.where(is_leaf, node_ids, tree.children_left) + offset)
+            rights.append(np.where(is_leaf, node_ids, tree.children_right) + offset)
+            roots.append(offset)
+            offset += n_nodes
+            max_depth = max(max_depth, tree.max_depth)
+
+        return cls(
+            feature=np.concatenate(features),
+            threshold=np.concatenate(thresholds).astype(np.float64),
+            left=np.concatenate(lefts).astype(np.intp),
+            right=np.concatenate(rights).astype(np.intp),
+            value=np.concatenate(values).astype(np.float64),
+            roots=np.asarray(roots, dtype=np.intp),
+            max_depth=max_depth
+        )
+
+    @classmethod
+    def from_random_forest(cls, model) -> "CompiledForest":
+        """Compile a fitted single-output RandomForestClassifier"""
+        trees = [estimator.tree_ for estimator in model.estimators_]
+        values = []
+        for tree in trees:
+            counts = tree.value[:, 0, :]
+            totals = counts.sum(axis=1, keepdims=True)
+            values.append(counts / np.where(totals == 0, 1.0, totals))
+        return cls.from_trees(trees, values)
+
+    @classmethod
+    def from_isolation_forest(cls, model) -> "CompiledForest":
+        """Compile a fitted IsolationForest into normalized path lengths"""
+        trees = [estimator.tree_ for estimator in model.estimators_]
+        normalizer = average_path_length([model.max_samples_])[0]
+        values = []
+        for tree in trees:
+            depth = _node_depths(tree)
+            path_length = depth + average_path_length(tree.n_node_samples)
+            values.append((path_length / normalizer)[:, None])
+
+        feature_maps = None
+        if getattr(model, "_max_features", model.n_features_in_) != model.n_features_in_:
+            feature_maps = model.estimators_features_
+        return cls.from_trees(trees, values, feature_maps)
+
+    def apply(self, X: np.ndarray) -> np.ndarray:
+        """Get the global leaf id reached in every tree, shape (n_trees, n_samples)"""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        n_samples, n_features = X.shape
+        values = X.ravel()
+        nodes = np.repeat(self.roots, n_samples)
+        offsets = np.tile(np.arange(n_samples, dtype=np.intp) * n_features, len(self.roots))
+        # Only (tree, row) pairs that have not reached a leaf are advanced
+        active = np.arange(nodes.size)
+        for _ in range(self.max_depth):
+            current = nodes[active]
+            go_left = values[offsets[active] + self.feature[current]] <= self.threshold[current]
+            following = np.where(go_left, self.left[current], self.right[current])
+            nodes[active] = following
+            active = active[following != current]
+            if not active.size:
+                break
+        return nodes.reshape(len(self.roots), n_samples)
+
+    def leaf_mean(self, X: np.ndarray) -> np.ndarray:
+        """Average leaf value over all trees, shape (n_samples, n_outputs)"""
+        X = np.asarray(X)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        output = np.empty((X.shape[0], self.value.shape[1]))
+        for start in range(0, X.shape[0], self.chunk_size):
+            leaves = self.apply(X[start:start + self.chunk_size])
+            output[start:start + self.chunk_size] = self.value[leaves].mean(axis=0)
+        return output
+
+    def get_arrays(self) -> Dict[str, np.ndarray]:
+        """Get the flat node arrays (e.g. for persistence)"""
+        return {name: getattr(self, name) for name in self.ARRAYS}
+
+def _node_depths(tree) -> np.ndarray:
+    """Depth of every node in a fitted sklearn tree"""
+    depth = np.zeros(tree.node_count)
+    for node in range(tree.node_count):
+        # Children always have larger ids than their parent
+        for child in (tree.children_left[node], tree.children_right[node]):
+            if child != -1:
+                depth[child] = depth[node] + 1
+    return depth
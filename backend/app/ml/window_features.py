@@ -0,0 +1,260 @@
+"""Sliding-window flow aggregates per IP address.
+
+Each key (a source or destination IP) owns one row of preallocated NumPy
+arrays. For every window the row holds a ring of ``slots`` time buckets of
+``span / slots`` seconds; a bucket is reset when the ring wraps onto it, so
+a window covers between ``span - span / slots`` and ``span`` seconds of
+history. Recording an event touches one bucket per window and reading the
+aggregates sums a fixed number of buckets, so the cost per event does not
+depend on how much traffic a key has seen.
+
+Distinct destination ports are estimated with a small bitmap per bucket
+(linear counting): exact up to a few dozen ports and saturating around
+``PORT_BITS * ln(PORT_BITS)``, which is plenty to tell a scan from normal use.
+
+Memory is bounded by ``max_keys`` rows. Keys idle for longer than the
+longest window are dropped in periodic sweeps, and when the table is full
+the least recently seen tenth of the keys is evicted.
+"""
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import threading
+import numpy as np
+
+# name, span in seconds, buckets
+WINDOWS: List[Tuple[str, float, int]] = [("10s", 10.0, 5), ("1m", 60.0, 6), ("5m", 300.0, 5)]
+METRICS = ["flows", "bytes_out", "bytes_in", "distinct_ports", "failed_rate"]
+PORT_BITS = 128
+# A flow is failed when marked so or when the responder sent at most a bare TCP reset
+FAILED_MAX_BYTES_RECEIVED = 60
+EVICT_FRACTION = 0.1
+
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+_PORT_SHIFT = 32 - int(np.log2(PORT_BITS))
+
+def port_bits(ports: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Bitmap word and bit for each port (multiplicative hashing)"""
+    index = ((ports.astype(np.uint64) * np.uint64(0x9E3779B1)) & np.uint64(0xFFFFFFFF)) >> np.uint64(_PORT_SHIFT)
+    return (index >> np.uint64(6)).astype(np.intp), np.uint64(1) << (index & np.uint64(63))
+
+def estimate_distinct(bitmaps: np.ndarray) -> np.ndarray:
+    """Linear-counting estimate from OR-ed bitmaps (last axis = 64-bit words)"""
+    ones = _POPCOUNT[bitmaps.view(np.uint8)].sum(axis=-1, dtype=np.int64)
+    zeros = np.maximum(PORT_BITS - ones, 1)
+    return np.where(ones == 0, 0.0, -PORT_BITS * np.log(zeros / PORT_BITS))
+
+class SlidingWindowStore:
+    """Windowed flow count, bytes, distinct ports and failure rate per key"""
+
+    def __init__(self, max_keys: int = 100000, windows: Sequence[Tuple[str, float, int]] = WINDOWS,
+                 idle_seconds: Optional[float] = None, initial_keys: int = 1024):
+        self.windows = list(windows)
+        self.max_keys = max(1, max_keys)
+        self.idle_seconds = idle_seconds or max(span for _, span, _ in self.windows)
+        slots = [count for _, _, count in self.windows]
+        self.offsets = np.cumsum([0] + slots[:-1])
+        # Per-bucket-column width and ring length
+        self.widths = np.concatenate([np.full(count, span / count) for _, span, count in self.windows])
+        self.ring_sizes = np.concatenate([np.full(count, count) for count in slots])
+        self.columns = int(sum(slots))
+        self.words = PORT_BITS // 64
+
+        self._index: Dict[Any, int] = {}
+        self._keys: List[Any] = []
+        self._free: List[int] = []
+        self._lock = threading.Lock()
+        self._swept_at = float("-inf")
+        self.capacity = 0
+        self.evictions = 0
+        self._allocate(min(self.max_keys, max(1, initial_keys)))
+
+    @property
+    def feature_names(self) -> List[str]:
+        return [f"{metric}_{name}" for name, _, _ in self.windows for metric in METRICS]
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def _allocate(self, capacity: int) -> None:
+        """Grow the bucket arrays to ``capacity`` rows"""
+        def grow(array: Optional[np.ndarray], shape: Tuple[int, ...], dtype, fill=0) -> np.ndarray:
+            grown = np.full(shape, fill, dtype=dtype)
+            if array is not None:
+                grown[:len(array)] = array
+            return grown
+
+        existing = self.capacity > 0
+        self.epochs = grow(self.epochs if existing else None, (capacity, self.columns), np.int64, -1)
+        self.flows = grow(self.flows if existing else None, (capacity, self.columns), np.int32)
+        self.failed = grow(self.failed if existing else None, (capacity, self.columns), np.int32)
+        self.bytes_out = grow(self.bytes_out if existing else None, (capacity, self.columns), np.float32)
+        self.bytes_in = grow(self.bytes_in if existing else None, (capacity, self.columns), np.float32)
+        self.ports = grow(self.ports if existing else None, (capacity, self.columns, self.words), np.uint64)
+        self.last_seen = grow(self.last_seen if existing else None, (capacity,), np.float64, -np.inf)
+        self.capacity = capacity
+
+    def _release(self, rows: np.ndarray) -> None:
+        for row in rows.tolist():
+            del self._index[self._keys[row]]
+            self._keys[row] = None
+            self._free.append(row)
+        self.epochs[rows] = -1
+        self.last_seen[rows] = -np.inf
+
+    def _sweep(self, now: float) -> int:
+        """Release keys idle for longer than ``idle_seconds``"""
+        self._swept_at = now
+        used = len(self._keys)
+        idle = np.flatnonzero(self.last_seen[:used] < now - self.idle_seconds)
+        idle = idle[[self._keys[row] is not None for row in idle.tolist()]] if len(idle) else idle
+        self._release(idle)
+        self.evictions += len(idle)
+        return len(idle)
+
+    def _reserve(self, keys: Sequence[Any], now: float) -> None:
+        """Make room for the keys of a batch without releasing any of its rows"""
+        new = len(set(keys).difference(self._index))
+        available = len(self._free) + self.capacity - len(self._keys)
+        if new <= available:
+            return
+        if self.capacity < self.max_keys:
+            self._allocate(min(self.max_keys, max(self.capacity * 2, len(self._index) + new)))
+            available = len(self._free) + self.capacity - len(self._keys)
+        if new > available and self._sweep(now):
+            # Batch keys that were idle are new again
+            new = len(set(keys).difference(self._index))
+            available = len(self._free) + self.capacity - len(self._keys)
+        if new > available:
+            # Table full of active keys: drop the least recently seen, never one this batch uses
+            used = len(self._keys)
+            candidates = self.last_seen[:used].copy()
+            candidates[[row for row in range(used) if self._keys[row] is None]] = np.inf
+            candidates[[self._index[key] for key in set(keys) if key in self._index]] = np.inf
+            count = max(new - available, int(self.capacity * EVICT_FRACTION))
+            count = min(count, int(np.isfinite(candidates).sum()))
+            oldest = np.argpartition(candidates, count - 1)[:count]
+            self._release(oldest)
+            self.evictions += count
+
+    def _row(self, key: Any, now: float) -> int:
+        row = self._index.get(key)
+        if row is None:
+            if self._free:
+                row = self._free.pop()
+                self._keys[row] = key
+            else:
+                row = len(self._keys)
+                self._keys.append(key)
+            self._index[key] = row
+        self.last_seen[row] = now
+        return row
+
+    def update(self, keys: Sequence[Any], times: np.ndarray, bytes_out: np.ndarray, bytes_in: np.ndarray,
+               ports: np.ndarray, failed: np.ndarray) -> np.ndarray:
+        """Record one flow per key and return each key's aggregates including it.
+
+        Returns an array of shape ``(len(keys), len(feature_names))``.
+        """
+        n = len(keys)
+        if n == 0:
+            return np.zeros((0, len(self.feature_names)))
+        if n > self.max_keys and len(set(keys)) > self.max_keys:
+            # More distinct keys than rows: no batch may evict its own keys
+            step = self.max_keys
+            return np.vstack([
+                self.update(keys[i:i + step], times[i:i + step], bytes_out[i:i + step], bytes_in[i:i + step],
+                            ports[i:i + step], failed[i:i + step])
+                for i in range(0, n, step)
+            ])
+        with self._lock:
+            now = float(times.max())
+            if now - self._swept_at >= self.idle_seconds / 4:
+                self._sweep(now)
+            self._reserve(keys, now)
+            rows = np.fromiter((self._row(key, now) for key in keys), dtype=np.intp, count=n)
+
+            # Absolute bucket number of each event in every column
+            buckets = np.floor(times[:, None] / self.widths).astype(np.int64)
+            targets = np.stack([
+                offset + buckets[:, offset] % count
+                for offset, (_, _, count) in zip(self.offsets, self.windows)
+            ], axis=1)
+            r = np.repeat(rows, len(self.windows))
+            c = targets.ravel()
+            b = np.take_along_axis(buckets, targets, axis=1).ravel()
+
+            # Reset buckets the ring has wrapped onto, then drop events older than their bucket
+            stale = b > self.epochs[r, c]
+            for array in (self.flows, self.failed, self.bytes_out, self.bytes_in, self.ports):
+                array[r[stale], c[stale]] = 0
+            np.maximum.at(self.epochs, (r, c), b)
+            keep = b == self.epochs[r, c]
+            r, c = r[keep], c[keep]
+            event = np.repeat(np.arange(n), len(self.windows))[keep]
+
+            np.add.at(self.flows, (r, c), 1)
+            np.add.at(self.failed, (r, c), failed[event].astype(np.int32))
+            np.add.at(self.bytes_out, (r, c), bytes_out[event].astype(np.float32))
+            np.add.at(self.bytes_in, (r, c), bytes_in[event].astype(np.float32))
+            word, bit = port_bits(ports[event])
+            np.bitwise_or.at(self.ports, (r, c, word), bit)
+
+            return self._aggregate(rows, buckets)
+
+    def _aggregate(self, rows: np.ndarray, buckets: np.ndarray) -> np.ndarray:
+        """Sum each key's live buckets per window"""
+        valid = self.epochs[rows] > buckets - self.ring_sizes
+        flows = np.add.reduceat(np.where(valid, self.flows[rows], 0), self.offsets, axis=1)
+        failed = np.add.reduceat(np.where(valid, self.failed[rows], 0), self.offsets, axis=1)
+        bytes_out = np.add.reduceat(np.where(valid, self.bytes_out[rows], 0), self.offsets, axis=1)
+        bytes_in = np.add.reduceat(np.where(valid, self.bytes_in[rows], 0), self.offsets, axis=1)
+        bitmaps = np.bitwise_or.reduceat(
+            np.where(valid[:, :, None], self.ports[rows], np.uint64(0)), self.offsets, axis=1
+        )
+        distinct = estimate_distinct(bitmaps)
+        failed_rate = np.divide(failed, flows, out=np.zeros(flows.shape), where=flows > 0)
+        # (n, windows, metrics) in METRICS order
+        return np.stack([flows, bytes_out, bytes_in, distinct, failed_rate], axis=2).reshape(len(rows), -1)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "keys": len(self._index),
+            "capacity": self.capacity,
+            "max_keys": self.max_keys,
+            "evictions": self.evictions,
+            "windows": [name for name, _, _ in self.windows],
+            "memory_bytes": int(sum(array.nbytes for array in (
+                self.epochs, self.flows, self.failed, self.bytes_out, self.bytes_in, self.ports, self.last_seen
+            )))
+        }
+
+class NetworkWindowFeatures:
+    """Per-source and per-destination windowed aggregates for network events"""
+
+    def __init__(self, max_keys: int = 100000, windows: Sequence[Tuple[str, float, int]] = WINDOWS):
+        self.sources = SlidingWindowStore(max_keys=max_keys, windows=windows)
+        self.destinations = SlidingWindowStore(max_keys=max_keys, windows=windows)
+
+    @property
+    def feature_names(self) -> List[str]:
+        return (
+            [f"src_{name}" for name in self.sources.feature_names]
+            + [f"dst_{name}" for name in self.destinations.feature_names]
+        )
+
+    def update(self, events: List[Dict[str, Any]], times: np.ndarray) -> np.ndarray:
+        """Record events (at ``times``, epoch seconds) and return their window features"""
+        sent = np.array([event.get("bytes_sent", 0) or 0 for event in events], dtype=np.float64)
+        received = np.array([event.get("bytes_received", 0) or 0 for event in events], dtype=np.float64)
+        ports = np.array([event.get("port_number", 0) or 0 for event in events], dtype=np.int64)
+        failed = np.array([bool(event.get("failed")) for event in events]) | (received <= FAILED_MAX_BYTES_RECEIVED)
+        # Each key sees the flow from its own side; events without an address share one key
+        source_features = self.sources.update(
+            [event.get("source_ip") or "" for event in events], times, sent, received, ports, failed
+        )
+        destination_features = self.destinations.update(
+            [event.get("destination_ip") or "" for event in events], times, received, sent, ports, failed
+        )
+        return np.hstack([source_features, destination_features])
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"sources": self.sources.get_stats(), "destinations": self.destinations.get_stats()}
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from typing import Dict, Any
@@ -7,14 +7,22 @@ from .base import Base
 
 class Alert(Base):
     __tablename__ = "alerts"
+    __table_args__ = (
+        # Keyset pagination seeks on (timestamp, id), optionally after a status filter
+        Index("ix_alerts_timestamp_id", "timestamp", "id"),
+        Index("ix_alerts_status_timestamp_id", "status", "timestamp", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     threat_id = Column(Integer, ForeignKey("threats.id"))
     alert_type = Column(String, index=True)
     message = Column(String)
     timestamp = Column(DateTime, default=datetime.utcnow)
-    alert_metadata = Column(JSON)
+    alert_metadata = Column("metadata", JSON)  # column name used by the initial migration
     status = Column(String, index=True)  # new, acknowledged, resolved
+    # Detections folded into this alert by suppression, and when the latest arrived
+    occurrence_count = Column(Integer, nullable=False, default=1, server_default="1")
+    last_seen = Column(DateTime, default=datetime.utcnow)
     
     # Relationships
     threat = relationship("Threat", back_populates="alerts")
@@ -27,5 +35,7 @@ class Alert(Base):
             "message": self.message,
             "timestamp": self.timestamp.isoformat(),
             "metadata": self.alert_metadata,
-            "status": self.status
+            "status": self.status,
+            "occurrence_count": self.occurrence_count,
+            "last_seen": self.last_seen.isoformat() if self.last_seen else None
         }
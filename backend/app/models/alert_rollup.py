@@ -0,0 +1,28 @@
+from sqlalchemy import Column, String, Float, DateTime
+from datetime import datetime
+from typing import Dict, Any
+
+from .base import Base
+
+class AlertRollup(Base):
+    """One incrementally maintained alert counter.
+
+    ``bucket`` is minute, hour, day or all (with ``bucket_start`` at the
+    epoch); ``dimension`` groups counters such as status, severity or metric.
+    """
+    __tablename__ = "alert_rollups"
+    
+    bucket = Column(String, primary_key=True)
+    bucket_start = Column(DateTime, primary_key=True)
+    dimension = Column(String, primary_key=True)
+    key = Column(String, primary_key=True)
+    value = Column(Float, nullable=False, default=0.0)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "bucket": self.bucket,
+            "bucket_start": self.bucket_start.isoformat(),
+            "dimension": self.dimension,
+            "key": self.key,
+            "value": self.value
+        }
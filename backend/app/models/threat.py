@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, JSON, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, DateTime, JSON, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from typing import Optional, Dict, Any
@@ -7,6 +7,13 @@ from .base import Base
 
 class Threat(Base):
     __tablename__ = "threats"
+    __table_args__ = (
+        # Keyset pagination seeks on (timestamp, id), optionally after an equality filter
+        Index("ix_threats_timestamp_id", "timestamp", "id"),
+        Index("ix_threats_status_timestamp_id", "status", "timestamp", "id"),
+        Index("ix_threats_threat_type_timestamp_id", "threat_type", "timestamp", "id"),
+        Index("ix_threats_source_ip_timestamp_id", "source_ip", "timestamp", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     threat_type = Column(String, index=True)
@@ -20,7 +27,6 @@ class Threat(Base):
     
     # Relationships
     alerts = relationship("Alert", back_populates="threat")
-    responses = relationship("Response", back_populates="threat")
     
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -0,0 +1,109 @@
+from typing import Any, Dict, Iterable, List, Optional, Set
+import asyncio
+import logging
+
+from ..core.config import get_settings
+from ..core.metrics import track_queue
+
+logger = logging.getLogger(__name__)
+
+DROP_POLICIES = ("oldest", "newest", "disconnect")
+
+class Subscription:
+    """One stream client: its filters and a bounded queue of pending events"""
+
+    def __init__(self, severities: Optional[Iterable[str]] = None, statuses: Optional[Iterable[str]] = None,
+                 max_queue_size: int = 256):
+        self.severities: Optional[Set[str]] = set(severities) if severities else None
+        self.statuses: Optional[Set[str]] = set(statuses) if statuses else None
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, max_queue_size))
+        self.closed = False
+        self.delivered = 0
+        self.dropped = 0
+
+    def matches(self, event: Dict[str, Any]) -> bool:
+        alert = event["alert"]
+        if self.severities is not None and alert.get("severity") not in self.severities:
+            return False
+        if self.statuses is not None and alert.get("status") not in self.statuses:
+            return False
+        return True
+
+    async def get(self) -> Optional[Dict[str, Any]]:
+        """Next event, or None once the subscription has been closed"""
+        if self.closed and self.queue.empty():
+            return None
+        return await self.queue.get()
+
+class AlertBroadcaster:
+    """In-process fan-out of alert events to stream subscribers.
+
+    ``publish`` never waits: each subscriber has a bounded queue and a full
+    queue is handled by ``drop_policy`` -- drop the oldest queued event,
+    drop the new one, or disconnect the subscriber. A slow client therefore
+    never holds up detection or the other clients.
+    """
+
+    def __init__(self, max_queue_size: Optional[int] = None, drop_policy: Optional[str] = None):
+        settings = get_settings()
+        self.max_queue_size = max_queue_size or settings.ALERT_STREAM_QUEUE_SIZE
+        self.drop_policy = drop_policy or settings.ALERT_STREAM_DROP_POLICY
+        if self.drop_policy not in DROP_POLICIES:
+            raise ValueError(f"Unknown drop policy: {self.drop_policy}")
+        self._subscribers: List[Subscription] = []
+        self.published = 0
+        self.dropped = 0
+        self.disconnected = 0
+
+    def subscribe(self, severities: Optional[Iterable[str]] = None,
+                  statuses: Optional[Iterable[str]] = None) -> Subscription:
+        subscription = Subscription(severities, statuses, self.max_queue_size)
+        self._subscribers.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscription.closed = True
+        if subscription in self._subscribers:
+            self._subscribers.remove(subscription)
+
+    def publish(self, event_type: str, alert: Dict[str, Any]) -> None:
+        """Queue an event for every matching subscriber (event loop thread only)"""
+        event = {"event": event_type, "alert": alert}
+        self.published += 1
+        for subscription in list(self._subscribers):
+            if subscription.matches(event):
+                self._offer(subscription, event)
+
+    def _offer(self, subscription: Subscription, event: Dict[str, Any]) -> None:
+        queue = subscription.queue
+        if queue.full():
+            subscription.dropped += 1
+            self.dropped += 1
+            if self.drop_policy == "newest":
+                return
+            if self.drop_policy == "disconnect":
+                logger.warning("Disconnecting alert stream subscriber with a full queue")
+                self.disconnected += 1
+                self.unsubscribe(subscription)
+                while not queue.empty():
+                    queue.get_nowait()
+                # Wake the reader so it sees the closed subscription
+                queue.put_nowait(None)
+                return
+            queue.get_nowait()
+        queue.put_nowait(event)
+        subscription.delivered += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "subscribers": len(self._subscribers),
+            "drop_policy": self.drop_policy,
+            "max_queue_size": self.max_queue_size,
+            "published": self.published,
+            "dropped": self.dropped,
+            "disconnected": self.disconnected,
+            "queue_depths": [subscription.queue.qsize() for subscription in self._subscribers]
+        }
+
+alert_broadcaster = AlertBroadcaster()
+track_queue("alert_stream", lambda: sum(alert_broadcaster.get_stats()["queue_depths"]))
@@ -0,0 +1,220 @@
+from typing import Any, Dict, List, Optional, Tuple
+from datetime import datetime, timedelta, timezone
+import asyncio
+import logging
+import time
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models.alert_rollup import AlertRollup
+from ..core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+EPOCH = datetime(1970, 1, 1)
+BUCKETS = {
+    "minute": timedelta(minutes=1),
+    "hour": timedelta(hours=1),
+    "day": timedelta(days=1)
+}
+STATUSES = ["new", "acknowledged", "resolved"]
+# Threat severity (anomaly score) at or above each bound, checked in order
+SEVERITY_LEVELS = [("high", 0.9), ("medium", 0.7), ("low", float("-inf"))]
+
+RollupKey = Tuple[str, datetime, str, str]  # bucket, bucket start, dimension, key
+
+def severity_label(score: Optional[float]) -> str:
+    score = 0.0 if score is None else score
+    for label, bound in SEVERITY_LEVELS:
+        if score >= bound:
+            return label
+    return SEVERITY_LEVELS[-1][0]
+
+def bucket_start(timestamp: datetime, bucket: str) -> datetime:
+    size = BUCKETS[bucket]
+    return EPOCH + ((timestamp - EPOCH) // size) * size
+
+def parse_event_time(value: Any) -> Optional[datetime]:
+    """Naive UTC datetime from an ISO string or datetime, if there is one"""
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    if not isinstance(value, datetime):
+        return None
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+def _add(deltas: Dict[RollupKey, float], key: RollupKey, value: float) -> None:
+    deltas[key] = deltas.get(key, 0.0) + value
+
+class AlertStatistics:
+    """Alert counters maintained incrementally in ``alert_rollups``.
+
+    Writers turn each alert creation or status transition into counter
+    deltas, upsert them in the same transaction as the alert change and then
+    apply them to the in-memory copy. Reads serve a cached snapshot, so their
+    cost depends on the retained buckets, not on the number of alerts.
+    The copy is re-read from the table every ``reload_seconds`` so counts
+    written by other worker processes show up.
+    """
+
+    def __init__(self, retention: Optional[Dict[str, int]] = None, reload_seconds: Optional[float] = None):
+        settings = get_settings()
+        self.reload_seconds = settings.ALERT_STATS_RELOAD_SECONDS if reload_seconds is None else reload_seconds
+        self.retention = retention or {
+            "minute": settings.ALERT_ROLLUP_MINUTE_BUCKETS,
+            "hour": settings.ALERT_ROLLUP_HOUR_BUCKETS,
+            "day": settings.ALERT_ROLLUP_DAY_BUCKETS
+        }
+        self._counters: Dict[RollupKey, float] = {}
+        self._snapshot: Optional[Dict[str, Any]] = None
+        self._loaded_at: Optional[float] = None
+        self._load_lock: Optional[asyncio.Lock] = None
+        self._pruned_at: Optional[datetime] = None
+
+    def _is_fresh(self) -> bool:
+        return self._loaded_at is not None and time.monotonic() - self._loaded_at < self.reload_seconds
+
+    async def ensure_loaded(self, db: AsyncSession) -> None:
+        """Read the rollup table if the copy is missing or stale; call before writes and reads"""
+        if self._is_fresh():
+            return
+        if self._load_lock is None:
+            self._load_lock = asyncio.Lock()
+        async with self._load_lock:
+            if self._is_fresh():
+                return
+            rows = (await db.execute(select(AlertRollup))).scalars().all()
+            self._counters = {
+                (row.bucket, row.bucket_start, row.dimension, row.key): row.value for row in rows
+            }
+            self._snapshot = None
+            self._loaded_at = time.monotonic()
+
+    def created_deltas(self, alerts: List[Dict[str, Any]]) -> Dict[RollupKey, float]:
+        """Deltas for new alerts given their status, severity, timestamp and event_time"""
+        deltas: Dict[RollupKey, float] = {}
+        for alert in alerts:
+            created_at = alert["timestamp"]
+            _add(deltas, ("all", EPOCH, "metric", "total"), 1)
+            _add(deltas, ("all", EPOCH, "status", alert["status"]), 1)
+            severity = severity_label(alert.get("severity"))
+            _add(deltas, ("all", EPOCH, "severity", severity), 1)
+            for bucket in BUCKETS:
+                start = bucket_start(created_at, bucket)
+                _add(deltas, (bucket, start, "metric", "created"), 1)
+                _add(deltas, (bucket, start, "severity", severity), 1)
+
+            event_time = parse_event_time(alert.get("event_time"))
+            if event_time is not None:
+                detect_seconds = max(0.0, (created_at - event_time).total_seconds())
+                _add(deltas, ("all", EPOCH, "metric", "detect_seconds"), detect_seconds)
+                _add(deltas, ("all", EPOCH, "metric", "detected"), 1)
+        return deltas
+
+    def transition_deltas(self, old_status: str, new_status: str, created_at: Optional[datetime],
+                          at: datetime) -> Dict[RollupKey, float]:
+        """Deltas for an alert moving from ``old_status`` to ``new_status`` at ``at``"""
+        deltas: Dict[RollupKey, float] = {}
+        if old_status == new_status:
+            return deltas
+        _add(deltas, ("all", EPOCH, "status", old_status), -1)
+        _add(deltas, ("all", EPOCH, "status", new_status), 1)
+        # The first move out of "new" is the response
+        if old_status == "new" and created_at is not None:
+            _add(deltas, ("all", EPOCH, "metric", "respond_seconds"), max(0.0, (at - created_at).total_seconds()))
+            _add(deltas, ("all", EPOCH, "metric", "responded"), 1)
+        return deltas
+
+    def _cutoffs(self, now: datetime) -> Dict[str, datetime]:
+        return {
+            bucket: bucket_start(now, bucket) - (self.retention[bucket] - 1) * size
+            for bucket, size in BUCKETS.items()
+        }
+
+    async def persist(self, db: AsyncSession, deltas: Dict[RollupKey, float]) -> None:
+        """Upsert deltas into the rollup table inside the caller's transaction"""
+        if not deltas:
+            return
+        if db.bind.dialect.name == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        statement = insert(AlertRollup)
+        statement = statement.on_conflict_do_update(
+            index_elements=["bucket", "bucket_start", "dimension", "key"],
+            set_={"value": AlertRollup.value + statement.excluded.value}
+        )
+        await db.execute(statement, [
+            {"bucket": bucket, "bucket_start": start, "dimension": dimension, "key": key, "value": value}
+            for (bucket, start, dimension, key), value in sorted(deltas.items())
+        ])
+
+        # Expired buckets are dropped at most once per minute
+        now = datetime.utcnow()
+        if self._pruned_at is None or bucket_start(now, "minute") > self._pruned_at:
+            for bucket, cutoff in self._cutoffs(now).items():
+                await db.execute(
+                    delete(AlertRollup).where(AlertRollup.bucket == bucket, AlertRollup.bucket_start < cutoff)
+                )
+            self._pruned_at = bucket_start(now, "minute")
+
+    def apply(self, deltas: Dict[RollupKey, float]) -> None:
+        """Apply committed deltas to the in-memory counters"""
+        if not deltas:
+            return
+        for key, value in deltas.items():
+            self._counters[key] = self._counters.get(key, 0.0) + value
+        cutoffs = self._cutoffs(datetime.utcnow())
+        for key in [key for key in self._counters if key[0] in cutoffs and key[1] < cutoffs[key[0]]]:
+            del self._counters[key]
+        self._snapshot = None
+
+    def _get(self, dimension: str, key: str) -> float:
+        return self._counters.get(("all", EPOCH, dimension, key), 0.0)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current statistics; rebuilt only after counters change"""
+        if self._snapshot is not None:
+            return self._snapshot
+
+        by_status = {status: 0 for status in STATUSES}
+        by_severity = {label: 0 for label, _ in SEVERITY_LEVELS}
+        timeline: Dict[str, Dict[datetime, Dict[str, Any]]] = {bucket: {} for bucket in BUCKETS}
+        for (bucket, start, dimension, key), value in self._counters.items():
+            if bucket == "all":
+                if dimension == "status":
+                    by_status[key] = int(value)
+                elif dimension == "severity":
+                    by_severity[key] = int(value)
+                continue
+            entry = timeline[bucket].setdefault(start, {"start": start.isoformat(), "count": 0, "by_severity": {}})
+            if dimension == "metric" and key == "created":
+                entry["count"] = int(value)
+            elif dimension == "severity":
+                entry["by_severity"][key] = int(value)
+
+        detected, responded = self._get("metric", "detected"), self._get("metric", "responded")
+        self._snapshot = {
+            "total": int(self._get("metric", "total")),
+            "by_status": by_status,
+            "by_severity": by_severity,
+            "response_metrics": {
+                # hours
+                "mean_time_to_detect": self._get("metric", "detect_seconds") / detected / 3600 if detected else None,
+                "mean_time_to_respond": self._get("metric", "respond_seconds") / responded / 3600 if responded else None,
+                # Kept for existing clients; alerts do not record false positives
+                "false_positive_rate": None
+            },
+            "timeline": {
+                bucket: [entries[start] for start in sorted(entries)]
+                for bucket, entries in timeline.items()
+            },
+            "generated_at": datetime.utcnow().isoformat()
+        }
+        return self._snapshot
+
+alert_statistics = AlertStatistics()
@@ -0,0 +1,263 @@
+from typing import Any, Dict, List, Optional, Tuple
+from collections import OrderedDict
+from datetime import datetime
+import asyncio
+import logging
+import time
+from sqlalchemy import bindparam, update
+
+from ..models.alert import Alert
+from ..core.metrics import ALERTS_SUPPRESSED
+from ..core.response_cache import response_cache
+from ..db.session import AsyncSessionLocal
+from .alert_broadcaster import alert_broadcaster
+
+logger = logging.getLogger(__name__)
+
+SuppressionKey = Tuple[str, Optional[str], Optional[str]]
+
+class SuppressionEntry:
+    """The open window of one key: its alert and the repeats not yet written"""
+
+    __slots__ = ("opened", "first", "alert_id", "alert", "pending", "last_seen")
+
+    def __init__(self, opened: float, first: Dict[str, Any], now: datetime):
+        self.opened = opened
+        self.first = first
+        self.alert_id: Optional[int] = None
+        self.alert: Optional[Dict[str, Any]] = None
+        self.pending = 0
+        self.last_seen = now
+
+class AlertSuppressor:
+    """Collapse repeated detections into one alert per time window.
+
+    Detections are keyed by ``(threat_type, source_ip, destination_ip)``. The
+    first detection of a key opens a window of ``window_seconds`` and is
+    persisted as usual; repeats inside the window only increment an in-memory
+    counter. Every ``flush_interval_ms`` the counters are added to the
+    alert's ``occurrence_count`` and ``last_seen`` with one bulk UPDATE, so a
+    burst from one source costs one insert plus one update per flush instead
+    of one insert per flow. Detections without a source address are never
+    suppressed.
+
+    Windows are fixed from the first detection; once one closes, the next
+    detection raises a fresh alert. At most ``max_keys`` windows are open --
+    beyond that the oldest are closed early (after writing their counts).
+
+    If the first alert of a window fails to persist, the writer calls
+    ``release``: the window is dropped and its count (including the failed
+    detection) is carried over to the alert of the next detection for the
+    key. Counts nobody claims within ``window_seconds`` are dropped and
+    logged.
+    """
+
+    def __init__(self, window_seconds: float = 300.0, max_keys: int = 100000, flush_interval_ms: float = 1000.0):
+        self.window_seconds = max(0.0, window_seconds)
+        self.max_keys = max(1, max_keys)
+        self.flush_interval = max(0.001, flush_interval_ms / 1000.0)
+        # Insertion order is opening order, which is also expiry order
+        self._entries: "OrderedDict[SuppressionKey, SuppressionEntry]" = OrderedDict()
+        self._closed: List[SuppressionEntry] = []
+        # Entries whose first alert is queued but not yet written, by id() of its detection
+        self._awaiting: Dict[int, SuppressionEntry] = {}
+        # Counts of released windows: key -> (count, released at)
+        self._orphans: "OrderedDict[SuppressionKey, Tuple[int, float]]" = OrderedDict()
+        self._task: Optional[asyncio.Task] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self.admitted = 0
+        self.suppressed = 0
+        self.windows_opened = 0
+        self.windows_evicted = 0
+        self.windows_released = 0
+        self.occurrences_dropped = 0
+        self.updates_written = 0
+        self.updates_failed = 0
+        self.last_flush_ms = 0.0
+
+    @staticmethod
+    def key(data: Dict[str, Any], threat_type: str) -> Optional[SuppressionKey]:
+        raw = data.get("raw_data") or {}
+        source_ip = raw.get("source_ip")
+        if not source_ip:
+            return None
+        return (threat_type, source_ip, raw.get("destination_ip"))
+
+    def start(self) -> None:
+        """Start the periodic flusher on the running event loop"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def admit(self, detections: List[Dict[str, Any]], threat_type: str) -> List[Dict[str, Any]]:
+        """Return the detections that open a new window; count the rest"""
+        now = time.monotonic()
+        seen_at = datetime.utcnow()
+        self._expire(now)
+        admitted = []
+        for data in detections:
+            key = self.key(data, threat_type)
+            if key is None:
+                admitted.append(data)
+                continue
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.pending += 1
+                entry.last_seen = seen_at
+                continue
+            if len(self._entries) >= self.max_keys:
+                _, evicted = self._entries.popitem(last=False)
+                self._closed.append(evicted)
+                self.windows_evicted += 1
+            entry = SuppressionEntry(now, data, seen_at)
+            orphan = self._orphans.pop(key, None)
+            if orphan is not None:
+                entry.pending = orphan[0]
+            self._entries[key] = entry
+            self._awaiting[id(data)] = entry
+            self.windows_opened += 1
+            admitted.append(data)
+
+        suppressed = len(detections) - len(admitted)
+        self.admitted += len(admitted)
+        self.suppressed += suppressed
+        if suppressed:
+            ALERTS_SUPPRESSED.labels(threat_type=threat_type).inc(suppressed)
+        return admitted
+
+    def bind(self, data: Dict[str, Any], threat_type: str, alert: Dict[str, Any]) -> None:
+        """Record the alert written for a detection that opened a window"""
+        entry = self._awaiting.pop(id(data), None)
+        # The window may have closed meanwhile; its repeats still belong to this alert
+        if entry is not None and entry.first is data:
+            entry.alert_id = alert["id"]
+            entry.alert = alert
+            entry.first = None
+
+    def release(self, data: Dict[str, Any], threat_type: str) -> None:
+        """Drop the window opened by a detection whose alert could not be written"""
+        entry = self._awaiting.pop(id(data), None)
+        if entry is None or entry.first is not data:
+            return
+        entry.first = None
+        key = self.key(data, threat_type)
+        if self._entries.get(key) is entry:
+            del self._entries[key]
+        elif entry in self._closed:
+            self._closed.remove(entry)
+        self.windows_released += 1
+        # The failed detection and its repeats go onto the next alert for the key
+        count = entry.pending + 1 + self._orphans.pop(key, (0, 0.0))[0]
+        if len(self._orphans) >= self.max_keys:
+            _, (dropped, _) = self._orphans.popitem(last=False)
+            self._drop(dropped)
+        self._orphans[key] = (count, time.monotonic())
+
+    def _drop(self, count: int) -> None:
+        self.occurrences_dropped += count
+        logger.warning(f"Dropped {count} suppressed detections whose alert could not be written")
+
+    def _expire(self, now: float) -> None:
+        """Close windows older than ``window_seconds``"""
+        while self._entries:
+            entry = next(iter(self._entries.values()))
+            if now - entry.opened < self.window_seconds:
+                break
+            self._entries.popitem(last=False)
+            self._closed.append(entry)
+        while self._orphans:
+            key, (count, released) = next(iter(self._orphans.items()))
+            if now - released < self.window_seconds:
+                break
+            del self._orphans[key]
+            self._drop(count)
+
+    def _collect(self) -> List[SuppressionEntry]:
+        """Take every entry with repeats to write, resetting its counter"""
+        self._expire(time.monotonic())
+        closed = self._closed
+        # Closed windows whose first alert is still queued wait for it to be bound
+        self._closed = [entry for entry in closed if entry.first is not None]
+        return [
+            entry for entry in list(self._entries.values()) + closed
+            if entry.pending and entry.alert_id is not None
+        ]
+
+    async def flush(self) -> None:
+        """Add the counted repeats to their alerts"""
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        async with self._flush_lock:
+            entries = self._collect()
+            if not entries:
+                return
+            counts = [entry.pending for entry in entries]
+            for entry in entries:
+                entry.pending = 0
+            params = [
+                {"alert_id": entry.alert_id, "repeats": count, "seen": entry.last_seen}
+                for entry, count in zip(entries, counts)
+            ]
+            alerts = Alert.__table__
+            statement = (
+                update(alerts)
+                .where(alerts.c.id == bindparam("alert_id"))
+                .values(occurrence_count=alerts.c.occurrence_count + bindparam("repeats"), last_seen=bindparam("seen"))
+            )
+            start = time.perf_counter()
+            try:
+                async with AsyncSessionLocal() as db:
+                    await db.execute(statement, params)
+                    await db.commit()
+            except Exception as e:
+                # Put the counts back so the next flush retries them
+                for entry, count in zip(entries, counts):
+                    entry.pending += count
+                still_open = {id(entry) for entry in self._entries.values()}
+                self._closed.extend(entry for entry in entries if id(entry) not in still_open)
+                self.updates_failed += len(entries)
+                logger.error(f"Error updating {len(entries)} suppressed alerts: {str(e)}")
+                return
+            self.last_flush_ms = (time.perf_counter() - start) * 1000.0
+            self.updates_written += len(entries)
+
+        response_cache.invalidate("alerts")
+        for entry, count in zip(entries, counts):
+            entry.alert["occurrence_count"] += count
+            entry.alert["last_seen"] = entry.last_seen.isoformat()
+            alert_broadcaster.publish("alert_updated", dict(entry.alert))
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            # Shielded so that stopping mid-write does not lose the counts taken
+            await asyncio.shield(self.flush())
+
+    async def stop(self) -> None:
+        """Write the remaining counts, then stop the flusher"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "window_seconds": self.window_seconds,
+            "open_windows": len(self._entries),
+            "max_keys": self.max_keys,
+            "admitted": self.admitted,
+            "suppressed": self.suppressed,
+            "windows_opened": self.windows_opened,
+            "windows_evicted": self.windows_evicted,
+            "windows_released": self.windows_released,
+            "awaiting_alert": len(self._awaiting),
+            "pending": sum(entry.pending for entry in self._entries.values()),
+            "orphaned": sum(count for count, _ in self._orphans.values()),
+            "occurrences_dropped": self.occurrences_dropped,
+            "updates_written": self.updates_written,
+            "updates_failed": self.updates_failed,
+            "last_flush_ms": self.last_flush_ms
+        }
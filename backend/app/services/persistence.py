@@ -0,0 +1,281 @@
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
+import logging
+import time
+from datetime import datetime
+from sqlalchemy import insert
+
+from ..models.threat import Threat
+from ..models.alert import Alert
+from ..core.metrics import BATCH_SIZE, DETECTIONS, PERSISTENCE_FLUSH_SECONDS
+from ..core.response_cache import response_cache
+from ..db.session import AsyncSessionLocal, get_async_mongo_db
+from .alert_broadcaster import alert_broadcaster
+from .alert_suppression import AlertSuppressor
+from .alert_stats import alert_statistics, severity_label
+
+logger = logging.getLogger(__name__)
+
+Detection = Tuple[Dict[str, Any], str]
+
+class ThreatWriter:
+    """Write-behind persistence for detections.
+
+    ``submit`` only enqueues; a background task drains the bounded queue and
+    writes each batch with one bulk insert per table. A batch is flushed when
+    it reaches ``batch_size`` detections or ``flush_interval_ms`` after its
+    first detection arrived. A full queue makes ``submit`` wait, which pushes
+    back on ingestion instead of growing memory without bound. A failed
+    batch is retried ``max_retries`` times with exponential backoff before
+    it is dropped; the queue keeps filling meanwhile, so a database outage
+    pushes back on ingestion too.
+
+    With a ``suppressor``, repeated detections are counted against the alert
+    already written for them instead of being queued.
+    """
+
+    def __init__(self, max_queue_size: int = 10000, batch_size: int = 500, flush_interval_ms: float = 50.0,
+                 suppressor: Optional[AlertSuppressor] = None, max_retries: int = 5, retry_backoff_ms: float = 100.0):
+        self.max_queue_size = max(1, max_queue_size)
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = max(0.0, flush_interval_ms) / 1000.0
+        self.suppressor = suppressor
+        self.max_retries = max(0, max_retries)
+        self.retry_backoff = max(0.0, retry_backoff_ms) / 1000.0
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self.batches_flushed = 0
+        self.rows_written = 0
+        self.rows_failed = 0
+        self.retries = 0
+        self.last_batch_size = 0
+        self.max_batch_seen = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self.total_flush_ms = 0.0
+
+    def start(self) -> None:
+        """Start the background flusher on the running event loop"""
+        if self._task is None or self._task.done():
+            if self._queue is None:
+                self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        if self.suppressor is not None:
+            self.suppressor.start()
+
+    async def submit(self, detections: List[Dict[str, Any]], threat_type: str = "network_based") -> None:
+        """Queue detections for persistence"""
+        self.start()
+        DETECTIONS.labels(threat_type=threat_type).inc(len(detections))
+        if self.suppressor is not None:
+            detections = self.suppressor.admit(detections, threat_type)
+        for data in detections:
+            await self._queue.put((data, threat_type))
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def _run(self) -> None:
+        """Collect batches from the queue and flush them"""
+        while True:
+            batch: List[Detection] = []
+            try:
+                await self._collect(batch)
+                await self._flush(batch)
+            except Exception as e:
+                # Keep the flusher alive; a dead one would leave flush() waiting forever
+                logger.exception(f"Error in persistence flusher with {len(batch)} detections in hand: {str(e)}")
+                await asyncio.sleep(self.retry_backoff)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _collect(self, batch: List[Detection]) -> None:
+        """Fill ``batch`` up to ``batch_size`` or until the flush interval elapses"""
+        loop = asyncio.get_running_loop()
+        batch.append(await self._queue.get())
+        deadline = loop.time() + self.flush_interval
+        while len(batch) < self.batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+    async def _flush(self, batch: List[Detection]) -> None:
+        """Write one batch, recording its size and latency"""
+        start = time.perf_counter()
+        raw_data_ids = None
+        for attempt in range(self.max_retries + 1):
+            try:
+                if raw_data_ids is None:
+                    mongo_db = get_async_mongo_db()
+                    # Store raw data in MongoDB (once, even if the SQL write is retried)
+                    raw_data_ids = (await mongo_db.raw_data.insert_many([data for data, _ in batch])).inserted_ids
+                await self._write(batch, raw_data_ids)
+                break
+            except Exception as e:
+                if attempt == self.max_retries:
+                    self.rows_failed += len(batch)
+                    logger.error(
+                        f"Error persisting batch of {len(batch)} detections after {attempt + 1} attempts: {str(e)}"
+                    )
+                    if self.suppressor is not None:
+                        # Let the next repeat of each key raise the alert instead
+                        for data, threat_type in batch:
+                            self.suppressor.release(data, threat_type)
+                    return
+                delay = self.retry_backoff * 2 ** attempt
+                self.retries += 1
+                logger.warning(
+                    f"Error persisting batch of {len(batch)} detections (attempt {attempt + 1}), "
+                    f"retrying in {delay * 1000.0:.0f}ms: {str(e)}"
+                )
+                await asyncio.sleep(delay)
+
+        elapsed_ms = (time.perf_counter() - start) * 1000.0
+        PERSISTENCE_FLUSH_SECONDS.observe(elapsed_ms / 1000.0)
+        BATCH_SIZE.labels(batcher="persistence").observe(len(batch))
+        self.batches_flushed += 1
+        self.rows_written += len(batch)
+        self.last_batch_size = len(batch)
+        self.max_batch_seen = max(self.max_batch_seen, len(batch))
+        self.last_flush_ms = elapsed_ms
+        self.max_flush_ms = max(self.max_flush_ms, elapsed_ms)
+        self.total_flush_ms += elapsed_ms
+
+    async def _write(self, batch: List[Detection], raw_data_ids: List[Any]) -> None:
+        """Insert threats and their alerts with one executemany each"""
+        now = datetime.utcnow()
+        threat_rows = [
+            {
+                "threat_type": threat_type,
+                "severity": float(data.get("anomaly_score", 0.9)),
+                "source_ip": data.get("raw_data", {}).get("source_ip"),
+                "destination_ip": data.get("raw_data", {}).get("destination_ip"),
+                "raw_data": {"mongo_id": str(raw_data_id)},
+                "status": "detected",
+                "confidence_score": float(data.get("confidence") or 0.8),
+                "timestamp": now
+            }
+            for (data, threat_type), raw_data_id in zip(batch, raw_data_ids)
+        ]
+
+        async with AsyncSessionLocal() as db:
+            await alert_statistics.ensure_loaded(db)
+            rollup_deltas = alert_statistics.created_deltas([
+                {
+                    "status": "new",
+                    "severity": row["severity"],
+                    "timestamp": now,
+                    "event_time": data.get("raw_data", {}).get("timestamp")
+                }
+                for row, (data, _) in zip(threat_rows, batch)
+            ])
+            try:
+                threat_ids = (await db.execute(
+                    insert(Threat).returning(Threat.id, sort_by_parameter_order=True),
+                    threat_rows
+                )).scalars().all()
+                alert_rows = [
+                    {
+                        "threat_id": threat_id,
+                        "alert_type": f"{threat_type}_threat",
+                        "message": f"Potential {threat_type} threat detected",
+                        "status": "new",
+                        "timestamp": now,
+                        "alert_metadata": data,
+                        "occurrence_count": 1,
+                        "last_seen": now
+                    }
+                    for threat_id, (data, threat_type) in zip(threat_ids, batch)
+                ]
+                alert_ids = (await db.execute(
+                    insert(Alert).returning(Alert.id, sort_by_parameter_order=True),
+                    alert_rows
+                )).scalars().all()
+                await alert_statistics.persist(db, rollup_deltas)
+                await db.commit()
+            except Exception:
+                await db.rollback()
+                raise
+            alert_statistics.apply(rollup_deltas)
+            
+        response_cache.invalidate("threats", "alerts", "statistics")
+        for alert_id, row, threat_row, (data, threat_type) in zip(alert_ids, alert_rows, threat_rows, batch):
+            alert = {
+                "id": alert_id,
+                "threat_id": row["threat_id"],
+                "alert_type": row["alert_type"],
+                "message": row["message"],
+                "timestamp": now.isoformat(),
+                "metadata": row["alert_metadata"],
+                "status": row["status"],
+                "occurrence_count": 1,
+                "last_seen": now.isoformat(),
+                "severity": severity_label(threat_row["severity"])
+            }
+            if self.suppressor is not None:
+                self.suppressor.bind(data, threat_type, alert)
+            alert_broadcaster.publish("alert_created", alert)
+
+    async def flush(self) -> None:
+        """Wait until everything queued so far has been written"""
+        if self._queue is None or self._task is None:
+            return
+        if self._task.done():
+            logger.warning("Persistence flusher had stopped; restarting it to drain the queue")
+            self.start()
+        # Stop waiting if the flusher dies mid-drain instead of hanging on join()
+        joined = asyncio.ensure_future(self._queue.join())
+        try:
+            await asyncio.wait({joined, self._task}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            joined.cancel()
+        if not joined.done() or joined.cancelled():
+            logger.error(f"Persistence flusher stopped with {self.queue_depth} detections queued")
+
+    async def stop(self) -> None:
+        """Drain the queue, then stop the flusher"""
+        await self.flush()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self.suppressor is not None:
+            await self.suppressor.stop()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get queue, batch size and flush latency statistics"""
+        stats = {
+            "queue_depth": self.queue_depth,
+            "max_queue_size": self.max_queue_size,
+            "batch_size": self.batch_size,
+            "flush_interval_ms": self.flush_interval * 1000.0,
+            "batches_flushed": self.batches_flushed,
+            "rows_written": self.rows_written,
+            "rows_failed": self.rows_failed,
+            "retries": self.retries,
+            "last_batch_size": self.last_batch_size,
+            "max_batch_size_seen": self.max_batch_seen,
+            "mean_batch_size": (
+                self.rows_written / self.batches_flushed if self.batches_flushed else 0.0
+            ),
+            "last_flush_ms": self.last_flush_ms,
+            "max_flush_ms": self.max_flush_ms,
+            "mean_flush_ms": (
+                self.total_flush_ms / self.batches_flushed if self.batches_flushed else 0.0
+            )
+        }
+        if self.suppressor is not None:
+            stats["suppression"] = self.suppressor.get_stats()
+        return stats
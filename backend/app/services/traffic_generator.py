@@ -0,0 +1,273 @@
+"""Seeded, vectorized generator of synthetic network flows and syslog lines.
+
+Flows are produced a batch at a time as columns of NumPy arrays, so millions
+of rows cost a few array operations rather than millions of dict
+constructions. Benign traffic follows heavy-tailed sizes and durations, a
+skewed set of busy hosts and a weighted service mix; a configurable share of
+rows belongs to attack campaigns (port scans, SYN floods, SSH brute force
+and exfiltration), each run by a handful of attacker/target pairs so the
+patterns repeat the way real campaigns do. Every flow carries a matching
+syslog-style line.
+
+The same seed, parameters and batch sizes always produce the same data.
+"""
+from typing import Dict, Iterator, List, Optional
+from datetime import datetime, timezone
+import numpy as np
+
+ATTACK_TYPES = ["benign", "port_scan", "syn_flood", "brute_force", "exfiltration"]
+DEFAULT_ATTACK_MIX = {"port_scan": 0.4, "syn_flood": 0.35, "brute_force": 0.2, "exfiltration": 0.05}
+
+TCP, UDP = 6, 17
+# Benign services: destination port, protocol and share of flows
+SERVICES = [
+    (443, TCP, 0.52),
+    (80, TCP, 0.14),
+    (53, UDP, 0.16),
+    (22, TCP, 0.03),
+    (25, TCP, 0.02),
+    (123, UDP, 0.03),
+    (3306, TCP, 0.04),
+    (8080, TCP, 0.06)
+]
+SERVICE_PORTS = np.array([port for port, _, _ in SERVICES], dtype=np.int32)
+SERVICE_PROTOCOLS = np.array([protocol for _, protocol, _ in SERVICES], dtype=np.int32)
+SERVICE_WEIGHTS = np.array([weight for _, _, weight in SERVICES]) / sum(weight for _, _, weight in SERVICES)
+
+INTERNAL_NET = (10 << 24)                # 10.0.0.0/16 workstations
+SERVER_NET = (192 << 24) | (168 << 16)   # 192.168.0.0/16 servers
+MSS = 1448
+HEADER_BYTES = 40
+
+FLOW_COLUMNS = [
+    "timestamp", "source_ip", "destination_ip", "source_port", "port_number", "protocol_type",
+    "bytes_sent", "bytes_received", "packet_count", "duration", "attack_type", "failed"
+]
+# Ground truth that is not part of an observed flow
+LABEL_COLUMNS = ["attack_type", "failed"]
+
+USERS = np.array(["alice", "bob", "deploy", "backup", "jenkins", "carol"])
+BRUTE_FORCE_USERS = np.array(["root", "admin", "test", "oracle", "ubuntu", "postgres", "guest"])
+URL_PATHS = np.array(["/", "/index.html", "/api/v1/items", "/login", "/static/app.js", "/health"])
+HTTP_STATUSES = np.array([200, 200, 200, 200, 304, 404, 500])
+DOMAINS = np.array(["example.com", "updates.vendor.net", "cdn.example.org", "mail.corp.local", "time.nist.gov"])
+
+_OCTETS = np.array([str(i) for i in range(256)])
+
+Flows = Dict[str, np.ndarray]
+
+def format_ips(ips: np.ndarray) -> np.ndarray:
+    """Dotted-quad strings for an array of IPv4 addresses held as integers"""
+    ips = ips.astype(np.uint32)
+    result = _OCTETS[ips >> 24]
+    for shift in (16, 8, 0):
+        result = np.char.add(np.char.add(result, "."), _OCTETS[(ips >> shift) & 255])
+    return result
+
+def format_timestamps(timestamps: np.ndarray) -> np.ndarray:
+    """ISO 8601 strings (microseconds, naive UTC) for epoch seconds"""
+    return np.datetime_as_string((timestamps * 1e6).astype("datetime64[us]"), unit="us")
+
+def _tcp_packets(total_bytes: np.ndarray) -> np.ndarray:
+    # Handshake and teardown plus one packet per segment
+    return np.ceil(total_bytes / MSS).astype(np.int64) + 3
+
+class TrafficGenerator:
+    """Reproducible stream of flow batches at ``flows_per_second`` of simulated time"""
+
+    def __init__(
+        self,
+        seed: int = 42,
+        start: Optional[datetime] = None,
+        flows_per_second: float = 1000.0,
+        attack_rate: float = 0.02,
+        attack_mix: Optional[Dict[str, float]] = None,
+        hosts: int = 5000,
+        servers: int = 200,
+        campaigns: int = 4
+    ):
+        mix = attack_mix or DEFAULT_ATTACK_MIX
+        unknown = set(mix) - set(ATTACK_TYPES[1:])
+        if unknown:
+            raise ValueError(f"Unknown attack types: {', '.join(sorted(unknown))}")
+        self.rng = np.random.default_rng(seed)
+        # Separate stream so flows do not depend on whether logs were rendered
+        self.log_rng = np.random.default_rng([seed, 1])
+        start = start or datetime(2024, 1, 1)
+        # Naive start times are UTC, like the timestamps the generator emits
+        self.clock = (start if start.tzinfo else start.replace(tzinfo=timezone.utc)).timestamp()
+        self.flows_per_second = flows_per_second
+        self.attack_rate = attack_rate
+        weights = np.array([mix.get(name, 0.0) for name in ATTACK_TYPES[1:]], dtype=np.float64)
+        self.attack_weights = weights / weights.sum() if weights.sum() > 0 else weights
+        self.flows_generated = 0
+
+        rng = self.rng
+        self.hosts = INTERNAL_NET + rng.permutation(1 << 16)[:hosts].astype(np.int64)
+        # A few hosts generate most of the traffic
+        popularity = 1.0 / np.arange(1, hosts + 1) ** 1.1
+        self.host_weights = popularity / popularity.sum()
+        self.servers = SERVER_NET + rng.permutation(1 << 16)[:servers].astype(np.int64)
+        # Each attack type is run by ``campaigns`` fixed attacker/target pairs
+        self.attackers = rng.integers(1 << 24, 223 << 24, size=(len(ATTACK_TYPES), campaigns))
+        self.scan_targets = rng.choice(self.hosts, size=campaigns)
+        self.flood_targets = rng.choice(self.servers, size=campaigns)
+        self.ssh_targets = rng.choice(self.servers, size=campaigns)
+        self.compromised_hosts = rng.choice(self.hosts, size=campaigns)
+
+    def generate(self, n: int) -> Flows:
+        """Next ``n`` flows, in time order, as columns"""
+        rng = self.rng
+        gaps = rng.exponential(1.0 / self.flows_per_second, n)
+        timestamps = self.clock + np.cumsum(gaps)
+        if n:
+            self.clock = float(timestamps[-1])
+        self.flows_generated += n
+
+        # Benign traffic
+        service = rng.choice(len(SERVICES), size=n, p=SERVICE_WEIGHTS)
+        port = SERVICE_PORTS[service].copy()
+        protocol = SERVICE_PROTOCOLS[service].copy()
+        udp = protocol == UDP
+        source = self.hosts[rng.choice(len(self.hosts), size=n, p=self.host_weights)]
+        destination = self.servers[rng.integers(0, len(self.servers), size=n)]
+        source_port = rng.integers(32768, 61000, size=n)
+        bytes_sent = np.where(udp, rng.lognormal(4.2, 0.3, n), rng.lognormal(7.0, 1.2, n))
+        bytes_received = np.where(udp, rng.lognormal(5.0, 0.4, n), bytes_sent * rng.lognormal(2.0, 1.0, n))
+        duration = np.where(udp, rng.lognormal(-4.0, 0.5, n), rng.lognormal(-1.0, 1.5, n))
+        packets = np.where(udp, 2, _tcp_packets(bytes_sent + bytes_received))
+        failed = (port == 22) & (rng.random(n) < 0.05)
+
+        # Attack campaigns
+        attack = np.zeros(n, dtype=np.int8)
+        attacking = rng.random(n) < self.attack_rate
+        if attacking.any() and self.attack_weights.sum() > 0:
+            attack[attacking] = 1 + rng.choice(len(self.attack_weights), size=int(attacking.sum()), p=self.attack_weights)
+        campaign = rng.integers(0, self.attackers.shape[1], size=n)
+
+        rows = np.flatnonzero(attack == 1)  # port scan: SYN to many ports, answered by RST
+        m = len(rows)
+        source[rows] = self.attackers[1, campaign[rows]]
+        destination[rows] = self.scan_targets[campaign[rows]]
+        port[rows] = np.where(rng.random(m) < 0.8, rng.integers(1, 1025, m), rng.integers(1025, 65536, m))
+        protocol[rows] = TCP
+        bytes_sent[rows] = HEADER_BYTES + rng.choice([4, 20], m)
+        bytes_received[rows] = np.where(rng.random(m) < 0.9, HEADER_BYTES, 0)
+        packets[rows] = 1 + (bytes_received[rows] > 0)
+        duration[rows] = rng.uniform(0.0, 0.002, m)
+
+        rows = np.flatnonzero(attack == 2)  # SYN flood from spoofed sources
+        m = len(rows)
+        source[rows] = rng.integers(1 << 24, 223 << 24, m)
+        destination[rows] = self.flood_targets[campaign[rows]]
+        port[rows] = rng.choice([80, 443], m)
+        protocol[rows] = TCP
+        bytes_sent[rows] = HEADER_BYTES + 4 * rng.integers(1, 6, m)
+        bytes_received[rows] = 0
+        packets[rows] = rng.integers(1, 4, m)
+        duration[rows] = 0.0
+
+        rows = np.flatnonzero(attack == 3)  # SSH brute force: short, similar, failed logins
+        m = len(rows)
+        source[rows] = self.attackers[3, campaign[rows]]
+        destination[rows] = self.ssh_targets[campaign[rows]]
+        port[rows] = 22
+        protocol[rows] = TCP
+        bytes_sent[rows] = rng.lognormal(7.6, 0.15, m)
+        bytes_received[rows] = rng.lognormal(8.0, 0.15, m)
+        packets[rows] = _tcp_packets(bytes_sent[rows] + bytes_received[rows]) + rng.integers(15, 25, m)
+        duration[rows] = rng.uniform(1.0, 4.0, m)
+        failed[rows] = rng.random(m) < 0.98
+
+        rows = np.flatnonzero(attack == 4)  # exfiltration: large uploads to an external host
+        m = len(rows)
+        source[rows] = self.compromised_hosts[campaign[rows]]
+        destination[rows] = self.attackers[4, campaign[rows]]
+        port[rows] = 443
+        protocol[rows] = TCP
+        bytes_sent[rows] = rng.lognormal(17.0, 1.0, m)
+        bytes_received[rows] = rng.lognormal(8.0, 1.0, m)
+        packets[rows] = _tcp_packets(bytes_sent[rows] + bytes_received[rows])
+        duration[rows] = rng.lognormal(5.0, 1.0, m)
+
+        return {
+            "timestamp": timestamps,
+            "source_ip": source.astype(np.uint32),
+            "destination_ip": destination.astype(np.uint32),
+            "source_port": source_port.astype(np.int32),
+            "port_number": port.astype(np.int32),
+            "protocol_type": protocol.astype(np.int8),
+            "bytes_sent": np.round(bytes_sent).astype(np.int64),
+            "bytes_received": np.round(bytes_received).astype(np.int64),
+            "packet_count": packets.astype(np.int64),
+            "duration": duration.astype(np.float32),
+            "attack_type": attack,
+            "failed": failed
+        }
+
+    def batches(self, total: int, batch_size: int = 100000) -> Iterator[Flows]:
+        """Yield ``total`` flows in batches of at most ``batch_size``"""
+        remaining = total
+        while remaining > 0:
+            n = min(batch_size, remaining)
+            yield self.generate(n)
+            remaining -= n
+
+    def log_lines(self, flows: Flows) -> List[str]:
+        """One syslog-style line per flow, describing what the flow did"""
+        n = len(flows["timestamp"])
+        rng = self.log_rng
+        timestamps = format_timestamps(flows["timestamp"]).tolist()
+        sources = format_ips(flows["source_ip"]).tolist()
+        destinations = format_ips(flows["destination_ip"]).tolist()
+        hosts = (np.char.add("srv-", (flows["destination_ip"] & 0xFFFF).astype(str))).tolist()
+        pids = rng.integers(1000, 65536, n).tolist()
+        users = np.where(flows["attack_type"] == 3, BRUTE_FORCE_USERS[rng.integers(0, len(BRUTE_FORCE_USERS), n)],
+                         USERS[rng.integers(0, len(USERS), n)]).tolist()
+        paths = URL_PATHS[rng.integers(0, len(URL_PATHS), n)].tolist()
+        statuses = HTTP_STATUSES[rng.integers(0, len(HTTP_STATUSES), n)].tolist()
+        domains = DOMAINS[rng.integers(0, len(DOMAINS), n)].tolist()
+
+        lines = []
+        for i, (attack, port, source_port, sent, received, failed) in enumerate(zip(
+            flows["attack_type"].tolist(), flows["port_number"].tolist(), flows["source_port"].tolist(),
+            flows["bytes_sent"].tolist(), flows["bytes_received"].tolist(), flows["failed"].tolist()
+        )):
+            prefix = f"{timestamps[i]}Z {hosts[i]}"
+            if attack == 1:
+                message = (f"kernel: [UFW BLOCK] IN=eth0 OUT= SRC={sources[i]} DST={destinations[i]} "
+                           f"PROTO=TCP SPT={source_port} DPT={port} SYN")
+            elif attack == 2:
+                message = f"kernel: TCP: request_sock_TCP: Possible SYN flooding on port {port}. Sending cookies."
+            elif attack == 4:
+                message = f"squid[{pids[i]}]: CONNECT {destinations[i]}:{port} from {sources[i]} bytes_out={sent}"
+            elif port == 22 and failed:
+                invalid = "invalid user " if attack == 3 else ""
+                message = f"sshd[{pids[i]}]: Failed password for {invalid}{users[i]} from {sources[i]} port {source_port} ssh2"
+            elif port == 22:
+                message = f"sshd[{pids[i]}]: Accepted publickey for {users[i]} from {sources[i]} port {source_port} ssh2"
+            elif port in (80, 443, 8080):
+                message = f"nginx: {sources[i]} - - \"GET {paths[i]} HTTP/1.1\" {statuses[i]} {received}"
+            elif port == 53:
+                message = f"named[{pids[i]}]: client {sources[i]}#{source_port}: query: {domains[i]} IN A +"
+            elif port == 25:
+                message = f"postfix/smtpd[{pids[i]}]: connect from unknown[{sources[i]}]"
+            else:
+                message = f"kernel: conntrack: new connection {sources[i]}:{source_port} -> {destinations[i]}:{port}"
+            lines.append(f"{prefix} {message}")
+        return lines
+
+def to_records(flows: Flows, include_labels: bool = False) -> List[Dict]:
+    """Flow dicts in the shape the ingestion endpoints and feature extractors take"""
+    columns = {
+        "timestamp": format_timestamps(flows["timestamp"]).tolist(),
+        "source_ip": format_ips(flows["source_ip"]).tolist(),
+        "destination_ip": format_ips(flows["destination_ip"]).tolist()
+    }
+    names = [name for name in FLOW_COLUMNS if name not in columns and (include_labels or name not in LABEL_COLUMNS)]
+    for name in names:
+        columns[name] = flows[name].tolist()
+    if include_labels:
+        columns["attack_type"] = [ATTACK_TYPES[code] for code in columns["attack_type"]]
+    keys = list(columns)
+    return [dict(zip(keys, row)) for row in zip(*columns.values())]
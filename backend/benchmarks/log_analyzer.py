@@ -0,0 +1,122 @@
+"""Compare LogAnalyzer inference configurations on synthetic log lines.
+
+Measures raw model throughput (the template cache is bypassed) for the
+default transformers pipeline and for the length-bucketed, truncated
+CPU mode with and without int8 dynamic quantization. Every case classifies
+the same lines, truncated at ``--max-length`` tokens, from the same model
+files, so only the inference strategy differs.
+
+Usage (from the backend directory):
+    python -m benchmarks.log_analyzer --model /models/bert-base-uncased --lines 2000
+"""
+from typing import Any, Callable, Dict, List
+import argparse
+import json
+import random
+import time
+import numpy as np
+
+from app.ml.models.log_analyzer import BucketedTextClassifier
+
+TEMPLATES = [
+    "sshd[{pid}]: Failed password for {user} from 10.0.{a}.{b} port {port} ssh2",
+    "kernel: [{ts}] eth0: link up, 1000Mbps, full-duplex",
+    "sudo: {user} : TTY=pts/{a} ; PWD=/home/{user} ; USER=root ; COMMAND=/bin/systemctl restart nginx",
+    "nginx: 10.1.{a}.{b} - - \"GET /api/v1/items/{pid}?page={a} HTTP/1.1\" 200 {port}",
+    "CRON[{pid}]: ({user}) CMD (/usr/local/bin/backup.sh --target s3://bucket/{user}/{ts} --verbose --retries {a})",
+]
+
+def generate_lines(n: int, seed: int = 42) -> List[str]:
+    """Generate mixed-length syslog-style lines"""
+    rng = random.Random(seed)
+    lines = []
+    for _ in range(n):
+        line = rng.choice(TEMPLATES).format(
+            pid=rng.randint(100, 99999),
+            user=rng.choice(["root", "admin", "deploy", "postgres"]),
+            a=rng.randint(0, 255),
+            b=rng.randint(0, 255),
+            port=rng.randint(1024, 65535),
+            ts=f"{rng.random() * 10000:.6f}"
+        )
+        # Occasional very long lines exercise truncation
+        if rng.random() < 0.05:
+            line += " " + " ".join(f"arg{i}={rng.randint(0, 1000)}" for i in range(200))
+        lines.append(line)
+    return lines
+
+def run_case(name: str, classify: Callable[[List[str]], Any], lines: List[str], chunk_size: int) -> Dict[str, Any]:
+    """Time a classifier over the lines in request-sized chunks"""
+    classify(lines[:chunk_size])  # warm-up
+    latencies = []
+    start = time.perf_counter()
+    for i in range(0, len(lines), chunk_size):
+        chunk_start = time.perf_counter()
+        classify(lines[i:i + chunk_size])
+        latencies.append((time.perf_counter() - chunk_start) * 1000.0)
+    elapsed = time.perf_counter() - start
+    return {
+        "case": name,
+        "lines": len(lines),
+        "lines_per_sec": len(lines) / elapsed,
+        "chunk_latency_ms": {
+            "p50": float(np.percentile(latencies, 50)),
+            "p95": float(np.percentile(latencies, 95)),
+            "p99": float(np.percentile(latencies, 99))
+        }
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="bert-base-uncased", help="Model name or local path")
+    parser.add_argument("--lines", type=int, default=1000)
+    parser.add_argument("--chunk-size", type=int, default=256, help="Lines per analyzer call")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--max-length", type=int, default=128)
+    parser.add_argument("--local-files-only", action="store_true")
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer, pipeline
+
+    lines = generate_lines(args.lines)
+    baseline = pipeline(
+        "text-classification",
+        model=AutoModelForSequenceClassification.from_pretrained(args.model, local_files_only=args.local_files_only),
+        tokenizer=AutoTokenizer.from_pretrained(args.model, local_files_only=args.local_files_only),
+        top_k=None
+    )
+    cases = [
+        (
+            "pipeline (current)",
+            lambda chunk: baseline(chunk, truncation=True, max_length=args.max_length),
+            lines
+        ),
+    ]
+    for quantize in (False, True):
+        classifier = BucketedTextClassifier(
+            args.model,
+            batch_size=args.batch_size,
+            max_length=args.max_length,
+            quantize=quantize,
+            local_files_only=args.local_files_only
+        )
+        name = f"bucketed max_length={args.max_length}" + (" int8" if quantize else "")
+        cases.append((name, classifier, lines))
+
+    results = []
+    for name, classify, case_lines in cases:
+        result = run_case(name, classify, case_lines, args.chunk_size)
+        results.append(result)
+        print(
+            f"{name:<40} {result['lines_per_sec']:>10.1f} lines/s  "
+            f"p50 {result['chunk_latency_ms']['p50']:>8.1f} ms  "
+            f"p95 {result['chunk_latency_ms']['p95']:>8.1f} ms"
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,305 @@
+"""Throughput and latency benchmarks for the detection pipeline.
+
+Drives the pipeline's hot paths with synthetic flows and log lines from
+``app.services.traffic_generator`` at several batch sizes and reports
+events/sec, p50/p95/p99 call latency and peak RSS for each (case, batch
+size). Everything runs offline: models are
+trained on the synthetic data, logs use the linear backend, and threats are
+written to a throwaway SQLite database and raw-event store.
+
+Cases:
+    preprocess           DataPreprocessor, one event at a time, then scaling
+    feature_extraction   FeatureExtractor.extract_network_features_batch
+    network_batch        process_network_batch (allowlist -> persistence queue)
+    network_data         process_network_data, batch_size concurrent callers
+    log_data             process_log_data with batch_size lines per call
+    persistence          ThreatWriter.submit + flush (durable write latency)
+
+Peak RSS is the process high-water mark after each case; it only grows, so
+compare runs that executed the same cases in the same order.
+
+Usage (from the backend directory):
+    python -m benchmarks.pipeline --output baseline.json
+    python -m benchmarks.pipeline --output current.json --baseline baseline.json --threshold 0.1
+    python -m benchmarks.pipeline --compare baseline.json current.json
+"""
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+from datetime import datetime
+import numpy as np
+
+CASES = ["preprocess", "feature_extraction", "network_batch", "network_data", "log_data", "persistence"]
+# Compared against the baseline; p99 is reported but too noisy to gate on
+GATED_METRICS = {
+    "events_per_sec": "higher",
+    "p50_ms": "lower",
+    "p95_ms": "lower",
+    "peak_rss_mb": "lower"
+}
+
+# Severity a log analyst would give each kind of flow's log line
+LOG_SEVERITY = {
+    "benign": "NORMAL",
+    "port_scan": "WARNING",
+    "brute_force": "WARNING",
+    "syn_flood": "CRITICAL",
+    "exfiltration": "CRITICAL"
+}
+
+def configure_environment(workdir: str) -> None:
+    """Point settings at throwaway storage; must run before ``app`` is imported"""
+    os.makedirs(workdir, exist_ok=True)
+    defaults = {
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{os.path.join(workdir, 'benchmark.db')}",
+        "RAW_EVENT_STORE_DIR": os.path.join(workdir, "raw_events"),
+        "MODEL_DIR": os.path.join(workdir, "models"),
+        "LOG_ANALYZER_BACKEND": "linear",
+        "ALERT_ROLLUP_MINUTE_BUCKETS": "60",
+    }
+    for key, value in defaults.items():
+        os.environ.setdefault(key, value)
+
+def generate_traffic(n: int, seed: int = 42, attack_rate: float = 0.1) -> Tuple[List[Dict[str, Any]], List[str], List[str]]:
+    """Flows from the shared synthetic traffic generator: records, attack labels and log lines"""
+    from app.services.traffic_generator import ATTACK_TYPES, TrafficGenerator, to_records
+
+    generator = TrafficGenerator(seed=seed, attack_rate=attack_rate)
+    flows = generator.generate(n)
+    labels = [ATTACK_TYPES[code] for code in flows["attack_type"].tolist()]
+    return to_records(flows), labels, generator.log_lines(flows)
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process (ru_maxrss is in KiB on Linux)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024.0 * 1024.0) if sys.platform == "darwin" else peak / 1024.0
+
+def summarize(case: str, batch_size: int, events: int, elapsed: float, latencies_ms: List[float]) -> Dict[str, Any]:
+    return {
+        "case": case,
+        "batch_size": batch_size,
+        "events": events,
+        "seconds": elapsed,
+        "events_per_sec": events / elapsed if elapsed > 0 else 0.0,
+        "p50_ms": float(np.percentile(latencies_ms, 50)),
+        "p95_ms": float(np.percentile(latencies_ms, 95)),
+        "p99_ms": float(np.percentile(latencies_ms, 99)),
+        "mean_ms": float(np.mean(latencies_ms)),
+        "peak_rss_mb": peak_rss_mb()
+    }
+
+async def measure(call: Callable[[int], Awaitable[Optional[List[float]]]], iterations: int) -> Tuple[float, List[float]]:
+    """Time ``call(i)`` per iteration after one warm-up call.
+
+    A call may return its own latencies (one per event) instead of being
+    timed as a whole.
+    """
+    await call(0)
+    latencies: List[float] = []
+    start = time.perf_counter()
+    for i in range(iterations):
+        call_start = time.perf_counter()
+        own = await call(i)
+        if own is None:
+            latencies.append((time.perf_counter() - call_start) * 1000.0)
+        else:
+            latencies.extend(own)
+    return time.perf_counter() - start, latencies
+
+class PipelineBenchmark:
+    """Builds a trained pipeline on synthetic data and runs the cases"""
+
+    def __init__(self, events: int, min_iterations: int, seed: int = 42):
+        self.events = events
+        self.min_iterations = min_iterations
+        self.seed = seed
+
+    async def setup(self) -> None:
+        from app.db.session import init_db
+        from app.ml.pipeline import ThreatDetectionPipeline
+        from app.ml.preprocessing import DataPreprocessor
+        from app.services.persistence import ThreatWriter
+
+        await init_db()
+        self.pipeline = ThreatDetectionPipeline()
+        self.preprocessor = DataPreprocessor()
+        # No coalescing delay: the persistence case measures the write itself
+        self.writer = ThreatWriter(flush_interval_ms=0)
+
+        training, attacks, lines = generate_traffic(5000, seed=self.seed + 1)
+        features = self.pipeline.feature_extractor.extract_network_features_batch(training)
+        self.pipeline.get_model("anomaly_detector").train(features)
+        self.pipeline.get_model("network_classifier").train(features, np.array(attacks))
+        self.pipeline.get_model("fast_log_classifier").train(lines, [LOG_SEVERITY[attack] for attack in attacks])
+
+        self.network_events, _, self.log_lines = generate_traffic(self.events, seed=self.seed)
+
+    def _batches(self, items: List[Any], batch_size: int) -> Tuple[Callable[[int], List[Any]], int]:
+        """Accessor for the i-th batch, cycling over ``items``, and the iteration count"""
+        iterations = max(self.min_iterations, len(items) // batch_size)
+
+        def batch(i: int) -> List[Any]:
+            start = i * batch_size
+            return [items[j % len(items)] for j in range(start, start + batch_size)]
+        return batch, iterations
+
+    async def run_case(self, case: str, batch_size: int) -> Dict[str, Any]:
+        batch, iterations = self._batches(
+            self.log_lines if case == "log_data" else self.network_events, batch_size
+        )
+
+        if case == "preprocess":
+            async def call(i):
+                rows = np.vstack([self.preprocessor.preprocess_network_data(event) for event in batch(i)])
+                self.preprocessor.normalize_features(rows)
+        elif case == "feature_extraction":
+            async def call(i):
+                self.pipeline.feature_extractor.extract_network_features_batch(batch(i))
+        elif case == "network_batch":
+            async def call(i):
+                await self.pipeline.process_network_batch(batch(i))
+        elif case == "network_data":
+            async def timed(event):
+                start = time.perf_counter()
+                await self.pipeline.process_network_data(event)
+                return (time.perf_counter() - start) * 1000.0
+
+            async def call(i):
+                return list(await asyncio.gather(*(timed(event) for event in batch(i))))
+        elif case == "log_data":
+            async def call(i):
+                await self.pipeline.process_log_data(batch(i))
+        elif case == "persistence":
+            async def call(i):
+                await self.writer.submit(
+                    [{"anomaly_score": 0.95, "confidence": 0.9, "raw_data": event} for event in batch(i)]
+                )
+                await self.writer.flush()
+        else:
+            raise ValueError(f"Unknown case: {case}")
+
+        elapsed, latencies = await measure(call, iterations)
+        result = summarize(case, batch_size, iterations * batch_size, elapsed, latencies)
+        # Detections queued by the network cases are written outside the timing
+        await self.pipeline.threat_writer.flush()
+        return result
+
+    async def close(self) -> None:
+        from app.db.session import close_db
+
+        await self.writer.stop()
+        await self.pipeline.shutdown()
+        await close_db()
+
+async def run_benchmarks(cases: List[str], batch_sizes: List[int], events: int, min_iterations: int) -> List[Dict[str, Any]]:
+    benchmark = PipelineBenchmark(events, min_iterations)
+    await benchmark.setup()
+    results = []
+    try:
+        for case in cases:
+            for batch_size in batch_sizes:
+                result = await benchmark.run_case(case, batch_size)
+                results.append(result)
+                print(
+                    f"{case:<20} batch {batch_size:>5}  {result['events_per_sec']:>12.1f} events/s  "
+                    f"p50 {result['p50_ms']:>8.3f} ms  p95 {result['p95_ms']:>8.3f} ms  "
+                    f"p99 {result['p99_ms']:>8.3f} ms  rss {result['peak_rss_mb']:>7.1f} MB",
+                    flush=True
+                )
+    finally:
+        await benchmark.close()
+    return results
+
+def environment_info() -> Dict[str, Any]:
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "created_at": datetime.utcnow().isoformat()
+    }
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float) -> List[str]:
+    """Describe every gated metric that regressed by more than ``threshold``"""
+    previous = {(r["case"], r["batch_size"]): r for r in baseline["results"]}
+    regressions = []
+    for result in current["results"]:
+        old = previous.get((result["case"], result["batch_size"]))
+        if old is None:
+            continue
+        for metric, better in GATED_METRICS.items():
+            before, after = old[metric], result[metric]
+            if before <= 0:
+                continue
+            change = (after - before) / before
+            if (better == "higher" and change < -threshold) or (better == "lower" and change > threshold):
+                regressions.append(
+                    f"{result['case']} batch {result['batch_size']}: {metric} "
+                    f"{before:.3f} -> {after:.3f} ({change:+.1%})"
+                )
+    return regressions
+
+def load_report(path: str) -> Dict[str, Any]:
+    with open(path) as f:
+        return json.load(f)
+
+def report_comparison(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float) -> int:
+    regressions = compare(baseline, current, threshold)
+    if not regressions:
+        print(f"No regressions beyond {threshold:.0%}")
+        return 0
+    print(f"{len(regressions)} regression(s) beyond {threshold:.0%}:")
+    for line in regressions:
+        print(f"  {line}")
+    return 1
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cases", default=",".join(CASES), help="Comma-separated cases to run")
+    parser.add_argument("--batch-sizes", default="1,16,128,1024")
+    parser.add_argument("--events", type=int, default=4096, help="Events per case and batch size")
+    parser.add_argument("--min-iterations", type=int, default=20, help="Calls per case, for stable percentiles")
+    parser.add_argument("--workdir", help="Directory for the throwaway database and models")
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    parser.add_argument("--baseline", help="Compare this run against a previous JSON report")
+    parser.add_argument("--compare", nargs=2, metavar=("BASELINE", "CURRENT"),
+                        help="Compare two JSON reports without running anything")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="Allowed relative regression per metric (0.1 = 10%%)")
+    args = parser.parse_args()
+
+    if args.compare:
+        return report_comparison(load_report(args.compare[0]), load_report(args.compare[1]), args.threshold)
+
+    cases = [case.strip() for case in args.cases.split(",") if case.strip()]
+    unknown = set(cases) - set(CASES)
+    if unknown:
+        parser.error(f"unknown cases: {', '.join(sorted(unknown))}")
+    batch_sizes = [int(size) for size in args.batch_sizes.split(",")]
+
+    configure_environment(args.workdir or tempfile.mkdtemp(prefix="pipeline-benchmark-"))
+    results = asyncio.run(run_benchmarks(cases, batch_sizes, args.events, args.min_iterations))
+    report = {
+        "environment": environment_info(),
+        "config": {"cases": cases, "batch_sizes": batch_sizes, "events": args.events,
+                   "min_iterations": args.min_iterations},
+        "results": results
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        return report_comparison(load_report(args.baseline), report, args.threshold)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
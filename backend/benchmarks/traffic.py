@@ -0,0 +1,238 @@
+"""Generate synthetic traffic files and replay them against the ingestion API.
+
+``generate`` writes flows from ``app.services.traffic_generator`` with
+their ground-truth labels, plus one syslog-style line per flow:
+
+    ndjson   flows.ndjson (one flow per line) and logs.log
+    npz      flows-00000.npz, flows-00001.npz, ... columnar chunks holding
+             every flow column and a ``log_line`` column
+
+``replay`` streams a generated directory to a running API at a target rate
+(flows per second). Network flows go to ``/ingest/batch`` (or one per request
+to ``/ingest/network``) and the matching log lines to ``/ingest/logs``.
+Labels are stripped before sending. Requests are paced against a fixed
+schedule; when the server cannot keep up, at most ``--concurrency`` requests
+are in flight and the final lag is reported.
+
+Usage (from the backend directory):
+    python -m benchmarks.traffic generate --flows 1000000 --format npz --output data/traffic
+    python -m benchmarks.traffic replay data/traffic --rate 5000 --batch-size 200 --url http://localhost:8000
+"""
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import argparse
+import asyncio
+import glob
+import json
+import os
+import sys
+import time
+from collections import Counter
+from datetime import datetime
+import numpy as np
+
+from app.services.traffic_generator import ATTACK_TYPES, FLOW_COLUMNS, LABEL_COLUMNS, TrafficGenerator, to_records
+
+NDJSON_FLOWS = "flows.ndjson"
+NDJSON_LOGS = "logs.log"
+NPZ_PATTERN = "flows-*.npz"
+
+def generate(args: argparse.Namespace) -> int:
+    mix = json.loads(args.attack_mix) if args.attack_mix else None
+    generator = TrafficGenerator(
+        seed=args.seed,
+        start=datetime.fromisoformat(args.start) if args.start else None,
+        flows_per_second=args.flows_per_second,
+        attack_rate=args.attack_rate,
+        attack_mix=mix
+    )
+    os.makedirs(args.output, exist_ok=True)
+    start = time.perf_counter()
+    attacks = np.zeros(len(ATTACK_TYPES), dtype=np.int64)
+
+    if args.format == "ndjson":
+        with open(os.path.join(args.output, NDJSON_FLOWS), "w") as flows_file, \
+                open(os.path.join(args.output, NDJSON_LOGS), "w") as logs_file:
+            for flows in generator.batches(args.flows, args.chunk_size):
+                attacks += np.bincount(flows["attack_type"], minlength=len(attacks))
+                flows_file.writelines(json.dumps(record) + "\n" for record in to_records(flows, include_labels=True))
+                if not args.no_logs:
+                    logs_file.writelines(line + "\n" for line in generator.log_lines(flows))
+    else:
+        for index, flows in enumerate(generator.batches(args.flows, args.chunk_size)):
+            attacks += np.bincount(flows["attack_type"], minlength=len(attacks))
+            columns = dict(flows)
+            if not args.no_logs:
+                # ASCII bytes take a quarter of the space of a unicode array
+                columns["log_line"] = np.array(generator.log_lines(flows), dtype=np.bytes_)
+            np.savez(os.path.join(args.output, f"flows-{index:05d}.npz"), **columns)
+
+    elapsed = time.perf_counter() - start
+    print(f"Wrote {args.flows} flows to {args.output} in {elapsed:.1f}s ({args.flows / elapsed:,.0f} flows/s)")
+    print(", ".join(f"{name}={count}" for name, count in zip(ATTACK_TYPES, attacks.tolist())))
+    return 0
+
+def iter_chunks(path: str, chunk_size: int) -> Iterator[Tuple[List[Dict[str, Any]], List[str]]]:
+    """(flow records, log lines) chunks from a generated directory, without labels"""
+    npz_files = sorted(glob.glob(os.path.join(path, NPZ_PATTERN)))
+    if npz_files:
+        for name in npz_files:
+            with np.load(name) as data:
+                flows = {column: data[column] for column in FLOW_COLUMNS}
+                lines = np.char.decode(data["log_line"]).tolist() if "log_line" in data.files else []
+            records = to_records(flows)
+            for i in range(0, len(records), chunk_size):
+                yield records[i:i + chunk_size], lines[i:i + chunk_size]
+        return
+
+    logs_path = os.path.join(path, NDJSON_LOGS)
+    logs_file = open(logs_path) if os.path.exists(logs_path) else None
+    try:
+        with open(os.path.join(path, NDJSON_FLOWS)) as flows_file:
+            while True:
+                records = []
+                for line in flows_file:
+                    record = json.loads(line)
+                    for column in LABEL_COLUMNS:
+                        record.pop(column, None)
+                    records.append(record)
+                    if len(records) == chunk_size:
+                        break
+                if not records:
+                    return
+                lines = [logs_file.readline().rstrip("\n") for _ in records] if logs_file else []
+                yield records, [line for line in lines if line]
+    finally:
+        if logs_file:
+            logs_file.close()
+
+class ReplayStats:
+    def __init__(self):
+        self.requests = 0
+        self.flows = 0
+        self.errors = 0
+        self.statuses: Counter = Counter()
+        self.latencies_ms: List[float] = []
+
+    def record(self, status: Optional[int], latency_ms: float) -> None:
+        self.requests += 1
+        self.statuses[status if status is not None else "error"] += 1
+        if status is None or status >= 400:
+            self.errors += 1
+        self.latencies_ms.append(latency_ms)
+
+    def summary(self, elapsed: float, lag: float) -> Dict[str, Any]:
+        latencies = self.latencies_ms or [0.0]
+        return {
+            "requests": self.requests,
+            "flows": self.flows,
+            "errors": self.errors,
+            "statuses": {str(status): count for status, count in self.statuses.items()},
+            "seconds": elapsed,
+            "flows_per_sec": self.flows / elapsed if elapsed > 0 else 0.0,
+            "lag_seconds": lag,
+            "p50_ms": float(np.percentile(latencies, 50)),
+            "p95_ms": float(np.percentile(latencies, 95)),
+            "p99_ms": float(np.percentile(latencies, 99))
+        }
+
+def build_requests(records: List[Dict[str, Any]], lines: List[str], mode: str,
+                   send_logs: bool) -> List[Tuple[str, Any]]:
+    """(path, JSON body) pairs for one chunk of flows and their log lines"""
+    if mode == "single":
+        requests = [("/api/v1/ingest/network", record) for record in records]
+    else:
+        requests = [("/api/v1/ingest/batch", {"network_data": records})]
+    if send_logs and lines:
+        requests.append(("/api/v1/ingest/logs", lines))
+    return requests
+
+async def replay_async(args: argparse.Namespace) -> Dict[str, Any]:
+    import httpx
+
+    stats = ReplayStats()
+    semaphore = asyncio.Semaphore(args.concurrency)
+    pending = set()
+    loop = asyncio.get_running_loop()
+
+    async def send(client: "httpx.AsyncClient", path: str, body: Any) -> None:
+        start = time.perf_counter()
+        try:
+            response = await client.post(path, json=body)
+            status = response.status_code
+        except httpx.HTTPError:
+            status = None
+        finally:
+            semaphore.release()
+        stats.record(status, (time.perf_counter() - start) * 1000.0)
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout, limits=limits) as client:
+        start = loop.time()
+        scheduled = 0
+        for records, lines in iter_chunks(args.input, args.batch_size):
+            if args.limit and scheduled >= args.limit:
+                break
+            if args.limit:
+                records = records[:args.limit - scheduled]
+                lines = lines[:len(records)]
+            # Flow k is due at start + k / rate
+            delay = start + scheduled / args.rate - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            for path, body in build_requests(records, lines, args.mode, not args.no_logs):
+                await semaphore.acquire()
+                task = loop.create_task(send(client, path, body))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+            scheduled += len(records)
+            stats.flows = scheduled
+        lag = max(0.0, loop.time() - (start + scheduled / args.rate))
+        if pending:
+            await asyncio.gather(*pending)
+        elapsed = loop.time() - start
+    return stats.summary(elapsed, lag)
+
+def replay(args: argparse.Namespace) -> int:
+    summary = asyncio.run(replay_async(args))
+    print(json.dumps(summary, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(summary, f, indent=2)
+    return 1 if summary["errors"] else 0
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    generate_parser = commands.add_parser("generate", help="Write synthetic flows and log lines")
+    generate_parser.add_argument("--flows", type=int, default=1000000)
+    generate_parser.add_argument("--output", required=True, help="Output directory")
+    generate_parser.add_argument("--format", choices=["ndjson", "npz"], default="npz")
+    generate_parser.add_argument("--chunk-size", type=int, default=100000, help="Flows generated (and per npz file) at a time")
+    generate_parser.add_argument("--seed", type=int, default=42)
+    generate_parser.add_argument("--start", help="ISO timestamp of the first flow (UTC)")
+    generate_parser.add_argument("--flows-per-second", type=float, default=1000.0, help="Simulated flow arrival rate")
+    generate_parser.add_argument("--attack-rate", type=float, default=0.02, help="Share of flows that belong to attacks")
+    generate_parser.add_argument("--attack-mix", help='JSON weights, e.g. \'{"port_scan": 1, "brute_force": 1}\'')
+    generate_parser.add_argument("--no-logs", action="store_true", help="Skip syslog lines")
+    generate_parser.set_defaults(handler=generate)
+
+    replay_parser = commands.add_parser("replay", help="Send a generated directory to the ingestion API")
+    replay_parser.add_argument("input", help="Directory written by generate")
+    replay_parser.add_argument("--url", default="http://localhost:8000")
+    replay_parser.add_argument("--rate", type=float, default=1000.0, help="Target flows per second")
+    replay_parser.add_argument("--batch-size", type=int, default=200, help="Flows (and log lines) per request")
+    replay_parser.add_argument("--mode", choices=["batch", "single"], default="batch",
+                               help="One /ingest/batch request per chunk or one /ingest/network request per flow")
+    replay_parser.add_argument("--concurrency", type=int, default=16, help="Maximum requests in flight")
+    replay_parser.add_argument("--limit", type=int, default=0, help="Stop after this many flows (0 = all)")
+    replay_parser.add_argument("--timeout", type=float, default=30.0)
+    replay_parser.add_argument("--no-logs", action="store_true", help="Only send network flows")
+    replay_parser.add_argument("--output", help="Write the summary as JSON to this path")
+    replay_parser.set_defaults(handler=replay)
+
+    args = parser.parse_args()
+    return args.handler(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
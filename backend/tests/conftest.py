@@ -0,0 +1,27 @@
+import asyncio
+import os
+import sys
+import tempfile
+import pytest
+
+# Throwaway storage; must be set before ``app`` is imported
+WORKDIR = tempfile.mkdtemp(prefix="threat-detection-tests-")
+os.environ.setdefault("SQLALCHEMY_DATABASE_URI", f"sqlite:///{os.path.join(WORKDIR, 'test.db')}")
+os.environ.setdefault("RAW_EVENT_STORE_DIR", os.path.join(WORKDIR, "raw_events"))
+os.environ.setdefault("MODEL_DIR", os.path.join(WORKDIR, "models"))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+@pytest.fixture
+def run():
+    """Run a coroutine on a fresh event loop against an initialized database"""
+    from app.db.session import engine, init_db
+
+    async def main(coro):
+        await init_db()
+        try:
+            return await coro
+        finally:
+            # Pooled connections belong to this loop
+            await engine.dispose()
+
+    return lambda coro: asyncio.run(main(coro))
@@ -0,0 +1,60 @@
+import asyncio
+from sqlalchemy import func, select
+
+from app.api.endpoints.alerts import update_alert_status
+from app.db.session import AsyncSessionLocal
+from app.models.alert import Alert
+from app.services.alert_stats import EPOCH, AlertStatistics, alert_statistics
+from app.services.persistence import ThreatWriter
+
+async def create_alert() -> int:
+    writer = ThreatWriter(flush_interval_ms=0)
+    await writer.submit([{"anomaly_score": 0.95}])
+    await writer.stop()
+    async with AsyncSessionLocal() as db:
+        return (await db.execute(select(func.max(Alert.id)))).scalar_one()
+
+async def load(statistics: AlertStatistics) -> AlertStatistics:
+    async with AsyncSessionLocal() as db:
+        await statistics.ensure_loaded(db)
+    return statistics
+
+def test_concurrent_transitions_count_once(run, monkeypatch):
+    monkeypatch.setattr(alert_statistics, "reload_seconds", 3600.0)
+
+    async def scenario():
+        alert_id = await create_alert()
+        await load(alert_statistics)
+        before = dict(alert_statistics._counters)
+
+        async def transition(status):
+            async with AsyncSessionLocal() as db:
+                await update_alert_status(alert_id, status=status, db=db)
+
+        # Both requests read the alert as "new" before either writes
+        await asyncio.gather(transition("acknowledged"), transition("resolved"))
+        async with AsyncSessionLocal() as db:
+            final_status = (await db.get(Alert, alert_id)).status
+        reloaded = await load(AlertStatistics(reload_seconds=0))
+        return before, dict(alert_statistics._counters), reloaded._counters, final_status
+
+    before, after, reloaded, final_status = run(scenario())
+    new, responded = ("all", EPOCH, "status", "new"), ("all", EPOCH, "metric", "responded")
+    assert after[new] == before[new] - 1
+    assert after.get(responded, 0) == before.get(responded, 0) + 1
+    assert after[("all", EPOCH, "status", final_status)] == before.get(("all", EPOCH, "status", final_status), 0) + 1
+    assert {key: value for key, value in after.items() if key[0] == "all"} == \
+        {key: value for key, value in reloaded.items() if key[0] == "all"}
+
+def test_statistics_reload_rollups_written_elsewhere(run):
+    async def scenario():
+        statistics = await load(AlertStatistics(reload_seconds=0))
+        total = statistics.snapshot()["total"]
+        # Another worker's write: the shared table changes, this copy does not
+        await create_alert()
+        await load(statistics)
+        return total, statistics.snapshot()["total"]
+
+    total, reloaded_total = run(scenario())
+    assert reloaded_total == total + 1
+
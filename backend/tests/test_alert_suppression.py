@@ -0,0 +1,70 @@
+from sqlalchemy import select
+
+from app.db.session import AsyncSessionLocal
+from app.models.alert import Alert
+from app.services.alert_suppression import AlertSuppressor
+from app.services.persistence import ThreatWriter
+
+def detection(source_ip: str, destination_ip: str = "10.0.0.254"):
+    return {"anomaly_score": 0.95, "raw_data": {"source_ip": source_ip, "destination_ip": destination_ip}}
+
+async def alert_counts(source_ip: str):
+    async with AsyncSessionLocal() as db:
+        rows = await db.execute(
+            select(Alert.occurrence_count).where(Alert.alert_metadata["raw_data"]["source_ip"].as_string() == source_ip)
+        )
+        return rows.scalars().all()
+
+def test_repeats_fold_into_first_alert(run):
+    async def scenario():
+        suppressor = AlertSuppressor(window_seconds=60, flush_interval_ms=10)
+        writer = ThreatWriter(flush_interval_ms=0, suppressor=suppressor)
+        for _ in range(10):
+            await writer.submit([detection("192.0.2.1") for _ in range(100)])
+        await writer.stop()
+        return await alert_counts("192.0.2.1"), suppressor.get_stats()
+
+    counts, stats = run(scenario())
+    assert counts == [1000]
+    assert stats["suppressed"] == 999
+    assert stats["pending"] == 0
+
+def test_failed_first_write_reopens_window(run):
+    async def scenario():
+        suppressor = AlertSuppressor(window_seconds=60, flush_interval_ms=10)
+        # Without retries the first batch is dropped on its first failure
+        writer = ThreatWriter(flush_interval_ms=0, suppressor=suppressor, max_retries=0)
+        write = writer._write
+        failures = [RuntimeError("database unavailable")]
+
+        async def flaky_write(batch, raw_data_ids):
+            if failures:
+                raise failures.pop()
+            await write(batch, raw_data_ids)
+
+        writer._write = flaky_write
+        await writer.submit([detection("192.0.2.2")])
+        await writer.flush()
+        for _ in range(50):
+            await writer.submit([detection("192.0.2.2") for _ in range(100)])
+        await writer.stop()
+        return await alert_counts("192.0.2.2"), suppressor.get_stats()
+
+    counts, stats = run(scenario())
+    # The failed detection and every repeat end up on the alert raised after it
+    assert counts == [5001]
+    assert stats["windows_released"] == 1
+    assert stats["pending"] == 0
+    assert stats["orphaned"] == 0
+    assert stats["occurrences_dropped"] == 0
+
+def test_closed_window_keeps_repeats_until_alert_is_bound():
+    suppressor = AlertSuppressor(window_seconds=60, max_keys=1)
+    first = detection("192.0.2.3")
+    assert suppressor.admit([first, detection("192.0.2.3")], "network_based") == [first]
+    # A second key evicts the first window while its alert is still queued
+    suppressor.admit([detection("192.0.2.4")], "network_based")
+    assert suppressor._collect() == []
+    suppressor.bind(first, "network_based", {"id": 7, "occurrence_count": 1})
+    ready = suppressor._collect()
+    assert [(entry.alert_id, entry.pending) for entry in ready] == [(7, 1)]
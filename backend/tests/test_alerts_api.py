@@ -0,0 +1,85 @@
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.alert_broadcaster import alert_broadcaster
+from app.services.persistence import ThreatWriter
+
+@pytest.fixture
+def client():
+    with TestClient(app) as client:
+        yield client
+
+def create_alert(run, data, threat_type):
+    async def scenario():
+        writer = ThreatWriter(flush_interval_ms=0)
+        await writer.submit([data], threat_type=threat_type)
+        await writer.stop()
+        return writer.rows_written
+
+    assert run(scenario()) == 1
+
+def test_status_change_reports_the_alert_severity(run, client):
+    # Log detections carry no anomaly score; their threat defaults to high severity
+    subscription = alert_broadcaster.subscribe()
+    try:
+        create_alert(run, {"result": {"severity": "critical"}}, "log_based")
+        created = subscription.queue.get_nowait()
+        assert created["event"] == "alert_created"
+        assert created["alert"]["severity"] == "high"
+
+        response = client.put(f"/api/v1/alerts/alerts/{created['alert']['id']}/status", params={"status": "acknowledged"})
+        assert response.status_code == 200
+        changed = subscription.queue.get_nowait()
+        assert changed["event"] == "alert_status_changed"
+        assert changed["alert"]["severity"] == "high"
+    finally:
+        alert_broadcaster.unsubscribe(subscription)
+
+def test_websocket_subscription_ends_when_client_disconnects():
+    async def scenario():
+        messages = asyncio.Queue()
+        await messages.put({"type": "websocket.connect"})
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+            if message["type"] == "websocket.accept":
+                # The client leaves while no alert is being published
+                await messages.put({"type": "websocket.disconnect", "code": 1001})
+
+        scope = {
+            "type": "websocket", "path": "/api/v1/alerts/alerts/ws", "raw_path": b"/api/v1/alerts/alerts/ws",
+            "query_string": b"", "headers": [], "scheme": "ws", "server": ("testserver", 80),
+            "client": ("testclient", 50000), "root_path": "", "subprotocols": [], "app": app
+        }
+        before = alert_broadcaster.get_stats()["subscribers"]
+        await asyncio.wait_for(app(scope, messages.get, send), timeout=5)
+        return sent, before, alert_broadcaster.get_stats()["subscribers"]
+
+    sent, before, after = asyncio.run(scenario())
+    assert sent[0]["type"] == "websocket.accept"
+    assert after == before
+
+def test_listed_alerts_are_the_stored_ones(run, client):
+    subscription = alert_broadcaster.subscribe()
+    try:
+        for i in range(3):
+            create_alert(run, {"result": {"severity": "critical"}, "raw_data": {"n": i}}, "log_based")
+        created = [subscription.queue.get_nowait()["alert"] for _ in range(3)]
+    finally:
+        alert_broadcaster.unsubscribe(subscription)
+    alert_id = created[-1]["id"]
+
+    detail = client.get(f"/api/v1/alerts/alerts/{alert_id}").json()
+    assert detail["id"] == alert_id and detail["status"] == "new" and detail["threat"]["id"] == detail["threat_id"]
+    assert client.put(f"/api/v1/alerts/alerts/{alert_id}/status", params={"status": "resolved"}).status_code == 200
+
+    first = client.get("/api/v1/alerts/alerts", params={"limit": 2})
+    assert [alert["id"] for alert in first.json()] == [alert_id, created[1]["id"]]
+    assert first.json()[0]["status"] == "resolved"
+    second = client.get("/api/v1/alerts/alerts", params={"limit": 2, "cursor": first.headers["X-Next-Cursor"]})
+    assert second.json()[0]["id"] == created[0]["id"]
+    assert client.get("/api/v1/alerts/alerts", params={"limit": 1, "skip": 2}).json()[0]["id"] == created[0]["id"]
+    assert client.get("/api/v1/alerts/alerts/999999").status_code == 404
@@ -0,0 +1,88 @@
+import os
+import threading
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from app.ml import artifacts
+from app.ml.artifacts import is_artifact, load_artifact, resolve_artifact, save_artifact
+from app.ml.models.network_classifier import NetworkClassifier
+
+@pytest.fixture
+def classifier():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(200, 4))
+    model = NetworkClassifier()
+    model.train(X, (X[:, 0] > 0).astype(int))
+    return model, X
+
+def _save(path, value):
+    return save_artifact(path, {"value": value}, {"weights": np.full(3, value)}, "Test", model_version=str(value))
+
+def test_path_always_names_a_complete_artifact(tmp_path):
+    path = str(tmp_path / "model")
+    _save(path, 0)
+    stop = threading.Event()
+    missing = []
+
+    def read():
+        while not stop.is_set():
+            if not is_artifact(path):
+                missing.append(True)
+
+    reader = threading.Thread(target=read)
+    reader.start()
+    try:
+        for value in range(1, 30):
+            _save(path, value)
+    finally:
+        stop.set()
+        reader.join()
+    assert not missing
+    estimator, arrays, manifest = load_artifact(path)
+    assert estimator == {"value": 29} and manifest["model_version"] == "29"
+    np.testing.assert_array_equal(arrays["weights"], np.full(3, 29))
+
+def test_old_versions_are_pruned_after_grace_period(tmp_path, monkeypatch):
+    path = str(tmp_path / "model")
+    other = str(tmp_path / "model-b")
+    _save(other, 0)
+    for value in range(3):
+        _save(path, value)
+    versions = [name for name in os.listdir(tmp_path) if name.startswith(".model-") and not name.startswith(".model-b-")]
+    assert len(versions) == 3
+
+    monkeypatch.setattr(artifacts, "RETIRED_VERSION_GRACE_SECONDS", 0)
+    _save(path, 3)
+    versions = [name for name in os.listdir(tmp_path) if name.startswith(".model-") and not name.startswith(".model-b-")]
+    # The current version and its predecessor
+    assert len(versions) == 2
+    assert load_artifact(path)[0] == {"value": 3}
+    # A sibling whose name shares the prefix is untouched
+    assert load_artifact(other)[0] == {"value": 0}
+
+def test_legacy_directory_is_replaced(tmp_path):
+    path = str(tmp_path / "model")
+    _save(path, 1)
+    legacy = resolve_artifact(path)
+    os.unlink(path)
+    os.rename(legacy, path)
+    _save(path, 2)
+    assert os.path.islink(path)
+    assert load_artifact(path)[0] == {"value": 2}
+
+def test_loaded_model_reads_one_version(tmp_path, classifier):
+    model, X = classifier
+    path = str(tmp_path / "classifier")
+    model.save_model(path, version="1")
+    loaded = NetworkClassifier()
+    loaded.load_model(path)
+    assert isinstance(loaded.last_training_time, datetime)
+    assert loaded.last_training_time == model.last_training_time
+
+    # A re-save must not change what the lazily loaded estimator reads
+    model.train(X, (X[:, 1] > 0).astype(int))
+    model.save_model(path, version="2")
+    assert loaded.manifest["model_version"] == "1"
+    np.testing.assert_array_equal(loaded.model.predict(X), (X[:, 0] > 0).astype(int))
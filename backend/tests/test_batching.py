@@ -0,0 +1,77 @@
+import asyncio
+
+from app.ml.batching import MicroBatcher
+from app.ml.pipeline import ThreatDetectionPipeline
+
+def test_one_bad_item_fails_only_its_caller():
+    calls = []
+
+    async def process(items):
+        calls.append(len(items))
+        return [ValueError("malformed item") if item == "bad" else item.upper() for item in items]
+
+    async def scenario():
+        batcher = MicroBatcher(process, max_batch_size=3, max_wait_ms=50)
+        results = await asyncio.gather(
+            batcher.submit("a"), batcher.submit("bad"), batcher.submit("b"), return_exceptions=True
+        )
+        return results, batcher
+
+    results, batcher = asyncio.run(scenario())
+    assert results[0] == "A" and results[2] == "B"
+    assert isinstance(results[1], ValueError)
+    assert calls == [3]
+    assert not batcher._tasks
+
+def test_failed_batch_is_not_replayed():
+    calls = []
+
+    async def process(items):
+        calls.append(len(items))
+        raise RuntimeError("database unavailable")
+
+    async def scenario():
+        batcher = MicroBatcher(process, max_batch_size=2, max_wait_ms=50)
+        return await asyncio.gather(batcher.submit(1), batcher.submit(2), return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert calls == [2]
+
+def test_malformed_event_is_rejected_before_side_effects():
+    pipeline = ThreatDetectionPipeline()
+    pipeline.executor.shutdown(wait=False)
+    recorded = []
+
+    async def record(context, count):
+        recorded.append(list(context["events"]))
+        for result in context["results"]:
+            result["anomaly_score"] = 0.5
+
+    pipeline.network_cascade.run = record
+    good = {"source_ip": "10.0.0.1", "bytes_sent": 10}
+    results = asyncio.run(pipeline.process_network_batch([
+        good, {"source_ip": "10.0.0.2", "bytes_sent": "lots"}, {"timestamp": "yesterday"}, "not an event"
+    ]))
+
+    assert recorded == [[good]]
+    assert results[0]["anomaly_score"] == 0.5
+    assert all(isinstance(result, ValueError) for result in results[1:])
+
+def test_batch_task_is_referenced_until_done():
+    async def scenario():
+        release = asyncio.Event()
+
+        async def process(items):
+            await release.wait()
+            return items
+
+        batcher = MicroBatcher(process, max_batch_size=1)
+        pending = asyncio.ensure_future(batcher.submit(1))
+        await asyncio.sleep(0)
+        in_flight = len(batcher._tasks)
+        release.set()
+        return in_flight, await pending, len(batcher._tasks)
+
+    in_flight, result, remaining = asyncio.run(scenario())
+    assert (in_flight, result, remaining) == (1, 1, 0)
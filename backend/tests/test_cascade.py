@@ -0,0 +1,26 @@
+import numpy as np
+
+from app.ml.cascade import CascadeStage, DetectionCascade
+
+def test_stages_run_cheapest_first_and_count_short_circuits(run):
+    order = []
+
+    def stage(name, keep):
+        async def run_stage(context, active):
+            order.append(name)
+            return active[keep(active)]
+        return run_stage
+
+    cascade = DetectionCascade([
+        CascadeStage("classify", stage("classify", lambda rows: rows % 3 == 0), cost=5.0),
+        CascadeStage("gate", stage("gate", lambda rows: rows % 2 == 0), cost=0.1),
+        CascadeStage("score", stage("score", lambda rows: rows >= 0), cost=0.1)
+    ], name="test")
+
+    passed = run(cascade.run({}, 10))
+    assert order == ["gate", "score", "classify"]
+    np.testing.assert_array_equal(passed, [0, 6])
+    stats = {stat["name"]: stat for stat in cascade.get_stats()}
+    assert stats["gate"]["hits"] == 10 and stats["gate"]["short_circuits"] == 5
+    assert stats["classify"]["hits"] == 5 and stats["classify"]["passed"] == 2
+    assert stats["classify"]["work"] == 25.0
@@ -0,0 +1,18 @@
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+ORIGIN = {"Origin": "http://dashboard.example"}
+
+def exposed_headers(response):
+    return {name.strip().lower() for name in response.headers.get("access-control-expose-headers", "").split(",")}
+
+def test_cursor_header_is_readable_cross_origin():
+    with TestClient(app) as client:
+        response = client.get("/health", headers=ORIGIN)
+    assert "x-next-cursor" in exposed_headers(response)
+
+def test_etag_is_readable_cross_origin():
+    with TestClient(app) as client:
+        response = client.get("/health", headers=ORIGIN)
+    assert "etag" in exposed_headers(response)
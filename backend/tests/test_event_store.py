@@ -0,0 +1,50 @@
+import multiprocessing
+import time
+
+from app.db.event_store import EventCollection
+
+FIELDS = ["raw_data.source_ip"]
+
+def _write_events(directory, worker, batches):
+    collection = EventCollection(directory, FIELDS, segment_max_docs=25)
+    for batch in range(batches):
+        collection.write([
+            {"worker": worker, "batch": batch, "raw_data": {"source_ip": f"10.0.{worker}.{i}"}}
+            for i in range(3)
+        ])
+
+def test_processes_sharing_a_directory_get_distinct_ids(tmp_path):
+    directory = str(tmp_path / "events")
+    context = multiprocessing.get_context("fork")
+    workers = [context.Process(target=_write_events, args=(directory, worker, 40)) for worker in range(4)]
+    for process in workers:
+        process.start()
+    for process in workers:
+        process.join(30)
+        assert process.exitcode == 0
+
+    collection = EventCollection(directory, FIELDS, segment_max_docs=25)
+    documents = collection.read({})
+    ids = [int(document["_id"]) for document in documents]
+    assert len(documents) == 4 * 40 * 3
+    assert sorted(ids) == list(range(len(ids)))
+    for document in documents[::37]:
+        assert collection.read({"_id": document["_id"]}) == [document]
+    assert len(collection.read({"raw_data.source_ip": "10.0.2.1"})) == 40
+
+def test_reader_sees_other_writers(tmp_path):
+    directory = str(tmp_path / "events")
+    reader = EventCollection(directory, FIELDS, segment_max_docs=2)
+    writer = EventCollection(directory, FIELDS, segment_max_docs=2)
+    writer.write([{"n": i} for i in range(5)])
+    assert [document["n"] for document in reader.read({})] == list(range(5))
+    assert reader.write([{"n": 5}]) == ["5"]
+
+def test_quiet_collection_expires_and_keeps_ids_increasing(tmp_path):
+    directory = str(tmp_path / "events")
+    collection = EventCollection(directory, FIELDS, segment_max_docs=1000, ttl_seconds=60)
+    collection.write([{"n": 0}, {"n": 1}])
+
+    assert collection.purge_expired(now=time.time() + 120) == 1
+    assert collection.read({}) == []
+    assert EventCollection(directory, FIELDS, ttl_seconds=60).write([{"n": 2}]) == ["2"]
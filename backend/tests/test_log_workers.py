@@ -0,0 +1,38 @@
+import asyncio
+import pytest
+
+from app.ml.executor import InferenceExecutor
+from app.ml.models.fast_log_classifier import FastLogClassifier
+from app.ml.pipeline import ThreatDetectionPipeline, _analyze_logs_in_worker, _init_log_worker
+
+LINES = ["user admin logged in", "disk failure on sda1", "connection timeout to 10.0.0.5"]
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    # Worker processes read their settings from the environment
+    monkeypatch.setenv("LOG_ANALYZER_BACKEND", "linear")
+    pipeline = ThreatDetectionPipeline()
+    pipeline.executor.shutdown(wait=False)
+    pipeline.executor = InferenceExecutor(
+        thread_workers=1, process_workers=1, heavy_mode="process", process_initializer=_init_log_worker
+    )
+    yield pipeline
+    pipeline.executor.shutdown(wait=True)
+
+def test_swapped_fast_classifier_reaches_workers(pipeline):
+    classifier = FastLogClassifier()
+    classifier.train(LINES * 4, ["NORMAL", "CRITICAL", "WARNING"] * 4)
+    pipeline.registry.swap("fast_log_classifier", classifier, source="trained")
+
+    result = asyncio.run(pipeline.executor.run_heavy(_analyze_logs_in_worker, LINES))
+
+    assert result["severity_distribution"] == {"NORMAL": 1, "WARNING": 1, "CRITICAL": 1}
+    assert pipeline.executor.get_stats()["process_pool_recycled"] == 1
+
+def test_swap_replaces_running_workers(pipeline):
+    pipeline.executor._get_process_pool()
+    old_pool = pipeline.executor._process_pool
+    pipeline.registry.swap("fast_log_classifier", FastLogClassifier(), source="trained")
+
+    assert pipeline.executor._process_pool is None
+    assert pipeline.executor._get_process_pool() is not old_pool
@@ -0,0 +1,54 @@
+import os
+import subprocess
+import sys
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCRIPT = """
+import asyncio
+from prometheus_client import generate_latest
+from app.ml.batching import MicroBatcher
+from app.ml.pipeline import ThreatDetectionPipeline
+
+async def main():
+    pipeline = ThreatDetectionPipeline()
+    batcher = MicroBatcher(lambda items: asyncio.sleep(0, items), name="network")
+    await batcher.submit(1)
+    pipeline.executor.shutdown(wait=False)
+
+asyncio.run(main())
+print(generate_latest().decode())
+"""
+
+def exported_metrics(enabled: bool) -> str:
+    env = dict(os.environ, METRICS_ENABLED=str(enabled).lower())
+    result = subprocess.run([sys.executable, "-c", SCRIPT], cwd=BACKEND, env=env,
+                            capture_output=True, text=True, check=True)
+    return result.stdout
+
+def test_disabling_metrics_records_nothing():
+    assert "pipeline_batch_size" in exported_metrics(True)
+    disabled = exported_metrics(False)
+    for name in ("pipeline_batch_size", "pipeline_queue_depth", "pipeline_stage", "http_request_duration"):
+        assert name not in disabled
+
+WORKER = """
+from app.core.metrics import DETECTIONS
+DETECTIONS.labels(threat_type="network_based").inc()
+"""
+
+SCRAPE = """
+from app.core.metrics import render_metrics
+print(render_metrics()[0].decode())
+"""
+
+def test_multiprocess_metrics_sum_all_workers(tmp_path):
+    env = dict(os.environ, METRICS_ENABLED="true", PROMETHEUS_MULTIPROC_DIR=str(tmp_path))
+    for _ in range(2):
+        subprocess.run([sys.executable, "-c", WORKER], cwd=BACKEND, env=env, check=True)
+    scraped = subprocess.run([sys.executable, "-c", SCRAPE], cwd=BACKEND, env=env,
+                             capture_output=True, text=True, check=True).stdout
+    assert 'detections_total{threat_type="network_based"} 2.0' in scraped
+
+def test_preprocessing_is_a_timed_stage():
+    assert 'stage="preprocess"' in exported_metrics(True)
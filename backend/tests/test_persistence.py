@@ -0,0 +1,88 @@
+import asyncio
+
+from sqlalchemy import func, select
+
+from app.db.session import AsyncSessionLocal
+from app.models.threat import Threat
+from app.services.persistence import ThreatWriter
+
+async def threat_count() -> int:
+    async with AsyncSessionLocal() as db:
+        return (await db.execute(select(func.count(Threat.id)))).scalar_one()
+
+def flaky(writer: ThreatWriter, failures: int) -> None:
+    write = writer._write
+    remaining = [failures]
+
+    async def flaky_write(batch, raw_data_ids):
+        if remaining[0]:
+            remaining[0] -= 1
+            raise ConnectionError("database is restarting")
+        await write(batch, raw_data_ids)
+
+    writer._write = flaky_write
+
+def test_transient_failures_are_retried(run):
+    async def scenario():
+        before = await threat_count()
+        writer = ThreatWriter(flush_interval_ms=0, max_retries=3, retry_backoff_ms=1)
+        flaky(writer, failures=2)
+        await writer.submit([{"anomaly_score": 0.95} for _ in range(10)])
+        await writer.stop()
+        return await threat_count() - before, writer.get_stats()
+
+    written, stats = run(scenario())
+    assert written == 10
+    assert stats["retries"] == 2
+    assert stats["rows_failed"] == 0
+
+def test_batch_is_dropped_after_retries_are_exhausted(run):
+    async def scenario():
+        before = await threat_count()
+        writer = ThreatWriter(flush_interval_ms=0, max_retries=2, retry_backoff_ms=1)
+        flaky(writer, failures=3)
+        await writer.submit([{"anomaly_score": 0.95} for _ in range(10)])
+        await writer.flush()
+        # The writer keeps going with later batches
+        await writer.submit([{"anomaly_score": 0.95}])
+        await writer.stop()
+        return await threat_count() - before, writer.get_stats()
+
+    written, stats = run(scenario())
+    assert written == 1
+    assert stats["rows_failed"] == 10
+
+def test_flusher_survives_errors_outside_flush(run):
+    async def scenario():
+        before = await threat_count()
+        writer = ThreatWriter(flush_interval_ms=0, retry_backoff_ms=1)
+        collect = writer._collect
+        failures = [1]
+
+        async def broken_collect(batch):
+            await collect(batch)
+            if failures[0]:
+                failures[0] -= 1
+                raise RuntimeError("bug in the batching loop")
+
+        writer._collect = broken_collect
+        await writer.submit([{"anomaly_score": 0.95}])
+        await asyncio.wait_for(writer.flush(), 5)
+        await writer.submit([{"anomaly_score": 0.95}])
+        await asyncio.wait_for(writer.stop(), 5)
+        return await threat_count() - before
+
+    assert run(scenario()) == 1
+
+def test_flush_does_not_hang_on_a_dead_flusher(run):
+    async def scenario():
+        before = await threat_count()
+        writer = ThreatWriter(flush_interval_ms=1000)
+        await writer.submit([{"anomaly_score": 0.95}])
+        writer._task.cancel()
+        await asyncio.sleep(0)
+        await asyncio.wait_for(writer.flush(), 5)
+        await asyncio.wait_for(writer.stop(), 5)
+        return await threat_count() - before
+
+    assert run(scenario()) == 1
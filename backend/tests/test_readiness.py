@@ -0,0 +1,93 @@
+import asyncio
+import threading
+import pytest
+
+from app.api.endpoints import ingestion
+from app.main import readiness_check
+from app.ml.models.network_classifier import NetworkClassifier
+from app.ml.pipeline import ThreatDetectionPipeline
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    pipeline = ThreatDetectionPipeline()
+    monkeypatch.setattr(ingestion, "pipeline", pipeline)
+    yield pipeline
+    pipeline.executor.shutdown(wait=False)
+
+def test_failed_warm_up_is_not_ready(pipeline, monkeypatch):
+    def broken_load():
+        raise OSError("model artifact is corrupt")
+
+    monkeypatch.setattr(pipeline, "load_models", broken_load)
+    asyncio.run(pipeline.warm_up(run_inference=False))
+    response = asyncio.run(readiness_check())
+
+    assert pipeline.ready is False
+    assert response.status_code == 503
+    assert b'"status":"failed"' in response.body
+    assert b"model artifact is corrupt" in response.body
+
+def test_successful_warm_up_is_ready(pipeline, monkeypatch):
+    monkeypatch.setattr(pipeline, "load_models", lambda: None)
+    asyncio.run(pipeline.warm_up(run_inference=False))
+
+    assert pipeline.ready is True
+    assert pipeline.warmup_error is None
+    assert asyncio.run(readiness_check()).status_code == 200
+
+def test_ingestion_is_rejected_while_warming_up(pipeline, monkeypatch):
+    from fastapi import HTTPException
+    from app.core.config import get_settings
+
+    monkeypatch.setattr(get_settings(), "MODEL_LOAD_ON_STARTUP", True)
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(ingestion.require_ready())
+    assert excinfo.value.status_code == 503
+
+def test_lazy_ingestion_waits_for_models(pipeline, monkeypatch):
+    from app.core.config import get_settings
+
+    loaded = []
+    monkeypatch.setattr(get_settings(), "MODEL_LOAD_ON_STARTUP", False)
+    monkeypatch.setattr(pipeline, "load_models", lambda: loaded.append(True))
+    assert asyncio.run(readiness_check()).status_code == 503
+    asyncio.run(ingestion.require_ready())
+
+    assert loaded == [True]
+    assert pipeline.ready is True
+
+def test_model_builds_do_not_block_the_event_loop():
+    from app.ml.executor import InferenceExecutor
+    from app.ml.registry import ModelRegistry
+
+    executor = InferenceExecutor(thread_workers=2)
+    registry = ModelRegistry(run_in_executor=executor.run)
+    release = threading.Event()
+    builds = []
+
+    def slow_factory():
+        builds.append(True)
+        release.wait(5)
+        return NetworkClassifier()
+
+    registry.register_factory("network_classifier", slow_factory)
+
+    async def scenario():
+        users = [asyncio.ensure_future(use_model()) for _ in range(3)]
+        # The loop keeps running while the model builds
+        await asyncio.sleep(0.05)
+        assert not any(user.done() for user in users)
+        release.set()
+        return await asyncio.gather(*users)
+
+    async def use_model():
+        async with registry.use("network_classifier") as model:
+            return model
+
+    try:
+        models = asyncio.run(asyncio.wait_for(scenario(), 5))
+    finally:
+        release.set()
+        executor.shutdown()
+    assert builds == [True]
+    assert models[0] is models[1] is models[2]
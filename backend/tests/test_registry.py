@@ -0,0 +1,42 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import get_settings
+from app.main import app
+from app.ml.models.fast_log_classifier import FastLogClassifier
+from app.ml.pipeline import ThreatDetectionPipeline
+
+LINES = ["user admin logged in", "disk failure on sda1", "connection timeout to 10.0.0.5"]
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    monkeypatch.setattr(get_settings(), "LOG_ANALYZER_BACKEND", "linear")
+    pipeline = ThreatDetectionPipeline()
+    yield pipeline
+    pipeline.executor.shutdown(wait=False)
+
+def test_fast_classifier_swap_publishes_a_new_analyzer_version(pipeline):
+    async def scenario():
+        async with pipeline.registry.use("log_analyzer") as held:
+            old_fast = held.fast_classifier
+            classifier = FastLogClassifier()
+            classifier.train(LINES * 4, ["NORMAL", "CRITICAL", "WARNING"] * 4)
+            pipeline.registry.swap("fast_log_classifier", classifier, source="trained")
+            # The request in flight keeps the analyzer it started with
+            assert held.fast_classifier is old_fast
+            assert pipeline.registry.get_info("log_analyzer")["draining"]
+            return classifier
+
+    classifier = asyncio.run(scenario())
+    live = pipeline.registry.get("log_analyzer")
+    assert live.fast_classifier is classifier
+    assert live.predict(LINES) == ["NORMAL", "CRITICAL", "WARNING"]
+    assert not pipeline.registry.get_info("log_analyzer")["draining"]
+
+def test_log_analyzer_cannot_be_trained():
+    with TestClient(app) as client:
+        response = client.post("/api/v1/models/models/log_analyzer/train", json={"features": ["a"], "labels": ["NORMAL"]})
+    assert response.status_code == 400
+    assert "fast_log_classifier" in response.json()["detail"]
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import IsolationForest, RandomForestClassifier
+from sklearn.exceptions import NotFittedError
+
+from app.ml.models.anomaly_detector import AnomalyDetector
+from app.ml.models.network_classifier import NetworkClassifier
+from app.ml.tree_engine import CompiledForest
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(600, 8))
+    y = (X[:, 0] + X[:, 1] ** 2 + rng.normal(scale=0.5, size=len(X)) > 1).astype(int) + (X[:, 2] > 1)
+    return X, y, rng.normal(size=(300, 8))
+
+@pytest.mark.parametrize("max_features", ["sqrt", 1.0])
+def test_random_forest_matches_predict_proba(data, max_features):
+    X, y, X_test = data
+    model = RandomForestClassifier(n_estimators=25, max_features=max_features, random_state=0).fit(X, y)
+    engine = CompiledForest.from_random_forest(model)
+    np.testing.assert_allclose(engine.leaf_mean(X_test), model.predict_proba(X_test), rtol=0, atol=1e-12)
+
+@pytest.mark.parametrize("max_features", [1.0, 0.5, 3])
+def test_isolation_forest_matches_score_samples(data, max_features):
+    X, _, X_test = data
+    model = IsolationForest(n_estimators=50, max_features=max_features, random_state=0).fit(X)
+    engine = CompiledForest.from_isolation_forest(model)
+    scores = -(2.0 ** -engine.leaf_mean(X_test)[:, 0])
+    np.testing.assert_allclose(scores, model.score_samples(X_test), rtol=0, atol=1e-12)
+
+def test_single_row_and_chunked_batches_agree(data):
+    X, _, X_test = data
+    model = IsolationForest(n_estimators=20, random_state=0).fit(X)
+    engine = CompiledForest.from_isolation_forest(model)
+    expected = engine.leaf_mean(X_test)
+    engine.chunk_size = 7
+    np.testing.assert_array_equal(engine.leaf_mean(X_test), expected)
+    np.testing.assert_array_equal(engine.leaf_mean(X_test[0]), expected[:1])
+
+def test_models_use_engine_with_same_results(data):
+    X, y, X_test = data
+    classifier = NetworkClassifier()
+    classifier.train(X, y)
+    labels, probabilities = classifier.predict_with_proba(X_test)
+    np.testing.assert_allclose(probabilities, classifier.model.predict_proba(X_test), rtol=0, atol=1e-12)
+    np.testing.assert_array_equal(labels, classifier.model.predict(X_test))
+
+    detector = AnomalyDetector()
+    detector.train(X)
+    np.testing.assert_allclose(detector.predict_proba(X_test), -detector.model.score_samples(X_test), rtol=0, atol=1e-12)
+    np.testing.assert_array_equal(detector.predict(X_test), detector.model.predict(X_test))
+
+def test_untrained_classifier_raises_not_fitted():
+    with pytest.raises(NotFittedError):
+        NetworkClassifier().predict_with_proba(np.zeros((1, 8)))
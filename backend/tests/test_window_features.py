@@ -0,0 +1,31 @@
+import numpy as np
+
+from app.ml.window_features import SlidingWindowStore
+
+NOW = 1.7e9
+
+def record(store, keys, at):
+    n = len(keys)
+    times = np.full(n, at) if np.isscalar(at) else np.asarray(at, dtype=np.float64)
+    return store.update(keys, times, np.ones(n), np.ones(n), np.arange(n), np.zeros(n, dtype=bool))
+
+def test_counts_flows_per_key():
+    store = SlidingWindowStore(max_keys=16)
+    flows = record(store, ["a", "b", "a", "a"], NOW)[:, 0]
+    assert flows.tolist() == [3, 1, 3, 3]
+
+def test_batch_with_more_keys_than_rows_keeps_them_apart():
+    store = SlidingWindowStore(max_keys=4, initial_keys=1)
+    flows = record(store, list("abcdef"), NOW)[:, 0]
+    assert flows.tolist() == [1] * 6
+    assert len(store) == 4
+    assert len(set(store._index.values())) == 4
+
+def test_eviction_spares_keys_of_the_current_batch():
+    store = SlidingWindowStore(max_keys=4)
+    record(store, list("abcd"), NOW + np.arange(4))
+    # "a" is the least recently seen key but is part of the batch that needs room
+    flows = record(store, list("aexf"), NOW + 5)[:, 0]
+    assert flows.tolist() == [2, 1, 1, 1]
+    assert sorted(store._index) == ["a", "e", "f", "x"]
+    assert len(set(store._index.values())) == 4